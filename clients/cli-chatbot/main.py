@@ -6,6 +6,7 @@ from config import Configuration, LogLevel, sre_system_prompt
 from src.service.server import Server
 from src.model.llm_client import LLMClient # Importe LLMClient da sua nova localização
 from src.chat_session import ChatSession
+from src.tracing import setup_tracing, shutdown_tracing
 
 async def main() -> None:
     """
@@ -15,6 +16,7 @@ async def main() -> None:
     config = Configuration()
     config.load_env() # Load environment variables
     LogLevel.configure_logging(os.getenv("LOG_LEVEL")) # Configure logging
+    setup_tracing()
 
     # Load server configurations
     server_config_path = "servers_config.json"
@@ -38,7 +40,10 @@ async def main() -> None:
 
     llm_client = LLMClient() # Model name can be passed here if desired, e.g.
     chat_session = ChatSession(servers, llm_client, sre_system_prompt, llm_config_params=config.llm_config_params)
-    await chat_session.start()
+    try:
+        await chat_session.start()
+    finally:
+        shutdown_tracing()
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ from typing import List, Dict, Any
 
 from src.service.server import Server
 from src.model.llm_client import LLMClient
+from src.tracing import tracer
 
 class ChatSession:
     """
@@ -30,6 +31,17 @@ class ChatSession:
                 logging.warning(f"Aviso durante a limpeza final do servidor {server.name}: {e}")
         logging.info("Todos os servidores limpos.")
 
+    @staticmethod
+    def _progress_printer(tool_name: str):
+        """
+        Cria o callback que mostra o progresso (e os resultados parciais) enviados pelo servidor
+        enquanto a ferramenta executa.
+        """
+        async def show_progress(progress: float, total: float | None, message: str | None) -> None:
+            status = f"{progress / total:.0%}" if total else f"{progress:g}"
+            print(f"\n⏳ [{tool_name}] {status}" + (f" — {message}" if message else ""))
+        return show_progress
+
     async def process_llm_response(self, llm_response: str) -> str:
         """
         Processa a resposta do LLM. Se for uma chamada de ferramenta, executa a ferramenta.
@@ -70,7 +82,7 @@ class ChatSession:
                 if server:
                     try:
                         logging.debug(f"ChatSession - Executing tool '{tool_name}' on server '{server.name}'")
-                        result = await server.execute_tool(tool_name, tool_call["arguments"])
+                        result = await server.execute_tool(tool_name, tool_call["arguments"], progress_callback=self._progress_printer(tool_name))
                         logging.info(f"ChatSession - Execução da ferramenta '{tool_name}' bem-sucedida. Resultado: {result}")
                         return f"Resultado da execução da ferramenta: {result}"
                     except Exception as e:
@@ -164,47 +176,48 @@ class ChatSession:
                         logging.info("\nA sair da sessão de chat...")
                         break
 
-                    # Adiciona a entrada do utilizador ao histórico do chat
-                    self.messages.append({"role": "user", "content": user_input})
-                    print("\n🧠 A pensar...")
-
-                    # Obtém a resposta do LLM, passando os parâmetros configurados
-                    llm_response = self.llm_client.get_response(self.messages, **self.llm_config_params)
-                    if not llm_response:
-                        logging.error("A resposta do LLM é Nula. A ignorar a iteração.")
-                        # Remove a última mensagem do utilizador se o LLM não respondeu
-                        if self.messages and self.messages[-1]["role"] == "user":
-                            self.messages.pop()
-                        continue
-                    # Exibe a resposta bruta do LLM (para depuração/visibilidade, se necessário)
-                    logging.info("\n🤖 Resposta Bruta do Assistente: %s", llm_response)
-
-
-                    # Processa a resposta do LLM (chamada de ferramenta ou linguagem natural)
-                    processed_result = await self.process_llm_response(llm_response)
-
-                    if processed_result != llm_response:
-                        # Se uma ferramenta foi executada, a resposta do LLM foi uma chamada de ferramenta.
-                        # Anexamos a própria chamada de ferramenta e, em seguida, o resultado da ferramenta.
-                        self.messages.append({"role": "model", "content": llm_response}) # A chamada de ferramenta do LLM
-                        self.messages.append({"role": "user", "content": processed_result}) # O resultado da execução da ferramenta
-
-                        # Obtém uma resposta final em linguagem natural do LLM, incorporando o resultado da ferramenta
-                        print("\n✨ A obter a resposta final do LLM...")
-                        final_llm_response = self.llm_client.get_response(self.messages, **self.llm_config_params)
-                        if final_llm_response:
-                            logging.info("\n✨ Resposta Final do Assistente: %s", final_llm_response)
-                            print(f"\n✨ Resposta Final do Assistente: {final_llm_response}")
+                    with tracer.start_as_current_span("chat turn", attributes={"chat.input_length": len(user_input)}):
+                        # Adiciona a entrada do utilizador ao histórico do chat
+                        self.messages.append({"role": "user", "content": user_input})
+                        print("\n🧠 A pensar...")
+
+                        # Obtém a resposta do LLM, passando os parâmetros configurados
+                        llm_response = self.llm_client.get_response(self.messages, **self.llm_config_params)
+                        if not llm_response:
+                            logging.error("A resposta do LLM é Nula. A ignorar a iteração.")
+                            # Remove a última mensagem do utilizador se o LLM não respondeu
+                            if self.messages and self.messages[-1]["role"] == "user":
+                                self.messages.pop()
+                            continue
+                        # Exibe a resposta bruta do LLM (para depuração/visibilidade, se necessário)
+                        logging.info("\n🤖 Resposta Bruta do Assistente: %s", llm_response)
+
+
+                        # Processa a resposta do LLM (chamada de ferramenta ou linguagem natural)
+                        processed_result = await self.process_llm_response(llm_response)
+
+                        if processed_result != llm_response:
+                            # Se uma ferramenta foi executada, a resposta do LLM foi uma chamada de ferramenta.
+                            # Anexamos a própria chamada de ferramenta e, em seguida, o resultado da ferramenta.
+                            self.messages.append({"role": "model", "content": llm_response}) # A chamada de ferramenta do LLM
+                            self.messages.append({"role": "user", "content": processed_result}) # O resultado da execução da ferramenta
+
+                            # Obtém uma resposta final em linguagem natural do LLM, incorporando o resultado da ferramenta
+                            print("\n✨ A obter a resposta final do LLM...")
+                            final_llm_response = self.llm_client.get_response(self.messages, **self.llm_config_params)
+                            if final_llm_response:
+                                logging.info("\n✨ Resposta Final do Assistente: %s", final_llm_response)
+                                print(f"\n✨ Resposta Final do Assistente: {final_llm_response}")
+                            else:
+                                logging.warning("A resposta final do LLM foi Nula após a execução da ferramenta.")
+                                print(f"\nResultado da Ferramenta: {processed_result}")
+                                self.messages.append({"role": "model", "content": f"Resultado da Ferramenta: {processed_result}"})
+
                         else:
-                            logging.warning("A resposta final do LLM foi Nula após a execução da ferramenta.")
-                            print(f"\nResultado da Ferramenta: {processed_result}")
-                            self.messages.append({"role": "model", "content": f"Resultado da Ferramenta: {processed_result}"})
-
-                    else:
-                        # Se nenhuma ferramenta foi executada, a resposta do LLM foi em linguagem natural.
-                        logging.info("\n🤖 Assistente: %s", llm_response)
-                        print(f"\n🤖 Assistente: {llm_response}")
-                        self.messages.append({"role": "model", "content": llm_response})
+                            # Se nenhuma ferramenta foi executada, a resposta do LLM foi em linguagem natural.
+                            logging.info("\n🤖 Assistente: %s", llm_response)
+                            print(f"\n🤖 Assistente: {llm_response}")
+                            self.messages.append({"role": "model", "content": llm_response})
 
                 except KeyboardInterrupt:
                     logging.info("\nKeyboardInterrupt detetado. A sair...")
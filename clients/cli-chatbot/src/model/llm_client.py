@@ -7,6 +7,7 @@ from src.model.llm_clients.base_llm_client import BaseLLMClient
 from src.model.llm_clients.gemini_client import GeminiClient
 from src.model.llm_clients.ollama_client import OllamaClient
 from src.model.llm_clients.anthropic_client import AnthropicClient
+from src.tracing import tracer
 
 
 class LLMClient:
@@ -38,17 +39,23 @@ class LLMClient:
         Delegates the response generation to the selected LLM client with retry logic.
         Passes additional kwargs (e.g., temperature, max_tokens) to the underlying client.
         """
-        for attempt in range(self.max_retries):
-            try:
-                # Passa todos os kwargs recebidos para o cliente específico do LLM
-                response = self.client.get_response(messages, **kwargs)
-                if response is not None:
-                    return response
-            except Exception as e:
-                logging.warning(f"Attempt {attempt + 1}/{self.max_retries} for LLM response failed: {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay_seconds * (2 ** attempt)) # Exponential backoff
-                else:
-                    logging.error(f"Max retries reached for LLM response after {self.max_retries} attempts.")
-                    return None
-        return None
\ No newline at end of file
+        with tracer.start_as_current_span(
+            f"llm {self.provider}",
+            attributes={"gen_ai.system": self.provider, "gen_ai.request.messages": len(messages)},
+        ) as span:
+            for attempt in range(self.max_retries):
+                span.set_attribute("gen_ai.attempts", attempt + 1)
+                try:
+                    # Passa todos os kwargs recebidos para o cliente específico do LLM
+                    response = self.client.get_response(messages, **kwargs)
+                    if response is not None:
+                        return response
+                except Exception as e:
+                    span.add_event("retry", {"exception.message": str(e), "attempt": attempt + 1})
+                    logging.warning(f"Attempt {attempt + 1}/{self.max_retries} for LLM response failed: {e}")
+                    if attempt < self.max_retries - 1:
+                        time.sleep(self.retry_delay_seconds * (2 ** attempt)) # Exponential backoff
+                    else:
+                        logging.error(f"Max retries reached for LLM response after {self.max_retries} attempts.")
+                        return None
+            return None
\ No newline at end of file
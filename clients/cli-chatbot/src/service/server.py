@@ -2,11 +2,18 @@ import asyncio
 import logging
 import os
 import shutil
+from datetime import timedelta
 from contextlib import AsyncExitStack
 from typing import Any, List
-from mcp import ClientSession,StdioServerParameters, Tool as McpTool
+from mcp import ClientSession,StdioServerParameters, Tool as McpTool, types
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import ProgressFnT
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from src.tracing import trace_context, tracer
 
 
 class Server:
@@ -14,7 +21,7 @@ class Server:
     Manages the connection to a single Model Context Protocol (MCP) server.
     Handles server initialization, listing available tools, executing tools,
     and proper cleanup of resources.
-    Supports both 'stdio' (local process) and 'sse' (network) transports.
+    Supports 'stdio' (local process), 'sse' and 'streamable_http' (network) transports.
     """
     def __init__(self, name: str, config: dict[str, Any]) -> None:
         self.name: str = name
@@ -22,11 +29,13 @@ class Server:
         self.session: ClientSession | None = None
         self._cleanup_lock: asyncio.Lock = asyncio.Lock()
         self.exit_stack: AsyncExitStack = AsyncExitStack()
+        # Prazo de cada chamada de ferramenta, enviado ao servidor em _meta.timeoutMs
+        self.tool_timeout: float = float(config.get("tool_timeout", 120))
 
     async def initialize(self) -> None:
         """
         Initializes the connection to the MCP server based on its configuration.
-        Correctly handles both 'stdio' and 'sse' transports based on the provided JSON.
+        Correctly handles the 'stdio', 'sse' and 'streamable_http' transports based on the provided JSON.
         """
         transport_type = self.config.get("transport", "stdio").lower()
         transport_context_manager: Any = None
@@ -66,12 +75,27 @@ class Server:
                     sse_read_timeout=self.config.get("sse_read_timeout", 900), # <-- Nome do argumento corrigido para corresponder à função
                 )
 
+            elif transport_type in ("streamable_http", "streamable-http", "http"):
+                url = self.config.get("url")
+                if not url:
+                    raise ValueError(f"A 'url' must be specified for streamable_http transport on server '{self.name}'.")
+
+                logging.info(f"Initializing server '{self.name}' with streamable HTTP transport at URL: {url}")
+
+                # Cada chamada é um POST; o cliente httpx da sessão reaproveita as conexões keep-alive
+                transport_context_manager = streamablehttp_client(
+                    url=url,
+                    headers=self.config.get("headers"),
+                    timeout=self.config.get("timeout", 30),
+                    sse_read_timeout=self.config.get("sse_read_timeout", 900),
+                )
             
             else:
                 raise ValueError(f"Unsupported MCP transport type for server '{self.name}': {transport_type}")
 
             transport = await self.exit_stack.enter_async_context(transport_context_manager)
-            read, write = transport
+            # streamable_http também devolve uma função que retorna o id da sessão
+            read, write = transport[0], transport[1]
             
             session = await self.exit_stack.enter_async_context(ClientSession(read, write))
             await session.initialize()
@@ -102,39 +126,67 @@ class Server:
         logging.info(f"Found {len(tools)} tools on server {self.name}.")
         return tools
 
-    async def execute_tool(self, tool_name: str, arguments: dict[str, Any], retries: int = 2, delay: float = 1.0) -> Any:
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any], progress_callback: ProgressFnT | None = None) -> types.CallToolResult:
+        """
+        Calls a tool sending the current trace context (traceparent/tracestate) in the request _meta,
+        so the server's spans join the client's trace, and the call deadline (timeoutMs), so the
+        server stops working on it once the client would give up. With a progress_callback the request also
+        carries a progressToken and the callback receives (progress, total, message) for each
+        progress notification the server sends while the tool runs.
+        """
+        params = types.CallToolRequestParams(
+            name=tool_name,
+            arguments=arguments,
+            _meta=types.RequestParams.Meta(**trace_context(), timeoutMs=int(self.tool_timeout * 1000)),
+        )
+        return await self.session.send_request(
+            types.ClientRequest(types.CallToolRequest(method="tools/call", params=params)),
+            types.CallToolResult,
+            # Margem para o servidor responder com o erro de prazo antes de o cliente desistir
+            request_read_timeout_seconds=timedelta(seconds=self.tool_timeout + 5),
+            progress_callback=progress_callback,
+        )
+
+    async def execute_tool(
+        self, tool_name: str, arguments: dict[str, Any], retries: int = 2, delay: float = 1.0, progress_callback: ProgressFnT | None = None
+    ) -> Any:
         if not self.session:
             raise RuntimeError(f"Server {self.name} not initialized")
 
-        attempt = 0
-        while attempt < retries:
-            try:
-                logging.info(f"Attempting to execute tool '{tool_name}' on server {self.name} (Attempt {attempt + 1}/{retries})")
-                logging.debug(f"Arguments for '{tool_name}': {arguments}") 
-
-                result = await self.session.call_tool(tool_name, arguments)
-                logging.debug(f"Raw result from tool '{tool_name}': {result}")
-
-                if isinstance(result, dict) and "progress" in result and "total" in result:
-                    progress = result["progress"]
-                    total = result["total"]
-                    if total > 0:
-                        percentage = (progress / total) * 100
-                        logging.info(f"Tool '{tool_name}' progress: {progress}/{total} ({percentage:.1f}%)")
-                    else:
-                        logging.info(f"Tool '{tool_name}' progress: {progress}/{total} (Total is zero)")
-                
-                logging.info(f"Tool '{tool_name}' executed successfully.")
-                return result
-            except Exception as e:
-                attempt += 1
-                logging.error(f"Error executing tool '{tool_name}' on server {self.name}: {e}. Attempt {attempt} of {retries}.")
-                if attempt < retries:
-                    logging.info(f"Retrying tool '{tool_name}' in {delay} seconds...")
-                    await asyncio.sleep(delay)
-                else:
-                    logging.critical(f"Max retries reached for tool '{tool_name}'. Failing after {retries} attempts.")
+        with tracer.start_as_current_span(
+            f"tools/call {tool_name}",
+            kind=SpanKind.CLIENT,
+            attributes={"mcp.server.name": self.name, "mcp.tool.name": tool_name},
+        ) as span:
+            attempt = 0
+            while attempt < retries:
+                try:
+                    logging.info(f"Attempting to execute tool '{tool_name}' on server {self.name} (Attempt {attempt + 1}/{retries})")
+                    logging.debug(f"Arguments for '{tool_name}': {arguments}") 
+                    span.set_attribute("mcp.tool.attempts", attempt + 1)
+
+                    result = await self.call_tool(tool_name, arguments, progress_callback)
+                    logging.debug(f"Raw result from tool '{tool_name}': {result}")
+                    if getattr(result, "isError", False):
+                        span.set_status(Status(StatusCode.ERROR, "Tool returned an error result"))
+
+                    logging.info(f"Tool '{tool_name}' executed successfully.")
+                    return result
+                except McpError as e:
+                    # O servidor respondeu com erro ou o prazo da chamada acabou: repetir só multiplicaria a espera
+                    span.set_status(Status(StatusCode.ERROR, str(e)))
+                    logging.error(f"Tool '{tool_name}' on server {self.name} failed: {e}. Not retrying.")
                     raise
+                except Exception as e:
+                    attempt += 1
+                    span.add_event("retry", {"exception.message": str(e), "attempt": attempt})
+                    logging.error(f"Error executing tool '{tool_name}' on server {self.name}: {e}. Attempt {attempt} of {retries}.")
+                    if attempt < retries:
+                        logging.info(f"Retrying tool '{tool_name}' in {delay} seconds...")
+                        await asyncio.sleep(delay)
+                    else:
+                        logging.critical(f"Max retries reached for tool '{tool_name}'. Failing after {retries} attempts.")
+                        raise
 
     async def cleanup(self) -> None:
         async with self._cleanup_lock:
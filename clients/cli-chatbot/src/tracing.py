@@ -0,0 +1,58 @@
+import logging
+import os
+import sys
+from typing import Dict, Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+
+# Enquanto setup_tracing não instala um provider, este tracer não registra nada
+tracer = trace.get_tracer("cli-chatbot")
+
+_provider: Optional[TracerProvider] = None
+
+
+def _exporter(name: str, path: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "file":
+        return ConsoleSpanExporter(out=open(path, "a"), formatter=lambda span: span.to_json(indent=None) + "\n")
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stderr)
+    return None
+
+
+def setup_tracing(service_name: str = "cli-chatbot") -> None:
+    """
+    Configura o exportador de spans a partir de OTEL_TRACES_EXPORTER (none, console, file ou otlp).
+    Com "none" (padrão) os spans não são registrados.
+    """
+    global _provider
+    exporter_name = os.getenv("OTEL_TRACES_EXPORTER", "none").lower()
+    span_exporter = _exporter(exporter_name, os.getenv("OTEL_TRACES_FILE", "./traces.jsonl"))
+    if span_exporter is None:
+        return
+    _provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+    logging.info(f"Tracing habilitado com o exportador '{exporter_name}'.")
+
+
+def shutdown_tracing() -> None:
+    """
+    Envia os spans pendentes antes de encerrar o processo.
+    """
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def trace_context() -> Dict[str, str]:
+    """
+    Retorna o contexto W3C (traceparent/tracestate) do span atual para propagar aos servidores MCP.
+    """
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
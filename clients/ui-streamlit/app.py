@@ -5,11 +5,14 @@ import nest_asyncio
 import atexit
 from services.chat_service import init_session
 from utils.async_helpers import on_shutdown
+from utils.tracing import setup_tracing
 from apps import mcp_aiops
 
 # Apply nest_asyncio to allow nested asyncio event loops (needed for Streamlit's execution model)
 nest_asyncio.apply()
 
+setup_tracing()
+
 page_icon_path = os.path.join('.', 'icons', 'aiops.png')
 
 st.set_page_config(
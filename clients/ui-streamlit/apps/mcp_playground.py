@@ -67,7 +67,7 @@ def main():
             try:
                 # If agent is available, use it
                 if st.session_state.agent:
-                    response = run_async(run_agent(st.session_state.agent, user_text))
+                    response = run_async(run_agent(st.session_state.agent, user_text, st.session_state.get("client")))
                     tool_output = None
                     # Extract tool executions if available
                     if "messages" in response:
@@ -6,11 +6,23 @@ from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import BaseTool
 from services.ai_service import create_llm_model
 from utils.async_helpers import run_async
+from utils.tracing import TracingCallbackHandler, propagate_to_connections, tracer
 
 
+# Other spellings of the streamable HTTP transport accepted in servers_config.json
+STREAMABLE_HTTP_ALIASES = ("streamable-http", "http")
+
+
+def normalize_connections(server_config: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Use the adapters' transport name for servers configured with a streamable HTTP alias."""
+    return {
+        name: {**connection, "transport": "streamable_http"} if connection.get("transport") in STREAMABLE_HTTP_ALIASES else connection
+        for name, connection in server_config.items()
+    }
+
 async def setup_mcp_client(server_config: Dict[str, Dict]) -> MultiServerMCPClient:
     """Initialize a MultiServerMCPClient with the provided server configuration."""
-    client = MultiServerMCPClient(server_config)
+    client = MultiServerMCPClient(normalize_connections(server_config))
     # Removido o uso do context manager
     return client
 
@@ -18,9 +30,15 @@ async def get_tools_from_client(client: MultiServerMCPClient) -> List[BaseTool]:
     """Get tools from the MCP client."""
     return await client.get_tools()
 
-async def run_agent(agent, message: str) -> Dict:
-    """Run the agent with the provided message."""
-    return await agent.ainvoke({"messages": message})
+async def run_agent(agent, message: str, client: MultiServerMCPClient | None = None) -> Dict:
+    """Run the agent with the provided message.
+
+    The run is traced as one span with a child span per model and tool call; when the
+    client is given, its MCP servers receive the trace context so their spans join the trace."""
+    with tracer.start_as_current_span("agent run", attributes={"chat.input_length": len(message)}) as span:
+        if client is not None:
+            propagate_to_connections(client.connections)
+        return await agent.ainvoke({"messages": message}, config={"callbacks": [TracingCallbackHandler(span)]})
 
 async def run_tool(tool, **kwargs):
     """Run a tool with the provided parameters."""
@@ -0,0 +1,101 @@
+import os
+import sys
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+
+tracer = trace.get_tracer("ui-streamlit")
+
+_configured = False
+
+
+def _exporter(name: str, path: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "file":
+        return ConsoleSpanExporter(out=open(path, "a"), formatter=lambda span: span.to_json(indent=None) + "\n")
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stderr)
+    return None
+
+
+def setup_tracing(service_name: str = "ui-streamlit") -> None:
+    """Install the tracer provider from OTEL_TRACES_EXPORTER once per process (Streamlit reruns the script)."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    span_exporter = _exporter(os.getenv("OTEL_TRACES_EXPORTER", "none").lower(), os.getenv("OTEL_TRACES_FILE", "./traces.jsonl"))
+    if span_exporter is None:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+
+
+def trace_context() -> Dict[str, str]:
+    """W3C trace context (traceparent/tracestate) of the current span."""
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def propagate_to_connections(connections: Dict[str, Dict[str, Any]]) -> None:
+    """Send the current trace context as HTTP headers on the network MCP connections.
+
+    The MCP adapters open a session per tool call from these connection settings and do
+    not expose the request ``_meta``, so the servers pick the context up from the headers.
+    """
+    carrier = trace_context()
+    for connection in connections.values():
+        if connection.get("transport") in ("sse", "streamable_http"):
+            connection["headers"] = {**(connection.get("headers") or {}), **carrier}
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks that record each model and tool run of an agent as a child span of ``parent``."""
+
+    run_inline = True
+
+    def __init__(self, parent: Span) -> None:
+        self.context = trace.set_span_in_context(parent)
+        self.spans: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, kind: SpanKind, attributes: Dict[str, Any]) -> None:
+        self.spans[run_id] = tracer.start_span(name, context=self.context, kind=kind, attributes=attributes)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        span = self.spans.pop(run_id, None)
+        if span is None:
+            return
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        model = (kwargs.get("metadata") or {}).get("ls_model_name") or (serialized or {}).get("name", "chat_model")
+        self._start(run_id, f"llm {model}", SpanKind.CLIENT, {"gen_ai.request.model": model})
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        tool = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, f"tools/call {tool}", SpanKind.CLIENT, {"mcp.tool.name": tool})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
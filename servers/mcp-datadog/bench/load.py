@@ -0,0 +1,315 @@
+"""Load test an MCP server with many concurrent client sessions.
+
+Virtual users each open their own SSE or streamable HTTP session and call tools drawn from a weighted
+mix, back to back or with a think time. Concurrency ramps through ``--stages``; every
+stage reports throughput, latency percentiles, error rate and session setup time, and
+the largest stage within ``--max-p95-ms`` and ``--max-error-rate`` is reported as the
+capacity. Runs with the same seed, mix and stages issue the same call sequence, so
+results can be compared with ``--baseline``.
+
+    python -m bench.load --serve --stages 1,8,32,128 --duration 20 --output load.json
+    python -m bench.load --url http://localhost:8101/sse --baseline load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from bench.run import ROOT, _free_port, _percentile, start_standin
+
+DEFAULT_MIX = Path(__file__).resolve().parent / "mixes" / "datadog.json"
+
+
+def load_mix(path: str, now: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+    """Read a ``{tool: {weight, arguments}}`` mix, resolving ``$now`` and ``$now-<seconds>`` arguments."""
+    def resolve(value: Any) -> Any:
+        if isinstance(value, str) and value.startswith("$now"):
+            return now - int(value[5:] or 0) if value[4:5] == "-" else now
+        return value
+
+    mix = json.loads(Path(path).read_text())
+    return [(tool, float(spec.get("weight", 1)), {key: resolve(value) for key, value in (spec.get("arguments") or {}).items()}) for tool, spec in mix.items()]
+
+
+@asynccontextmanager
+async def connect(url: str, transport: str = "sse"):
+    """Open and initialize an MCP client session over ``transport``."""
+    if transport == "sse":
+        client = sse_client(url, timeout=30, sse_read_timeout=300)
+    else:
+        client = streamablehttp_client(url, timeout=30, sse_read_timeout=300)
+    async with client as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            yield session
+
+
+def _call_failed(result: Any) -> bool:
+    """A call fails when MCP flags it or the tool returns a ``status: error`` payload."""
+    if result.isError:
+        return True
+    for content in result.content:
+        text = getattr(content, "text", None)
+        if text and text.lstrip().startswith("{"):
+            try:
+                return json.loads(text).get("status") == "error"
+            except ValueError:
+                return False
+    return False
+
+
+@dataclass
+class Stage:
+    concurrency: int
+    started: float = 0.0
+    ended: float = 0.0
+    cpu: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    exceptions: int = 0
+    by_tool: Dict[str, List[float]] = field(default_factory=dict)
+
+    def record(self, tool: str, latency: float, failed: bool, exception: bool) -> None:
+        self.latencies.append(latency)
+        self.by_tool.setdefault(tool, []).append(latency)
+        self.errors += failed or exception
+        self.exceptions += exception
+
+    def summary(self, connect_times: List[float]) -> Dict[str, Any]:
+        elapsed = max(self.ended - self.started, 1e-9)
+        count = len(self.latencies)
+
+        def ms(values: List[float], q: float) -> Optional[float]:
+            return round(_percentile(values, q) * 1000, 2) if values else None
+
+        return {
+            "concurrency": self.concurrency,
+            "duration_s": round(elapsed, 2),
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2),
+            "error_rate": round(self.errors / count, 4) if count else None,
+            "exceptions": self.exceptions,
+            "p50_ms": ms(self.latencies, 0.50),
+            "p90_ms": ms(self.latencies, 0.90),
+            "p95_ms": ms(self.latencies, 0.95),
+            "p99_ms": ms(self.latencies, 0.99),
+            "max_ms": round(max(self.latencies) * 1000, 2) if self.latencies else None,
+            "connect_p50_ms": ms(connect_times, 0.50),
+            "connect_p95_ms": ms(connect_times, 0.95),
+            # A generator near 100% CPU measures itself rather than the server
+            "client_cpu_pct": round(self.cpu / elapsed * 100, 1),
+            "tools": {tool: {"requests": len(values), "p50_ms": ms(values, 0.5), "p95_ms": ms(values, 0.95)} for tool, values in sorted(self.by_tool.items())},
+        }
+
+
+class LoadTest:
+    def __init__(self, url: str, mix: List[Tuple[str, float, Dict[str, Any]]], seed: int, think_ms: float, settle: float, transport: str = "sse") -> None:
+        self.url = url
+        self.transport = transport
+        self.mix = mix
+        self.seed = seed
+        self.think_ms = think_ms
+        self.settle = settle
+        self.stage: Optional[Stage] = None
+        self.stop = asyncio.Event()
+        self.connect_times: List[float] = []
+        self.connect_failures = 0
+        self.users: List[asyncio.Task] = []
+
+    async def user(self, index: int, ready: asyncio.Event) -> None:
+        # Each user draws from its own seeded generator so the call sequence is reproducible
+        rng = random.Random(self.seed * 100_003 + index)
+        tools = [tool for tool, _, _ in self.mix]
+        weights = [weight for _, weight, _ in self.mix]
+        arguments = {tool: args for tool, _, args in self.mix}
+        start = time.perf_counter()
+        try:
+            async with connect(self.url, self.transport) as session:
+                self.connect_times.append(time.perf_counter() - start)
+                ready.set()
+                while not self.stop.is_set():
+                    tool = rng.choices(tools, weights)[0]
+                    call_start = time.perf_counter()
+                    try:
+                        result = await session.call_tool(tool, arguments[tool])
+                        failed, exception = _call_failed(result), False
+                    except Exception:
+                        failed, exception = True, True
+                    stage = self.stage
+                    if stage is not None and call_start >= stage.started + self.settle:
+                        stage.record(tool, time.perf_counter() - call_start, failed, exception)
+                    if self.think_ms:
+                        await asyncio.sleep(rng.expovariate(1000 / self.think_ms))
+        except Exception:
+            self.connect_failures += 1
+        finally:
+            ready.set()
+
+    async def run(self, stages: List[int], duration: float) -> List[Dict[str, Any]]:
+        results = []
+        for concurrency in stages:
+            # Sessions opened by earlier stages stay open; only the difference is added
+            pending = []
+            for index in range(len(self.users), concurrency):
+                ready = asyncio.Event()
+                self.users.append(asyncio.create_task(self.user(index, ready)))
+                pending.append(ready.wait())
+            connects_before = len(self.connect_times)
+            await asyncio.gather(*pending)
+
+            stage = Stage(concurrency, started=time.perf_counter())
+            cpu_start = time.process_time()
+            self.stage = stage
+            await asyncio.sleep(duration + self.settle)
+            stage.ended = time.perf_counter()
+            stage.cpu = time.process_time() - cpu_start
+            stage.started += self.settle
+            summary = stage.summary(self.connect_times[connects_before:])
+            summary["connect_failures"] = self.connect_failures
+            results.append(summary)
+            print(f"c={concurrency:<5} {summary['throughput_rps']:>8.1f} req/s  p50 {summary['p50_ms'] or 0:>8.1f} ms  "
+                  f"p95 {summary['p95_ms'] or 0:>8.1f} ms  p99 {summary['p99_ms'] or 0:>8.1f} ms  "
+                  f"errors {(summary['error_rate'] or 0) * 100:>5.1f}%  client cpu {summary['client_cpu_pct']:>5.1f}%")
+
+        self.stage = None
+        self.stop.set()
+        await asyncio.gather(*self.users, return_exceptions=True)
+        return results
+
+
+def capacity(stages: List[Dict[str, Any]], max_p95_ms: float, max_error_rate: float) -> Optional[Dict[str, Any]]:
+    """Largest stage that kept p95 latency and error rate within the limits."""
+    passing = [
+        stage for stage in stages
+        if stage["requests"] and stage["p95_ms"] <= max_p95_ms and stage["error_rate"] <= max_error_rate and not stage["connect_failures"]
+    ]
+    if not passing:
+        return None
+    best = max(passing, key=lambda stage: stage["concurrency"])
+    return {"concurrency": best["concurrency"], "throughput_rps": best["throughput_rps"], "p95_ms": best["p95_ms"]}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Stages whose throughput dropped or whose p95 latency rose by more than ``tolerance``."""
+    previous = {stage["concurrency"]: stage for stage in baseline.get("stages", [])}
+    regressions = []
+    for stage in results["stages"]:
+        before = previous.get(stage["concurrency"])
+        if not before or not stage["requests"]:
+            continue
+        if stage["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"c={stage['concurrency']} throughput_rps: {before['throughput_rps']} -> {stage['throughput_rps']}")
+        if before["p95_ms"] and stage["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"c={stage['concurrency']} p95_ms: {before['p95_ms']} -> {stage['p95_ms']}")
+        if stage["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"c={stage['concurrency']} error_rate: {before['error_rate']} -> {stage['error_rate']}")
+    return regressions
+
+
+def start_server(standin_url: str, port: int, workers: int = 1, cache_path: Optional[str] = None, transport: str = "sse") -> subprocess.Popen:
+    """Run main.py over ``transport`` against the stand-in and wait for its /metrics endpoint."""
+    env = {
+        **os.environ,
+        "MCP_TRANSPORT": transport,
+        "DATADOG_API_URL": standin_url,
+        "DATADOG_API_KEY": os.environ.get("DATADOG_API_KEY", "bench"),
+        "DATADOG_APP_KEY": os.environ.get("DATADOG_APP_KEY", "bench"),
+        "DATADOG_WORKERS": str(workers),
+    }
+    if cache_path:
+        env["DATADOG_CACHE_PATH"] = cache_path
+    # main.py pins port 8000, so the port is set on the settings before running
+    command = f"import main; main.mcp.settings.port = {port}; main.mcp.settings.log_level = 'WARNING'; main.run()"
+    process = subprocess.Popen([sys.executable, "-c", command], cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=0.5).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"MCP server did not start on port {port}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent SSE load test for the MCP servers")
+    parser.add_argument("--url", help="Endpoint of a running server, e.g. http://localhost:8101/sse or http://localhost:8101/mcp/")
+    parser.add_argument("--transport", choices=["sse", "streamable-http"], default="sse")
+    parser.add_argument("--serve", action="store_true", help="Start the stand-in and mcp-datadog locally instead of using --url")
+    parser.add_argument("--mix", default=str(DEFAULT_MIX), help="Weighted tool mix (JSON)")
+    parser.add_argument("--stages", default="1,4,16,64", help="Comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per stage")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds discarded at the start of each stage")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between calls of a user (exponential)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-p95-ms", type=float, default=1000.0, help="p95 latency limit used to report capacity")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate limit used to report capacity")
+    parser.add_argument("--size", type=int, default=200, help="Stand-in list size (with --serve)")
+    parser.add_argument("--spans", type=int, default=5000, help="Stand-in spans per query (with --serve)")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Stand-in latency per request (with --serve)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (with --serve)")
+    parser.add_argument("--cache-path", help="Shared cache database of the server (with --serve)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    if not args.url and not args.serve:
+        parser.error("either --url or --serve is required")
+
+    processes: List[subprocess.Popen] = []
+    try:
+        url = args.url
+        if args.serve:
+            args.fixtures, args.standin_port = None, None
+            standin, standin_url = start_standin(args)
+            processes.append(standin)
+            port = _free_port()
+            processes.append(start_server(standin_url, port, args.workers, args.cache_path, args.transport))
+            url = f"http://127.0.0.1:{port}" + ("/sse" if args.transport == "sse" else "/mcp/")
+
+        stages = [int(value) for value in args.stages.split(",")]
+        test = LoadTest(url, load_mix(args.mix, int(time.time())), args.seed, args.think_ms, args.settle, args.transport)
+        stage_results = asyncio.run(test.run(stages, args.duration))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+    results = {
+        "settings": {key: getattr(args, key) for key in ("url", "transport", "serve", "mix", "stages", "duration", "settle", "think_ms", "seed", "size", "spans", "latency_ms", "jitter_ms", "workers")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "stages": stage_results,
+        "capacity": capacity(stage_results, args.max_p95_ms, args.max_error_rate),
+    }
+    print(f"capacity: {results['capacity']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,447 @@
+"""Synthetic Datadog API payloads for the local stand-in.
+
+Every generator is deterministic for a given ``seed`` so benchmark runs see the same
+data, and ``size`` controls how many items a list endpoint returns.
+"""
+import math
+import random
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+SERVICES = ["web", "api-gateway", "checkout", "payments", "inventory", "users", "search", "notifications", "postgres", "redis"]
+MONITOR_STATES = ["OK", "OK", "OK", "Alert", "Warn", "No Data"]
+# Outgoing calls per service, used for trace trees and the service dependency map
+CALLS = {
+    "web": ["api-gateway"],
+    "api-gateway": ["checkout", "users", "search"],
+    "checkout": ["payments", "inventory", "redis"],
+    "payments": ["postgres"],
+    "inventory": ["postgres", "redis"],
+    "users": ["postgres", "redis"],
+    "search": ["redis"],
+    "notifications": ["users"],
+}
+
+
+def rng_for(*key: Any) -> random.Random:
+    """Random generator seeded from ``key`` so the same request always gets the same payload."""
+    return random.Random(zlib.crc32(repr(key).encode()))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+def monitor(monitor_id: int, rng: random.Random) -> Dict[str, Any]:
+    service = rng.choice(SERVICES)
+    created = _now() - rng.randint(86400, 86400 * 365)
+    return {
+        "id": monitor_id,
+        "name": f"[{service}] High latency on {service} #{monitor_id}",
+        "type": "metric alert",
+        "query": f"avg(last_5m):avg:trace.http.request.duration{{service:{service}}} > 0.5",
+        "message": f"Latency above threshold on {service} @slack-sre",
+        "tags": [f"service:{service}", "team:sre", f"env:{rng.choice(['prod', 'staging'])}"],
+        "overall_state": rng.choice(MONITOR_STATES),
+        "created": _iso(created),
+        "modified": _iso(created + rng.randint(0, 86400 * 30)),
+        "options": {"notify_no_data": False, "thresholds": {"critical": 0.5, "warning": 0.3}},
+        "priority": rng.randint(1, 5),
+    }
+
+
+def monitors(size: int, seed: Any = "monitors") -> List[Dict[str, Any]]:
+    rng = rng_for(seed)
+    return [monitor(1000 + i, rng) for i in range(size)]
+
+
+def monitor_search(size: int, page: int, per_page: int, query: str = "") -> Dict[str, Any]:
+    rng = rng_for("monitor_search", query)
+    start = page * per_page
+    results = []
+    for i in range(start, min(start + per_page, size)):
+        item = monitor(1000 + i, rng)
+        results.append({
+            "id": item["id"],
+            "name": item["name"],
+            "query": item["query"],
+            "status": item["overall_state"],
+            "tags": item["tags"],
+            "type": item["type"],
+            "classification": "metric",
+            "last_triggered_ts": int(_now()) - rng.randint(0, 86400),
+            "metrics": ["trace.http.request.duration"],
+            "notifications": [],
+            "org_id": 1,
+            "scopes": [tag for tag in item["tags"] if tag.startswith("service:")],
+        })
+    states: Dict[str, int] = {}
+    for item in results:
+        states[item["status"]] = states.get(item["status"], 0) + 1
+    return {
+        "counts": {"status": [{"name": name, "count": count} for name, count in states.items()]},
+        "metadata": {"page": page, "page_count": -(-size // per_page), "per_page": per_page, "total_count": size},
+        "monitors": results,
+    }
+
+
+# Datadog's default rollup per query range, as (longest range, interval) in seconds
+ROLLUPS = [(3600, 20), (4 * 3600, 60), (86400, 300), (2 * 86400, 600), (7 * 86400, 3600), (31 * 86400, 4 * 3600)]
+
+
+def _split_queries(query: str) -> List[str]:
+    """Queries joined by top-level commas, as the query endpoint accepts them."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(query):
+        if char in "{(":
+            depth += 1
+        elif char in "})":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(query[start:i].strip())
+            start = i + 1
+    parts.append(query[start:].strip())
+    return parts
+
+
+def metrics_query(query: str, from_ts: int, to_ts: int, series: int) -> Dict[str, Any]:
+    """Series of each comma-separated query, with points on the rollup boundaries Datadog uses for the range.
+
+    A point's value only depends on the query, the series and its timestamp, so the
+    points of a range are the same whichever enclosing range is queried.
+    """
+    interval = next((interval for longest, interval in ROLLUPS if to_ts - from_ts <= longest), 86400)
+    timestamps = range(-(-from_ts // interval) * interval, to_ts + 1, interval)[:1500]
+    result = []
+    for index, expression in enumerate(_split_queries(query)):
+        for s in range(series):
+            base = rng_for("query", expression, s).uniform(10, 100)
+            pointlist = [[float(ts * 1000), round(base * (1 + 0.1 * math.sin(ts / 600 + s)), 4)] for ts in timestamps]
+            result.append({
+                "metric": expression.split(":")[1].split("{")[0] if ":" in expression else expression,
+                "display_name": expression,
+                "expression": expression,
+                "scope": f"host:i-{s:05d}",
+                "tag_set": [f"host:i-{s:05d}"],
+                "aggr": "avg",
+                "interval": interval,
+                "length": len(pointlist),
+                "query_index": index,
+                "start": from_ts * 1000,
+                "end": to_ts * 1000,
+                "pointlist": pointlist,
+            })
+    return {"status": "ok", "res_type": "time_series", "query": query, "from_date": from_ts * 1000, "to_date": to_ts * 1000, "series": result}
+
+
+def dashboards(size: int) -> Dict[str, Any]:
+    rng = rng_for("dashboards")
+    items = []
+    for i in range(size):
+        dashboard_id = f"{rng.choice('abcdefghij')}{i:02d}-{rng.randint(100, 999)}-{rng.randint(100, 999)}"
+        created = _now() - rng.randint(86400, 86400 * 365)
+        items.append({
+            "id": dashboard_id,
+            "title": f"{rng.choice(SERVICES)} overview {i}",
+            "description": "Service health overview",
+            "layout_type": "ordered",
+            "is_read_only": False,
+            "url": f"/dashboard/{dashboard_id}",
+            "author_handle": "sre@example.com",
+            "created_at": _iso(created),
+            "modified_at": _iso(created + rng.randint(0, 86400 * 30)),
+        })
+    return {"dashboards": items}
+
+
+def hosts(size: int, count: int, start: int = 0) -> Dict[str, Any]:
+    rng = rng_for("hosts")
+    host_list = []
+    for i in range(start, min(start + count, size)):
+        name = f"i-{i:05d}.prod.internal"
+        host_list.append({
+            "id": 10_000 + i,
+            "name": name,
+            "host_name": name,
+            "aliases": [f"i-{i:05d}"],
+            "apps": ["agent", "ntp", rng.choice(["nginx", "postgres", "redis", "jvm"])],
+            "is_muted": rng.random() < 0.05,
+            "last_reported_time": int(_now()) - rng.randint(0, 300),
+            "up": rng.random() > 0.02,
+            "sources": ["aws", "agent"],
+            "meta": {"platform": "linux", "processor": "Intel(R) Xeon(R)", "cpuCores": 8},
+            "metrics": {"cpu": round(rng.uniform(1, 90), 2), "iowait": round(rng.uniform(0, 5), 2), "load": round(rng.uniform(0, 4), 2)},
+            "tags_by_source": {"Datadog": [f"service:{rng.choice(SERVICES)}", "env:prod"]},
+        })
+    return {"host_list": host_list, "total_matching": size, "total_returned": len(host_list)}
+
+
+# Metric name parts: APM operations per service, host metrics and custom application metrics
+TRACE_OPERATIONS = ["http.request", "grpc.server", "postgres.query", "redis.command", "kafka.consume"]
+TRACE_SUFFIXES = ["duration", "hits", "errors", "apdex", "duration.by.service.99p"]
+SYSTEM_METRICS = [
+    "system.cpu.user", "system.cpu.system", "system.cpu.iowait", "system.cpu.idle", "system.load.1", "system.load.5",
+    "system.mem.used", "system.mem.free", "system.disk.in_use", "system.disk.read_time", "system.net.bytes_rcvd",
+    "system.net.bytes_sent", "container.cpu.usage", "container.memory.usage", "kubernetes.pods.running",
+]
+CUSTOM_AREAS = ["orders", "cart", "auth", "queue", "cache", "jobs", "db", "api", "sessions", "emails"]
+CUSTOM_MEASURES = ["count", "latency", "errors", "size", "retries", "inflight", "dropped", "processed"]
+
+
+def metric_names(size: int) -> List[str]:
+    """About ``20 * size`` active metric names, sorted."""
+    names = list(SYSTEM_METRICS)
+    names += [f"trace.{operation}.{suffix}" for operation in TRACE_OPERATIONS for suffix in TRACE_SUFFIXES]
+    names += [f"trace.{service}.request.{suffix}" for service in SERVICES for suffix in TRACE_SUFFIXES]
+    rng = rng_for("metric_names")
+    while len(names) < 20 * size:
+        names.append(f"{rng.choice(SERVICES)}.{rng.choice(CUSTOM_AREAS)}.{rng.choice(CUSTOM_MEASURES)}.{len(names)}")
+    return sorted(set(names))
+
+
+def metric_metadata(name: str) -> Dict[str, Any]:
+    last = name.rsplit(".", 2)[-2] if name.split(".")[-1].isdigit() else name.rsplit(".", 1)[-1]
+    units = {"duration": ("second", "distribution"), "latency": ("millisecond", "gauge"), "size": ("byte", "gauge"),
+             "hits": ("hit", "count"), "errors": ("error", "count"), "count": (None, "count")}
+    unit, metric_type = units.get(last, ("percent" if name.startswith("system.cpu") else None, "gauge"))
+    return {"description": f"Synthetic {name}", "integration": None, "per_unit": None, "short_name": last, "type": metric_type, "unit": unit}
+
+
+def metric_tags(name: str) -> Dict[str, Any]:
+    rng = rng_for("metric_tags", name)
+    tags = sorted({f"service:{rng.choice(SERVICES)}" for _ in range(3)} | {"env:prod", "env:staging"})
+    return {"data": {"id": name, "type": "metrics", "attributes": {"tags": tags}}}
+
+
+def host_totals(size: int) -> Dict[str, Any]:
+    return {"total_active": size, "total_up": size - size // 50}
+
+
+def events(size: int, limit: int, query: str = "") -> Dict[str, Any]:
+    rng = rng_for("events", query)
+    now = _now()
+    data = []
+    for i in range(min(size, limit)):
+        service = rng.choice(SERVICES)
+        data.append({
+            "id": f"AAAAAY{i:010d}",
+            "type": "event",
+            "attributes": {
+                "timestamp": _iso(now - rng.randint(0, 3600)),
+                "message": f"Deployment of {service} version 1.{rng.randint(0, 50)}.{rng.randint(0, 9)} finished",
+                "tags": [f"service:{service}", "source:deploy", "env:prod"],
+            },
+        })
+    return {"data": data, "meta": {"elapsed": rng.randint(5, 50), "request_id": "standin", "status": "done", "page": {}}, "links": {}}
+
+
+def incident(i: int, rng: random.Random) -> Dict[str, Any]:
+    created = _now() - rng.randint(3600, 86400 * 90)
+    return {
+        "id": f"00000000-0000-4000-8000-{i:012d}",
+        "type": "incidents",
+        "attributes": {
+            "title": f"{rng.choice(SERVICES)} degraded: elevated 5xx rate",
+            "created": _iso(created),
+            "modified": _iso(created + rng.randint(60, 7200)),
+            "customer_impacted": rng.random() < 0.3,
+            "severity": rng.choice(["SEV-1", "SEV-2", "SEV-3", "SEV-4"]),
+            "state": rng.choice(["active", "stable", "resolved"]),
+            "public_id": i,
+        },
+        "relationships": {},
+    }
+
+
+def incidents(size: int, page_size: int, page_offset: int) -> Dict[str, Any]:
+    rng = rng_for("incidents")
+    data = [incident(i, rng) for i in range(page_offset, min(page_offset + page_size, size))]
+    next_offset = page_offset + len(data)
+    return {"data": data, "meta": {"pagination": {"offset": page_offset, "size": len(data), "next_offset": next_offset if next_offset < size else None}}}
+
+
+def incident_search(size: int, page_size: int, page_offset: int, query: str = "") -> Dict[str, Any]:
+    rng = rng_for("incidents", query)
+    data = [{"data": incident(i, rng)} for i in range(page_offset, min(page_offset + page_size, size))]
+    return {
+        "data": {"type": "incidents_search_results", "attributes": {"facets": {}, "incidents": data, "total": size}},
+        "meta": {"pagination": {"offset": page_offset, "size": len(data)}},
+    }
+
+
+def _span(trace_id: str, span_id: str, parent_id: str, service: str, resource: str, start: float, duration: float, error: bool) -> Dict[str, Any]:
+    return {
+        "id": f"{trace_id}-{span_id}",
+        "type": "spans",
+        "attributes": {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "service": service,
+            "resource_name": resource,
+            "type": "db" if service in ("postgres", "redis") else "web",
+            "env": "prod",
+            "host": f"i-{int(span_id) % 200:05d}",
+            "start_timestamp": _iso(start),
+            "end_timestamp": _iso(start + duration),
+            "tags": ["env:prod", f"service:{service}"] + (["status:error"] if error else []),
+            "custom": {"duration": int(duration * 1e9), "error": 1 if error else 0},
+            "attributes": {},
+        },
+    }
+
+
+def trace(trace_id: str, start: Optional[float] = None, max_spans: int = 40) -> List[Dict[str, Any]]:
+    """One request tree following CALLS; children run sequentially inside their parent."""
+    rng = rng_for("trace", trace_id)
+    start = start if start is not None else _now() - rng.uniform(60, 600)
+    spans: List[Dict[str, Any]] = []
+    counter = [0]
+
+    def visit(service: str, parent_id: str, begin: float, budget: float, depth: int) -> None:
+        counter[0] += 1
+        span_id = str(int(trace_id) % 10**9 * 1000 + counter[0])
+        error = rng.random() < 0.03
+        spans.append(_span(trace_id, span_id, parent_id, service, f"GET /{service}/{rng.randint(1, 5)}", begin, budget, error))
+        callees = CALLS.get(service, [])
+        if not callees or depth > 5 or len(spans) >= max_spans:
+            return
+        cursor = begin + budget * 0.05
+        for callee in callees:
+            if len(spans) >= max_spans:
+                return
+            share = budget * rng.uniform(0.1, 0.8 / len(callees))
+            visit(callee, span_id, cursor, share, depth + 1)
+            cursor += share
+
+    visit("web", "0", start, rng.uniform(0.05, 2.0), 0)
+    return spans
+
+
+def span_stream(total: int, seed: Any = "spans") -> List[Dict[str, Any]]:
+    """``total`` spans from consecutive traces, in the order a search would page through them."""
+    rng = rng_for(seed)
+    spans: List[Dict[str, Any]] = []
+    while len(spans) < total:
+        spans.extend(trace(str(rng.randint(10**17, 10**18))))
+    return spans[:total]
+
+
+def spans_page(spans: List[Dict[str, Any]], cursor: Optional[str], limit: int) -> Dict[str, Any]:
+    offset = int(cursor or 0)
+    page = spans[offset:offset + limit]
+    # Like the real API, a full page always carries a cursor, possibly to an empty page
+    after = str(offset + limit) if len(page) == limit else None
+    meta: Dict[str, Any] = {"elapsed": 12, "request_id": "standin", "status": "done", "page": {"after": after} if after else {}}
+    return {"data": page, "meta": meta, "links": {}}
+
+
+def slos(size: int, limit: int, offset: int) -> Dict[str, Any]:
+    rng = rng_for("slos")
+    data = []
+    for i in range(offset, min(offset + limit, size)):
+        service = rng.choice(SERVICES)
+        data.append({
+            "id": f"slo{i:08d}",
+            "name": f"{service} availability {i}",
+            "type": "metric",
+            "tags": [f"service:{service}", "team:sre"],
+            "thresholds": [{"timeframe": "30d", "target": rng.choice([99.0, 99.5, 99.9, 99.95])}, {"timeframe": "7d", "target": 99.0}],
+            "query": {"numerator": f"sum:requests.ok{{service:{service}}}.as_count()", "denominator": f"sum:requests{{service:{service}}}.as_count()"},
+        })
+    return {"data": data, "metadata": {"page": {"total_count": size, "total_filtered_count": size}}}
+
+
+def slo_history(slo_id: str, from_ts: int, to_ts: int) -> Dict[str, Any]:
+    rng = rng_for("slo_history", slo_id, (to_ts - from_ts) // 3600)
+    sli = round(100 - abs(rng.gauss(0, 0.2)) * (3 if rng.random() < 0.1 else 1), 4)
+    return {"data": {"from_ts": from_ts, "to_ts": to_ts, "type": "metric", "overall": {"sli_value": sli, "span_precision": 2.0}}}
+
+
+def service_dependencies() -> Dict[str, Any]:
+    return {service: {"calls": CALLS.get(service, [])} for service in SERVICES}
+
+
+def service_dependency(service: str) -> Dict[str, Any]:
+    return {"calls": CALLS.get(service, []), "called_by": sorted(s for s, callees in CALLS.items() if service in callees)}
+
+
+
+
+# Transitions of the synthetic alert webhooks, weighted like a noisy day
+ALERT_TRANSITIONS = ["Triggered", "Triggered", "Recovered", "Recovered", "Warn", "Re-Triggered", "No Data"]
+
+
+def alert_webhooks(count: int, span_seconds: int = 3600, seed: Any = "webhooks") -> List[Dict[str, Any]]:
+    """Datadog alert webhook payloads, in the recommended template, spread over the last ``span_seconds``."""
+    rng = rng_for(seed)
+    now = _now()
+    alerts = []
+    for i in range(count):
+        monitor = 1000 + rng.randrange(max(1, count // 4))
+        service = SERVICES[monitor % len(SERVICES)]
+        transition = rng.choice(ALERT_TRANSITIONS)
+        alerts.append({
+            "id": str(7000000000 + i),
+            "title": f"[{transition}] [{service}] High latency on {service} #{monitor}",
+            "date": str(int((now - span_seconds + span_seconds * i / max(1, count)) * 1000)),
+            "monitor_id": str(monitor),
+            "transition": transition,
+            "alert_type": {"Recovered": "success", "Warn": "warning", "No Data": "info"}.get(transition, "error"),
+            "priority": "normal",
+            "tags": f"service:{service},team:sre,env:{rng.choice(['prod', 'staging'])}",
+            "hostname": f"host-{rng.randrange(50):04d}",
+            "scope": f"service:{service}",
+            "link": f"https://app.datadoghq.com/monitors/{monitor}",
+            "org": "standin",
+            "message": f"Latency above threshold on {service} @webhook-mcp-datadog",
+        })
+    return alerts
+
+
+def downtime(downtime_id: str, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Downtime resource of a v2 create request's attributes, as the API returns it."""
+    schedule = attributes.get("schedule") or {}
+    start, end = schedule.get("start") or _iso(_now()), schedule.get("end")
+    return {
+        "id": downtime_id,
+        "type": "downtime",
+        "attributes": {
+            "scope": attributes.get("scope", "*"),
+            "monitor_identifier": attributes.get("monitor_identifier") or {"monitor_tags": ["*"]},
+            "message": attributes.get("message") or "",
+            "display_timezone": attributes.get("display_timezone") or "UTC",
+            "mute_first_recovery_notification": False,
+            "notify_end_states": ["alert", "no data", "warn"],
+            "notify_end_types": ["expired"],
+            "schedule": {"start": start, "end": end},
+            "status": "active" if datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp() <= _now() else "scheduled",
+            "created": _iso(_now()),
+            "modified": _iso(_now()),
+            "canceled": None,
+        },
+    }
+
+
+def downtimes(size: int) -> List[Dict[str, Any]]:
+    """Active and scheduled downtimes on hosts, services and monitors."""
+    rng = rng_for("downtimes")
+    now = _now()
+    data = []
+    for i in range(size):
+        service = rng.choice(SERVICES)
+        scope = rng.choice([f"host:{service}-{rng.randrange(20):02d}", f"env:prod AND service:{service}", f"service:{service}"])
+        start = now + rng.choice([-7200, -600, 1800, 86400])
+        attributes = {
+            "scope": scope,
+            "monitor_identifier": rng.choice([{"monitor_tags": ["*"]}, {"monitor_id": 1000 + rng.randrange(size * 4)}]),
+            "message": f"Maintenance of {service}",
+            "schedule": {"start": _iso(start), "end": rng.choice([None, _iso(start + rng.choice([3600, 4 * 3600, 86400]))])},
+        }
+        data.append(downtime(f"dt{i:06d}-0000-0000-0000-000000000000", attributes))
+    return data
@@ -0,0 +1,219 @@
+"""Benchmark the MCP tools offline against the local Datadog API stand-in.
+
+Each scenario calls one tool through the FastMCP tool manager, as a client request
+would, and records wall-clock latency percentiles, CPU time, response size and the
+peak memory of one call. The stand-in runs in a subprocess so its CPU time is not
+counted against the tools.
+
+    python -m bench.run --iterations 20 --output bench-results.json
+    python -m bench.run --baseline bench-results.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _scenarios(now: int) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Tool arguments per scenario; built lazily so relative times are fixed per run."""
+    hour = now - 3600
+    return {
+        "search_monitors": lambda: {"query": "service:checkout"},
+        "get_monitor": lambda: {"monitor_id": 1042},
+        "query_metrics": lambda: {"query": "avg:system.cpu.user{*} by {host}", "from_time": hour, "to_time": now},
+        "list_dashboards": lambda: {},
+        "list_hosts": lambda: {},
+        "get_host_totals": lambda: {},
+        "search_metrics": lambda: {"query": "checkout request duration"},
+        "search_events": lambda: {"query": "source:deploy", "from_time": hour, "to_time": now},
+        "list_incidents": lambda: {},
+        "search_incidents": lambda: {"query": "state:active"},
+        "summarize_traces": lambda: {"query": "service:web", "from_time": hour, "to_time": now},
+        "analyze_trace": lambda: {"trace_id": "123456789012345678"},
+        "query_apm_latency": lambda: {"service_name": "checkout", "from_time": hour, "to_time": now},
+        "get_slo_burn_rates": lambda: {},
+        "list_service_dependencies": lambda: {"service_id": "checkout", "env": "prod"},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_standin(args: argparse.Namespace) -> "tuple[subprocess.Popen, str]":
+    """Run the stand-in in a subprocess and wait until it answers."""
+    port = args.standin_port or _free_port()
+    command = [
+        sys.executable, "-m", "bench.standin", "--port", str(port), "--size", str(args.size), "--spans", str(args.spans),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+    ]
+    if args.fixtures:
+        command += ["--fixtures", args.fixtures]
+    process = subprocess.Popen(command, cwd=ROOT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/healthz", timeout=0.5).raise_for_status()
+            return process, url
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Stand-in did not start on {url}")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _result_status(result: Any) -> str:
+    """Status of a tool result as returned by the tool manager (dicts for these tools)."""
+    if isinstance(result, dict):
+        return str(result.get("status", "success"))
+    return "success"
+
+
+def _clear_caches() -> None:
+    from utils.cache import TTLCache
+    for cache in TTLCache.instances:
+        cache.clear()
+
+
+async def run_scenario(mcp, name: str, arguments: Callable[[], Dict[str, Any]], iterations: int, warmup: int, warm_cache: bool) -> Dict[str, Any]:
+    async def call() -> Any:
+        if not warm_cache:
+            _clear_caches()
+        return await mcp._tool_manager.call_tool(name, arguments())
+
+    for _ in range(warmup):
+        await call()
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    size = 0
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = await call()
+        latencies.append(time.perf_counter() - start)
+        status = _result_status(result)
+        statuses[status] = statuses.get(status, 0) + 1
+        size = len(json.dumps(result, default=str))
+    cpu = time.process_time() - cpu_start
+
+    # Peak memory is measured on a separate call: tracemalloc slows every allocation down
+    tracemalloc.start()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "cpu_ms_per_call": round(cpu / iterations * 1000, 3),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "response_bytes": size,
+        "statuses": statuses,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, metrics: List[str]) -> List[str]:
+    """Scenarios and metrics that regressed by more than ``tolerance`` against ``baseline``."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric), current.get(metric)
+            if before and after is not None and after > before * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {before} -> {after} (+{(after / before - 1) * 100:.1f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the mcp-datadog tools")
+    parser.add_argument("--scenarios", help="Comma separated scenario names (default: all)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--warm-cache", action="store_true", help="Keep tool caches between calls instead of measuring cold calls")
+    parser.add_argument("--size", type=int, default=200, help="Items returned by the stand-in list endpoints")
+    parser.add_argument("--spans", type=int, default=5000, help="Spans returned by the stand-in span searches")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added by the stand-in to each request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="Recorded responses for the stand-in to replay")
+    parser.add_argument("--standin-url", help="Use an already running stand-in instead of starting one")
+    parser.add_argument("--standin-port", type=int)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default: 0.10)")
+    parser.add_argument("--compare", default="p50_ms,cpu_ms_per_call,peak_memory_kb", help="Metrics compared against the baseline")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.standin_url
+    if url is None:
+        process, url = start_standin(args)
+    try:
+        # The configuration is read at import time, so the environment must be set first
+        os.environ["DATADOG_API_URL"] = url
+        os.environ.setdefault("DATADOG_API_KEY", "bench")
+        os.environ.setdefault("DATADOG_APP_KEY", "bench")
+        os.environ["OTEL_TRACES_EXPORTER"] = "none"
+        sys.path.insert(0, str(ROOT))
+        import main as server
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        scenarios = _scenarios(int(time.time()))
+        selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+        results: Dict[str, Any] = {
+            "settings": {key: getattr(args, key) for key in ("iterations", "warmup", "warm_cache", "size", "spans", "latency_ms", "jitter_ms", "fixtures")},
+            "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+            "scenarios": {},
+        }
+        for name in selected:
+            result = asyncio.run(run_scenario(server.mcp, name, scenarios[name], args.iterations, args.warmup, args.warm_cache))
+            results["scenarios"][name] = result
+            print(f"{name:<28} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  cpu {result['cpu_ms_per_call']:>8.2f} ms  "
+                  f"peak {result['peak_memory_kb']:>9.1f} KB  {result['statuses']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance, args.compare.split(","))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
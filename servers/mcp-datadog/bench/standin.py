@@ -0,0 +1,304 @@
+"""Local stand-in for the Datadog API used by the benchmarks and load tests.
+
+Serves deterministic synthetic payloads (see ``bench.payloads``) for the endpoints the
+tools call, with configurable latency, jitter, slow-request tail and error rate. Responses recorded from
+the real API with ``--record-to`` are replayed in preference to synthetic data when
+the same directory is passed with ``--fixtures``.
+
+    python -m bench.standin --port 8126 --size 200 --latency-ms 40 --jitter-ms 10
+    DATADOG_API_URL=http://127.0.0.1:8126 python main.py
+"""
+import argparse
+import asyncio
+import functools
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from bench import payloads
+
+
+def fixture_name(method: str, path: str) -> str:
+    """File name of the recorded response for a request; the query string is ignored."""
+    return re.sub(r"[^A-Za-z0-9]+", "_", f"{method} {path}").strip("_") + ".json"
+
+
+class Standin:
+    """Request handlers sharing the stand-in settings."""
+
+    def __init__(
+        self,
+        size: int = 100,
+        spans: int = 5000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        fixtures: Optional[str] = None,
+        upstream: Optional[str] = None,
+        record_to: Optional[str] = None,
+        seed: int = 0,
+    ) -> None:
+        self.size = size
+        self.spans = spans
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.record_to = Path(record_to) if record_to else None
+        self.random = random.Random(seed)
+        self.requests = 0
+        # Downtimes by ID: a synthetic set, then the ones created through the stand-in
+        self.downtimes: Dict[str, Dict[str, Any]] = {item["id"]: item for item in payloads.downtimes(max(1, size // 10))}
+
+    async def _delay(self) -> None:
+        delay = self.latency_ms + (self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if self.slow_rate and self.random.random() < self.slow_rate:
+            delay += self.slow_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    @functools.lru_cache(maxsize=64)
+    def _span_stream(self, query: str) -> List[Dict[str, Any]]:
+        return payloads.span_stream(self.spans, seed=query)
+
+    async def _proxy(self, request: Request) -> Response:
+        """Forward the request to the real API and keep the response as a fixture."""
+        headers = {key: value for key, value in request.headers.items() if key.lower().startswith("dd-") or key.lower() in ("accept", "content-type")}
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            upstream = await client.request(
+                request.method, f"{self.upstream}{request.url.path}", params=request.query_params, content=await request.body(), headers=headers
+            )
+        if self.record_to is not None and upstream.status_code < 400:
+            self.record_to.mkdir(parents=True, exist_ok=True)
+            (self.record_to / fixture_name(request.method, request.url.path)).write_bytes(upstream.content)
+        return Response(upstream.content, status_code=upstream.status_code, media_type=upstream.headers.get("content-type"))
+
+    def _fixture(self, request: Request) -> Optional[Response]:
+        if self.fixtures is None:
+            return None
+        path = self.fixtures / fixture_name(request.method, request.url.path)
+        return Response(path.read_bytes(), media_type="application/json") if path.exists() else None
+
+    async def dispatch(self, request: Request) -> Response:
+        self.requests += 1
+        await self._delay()
+        if self.error_rate and self.random.random() < self.error_rate:
+            return JSONResponse({"errors": ["Service Unavailable (stand-in)"]}, status_code=503)
+        if self.upstream is not None:
+            return await self._proxy(request)
+        fixture = self._fixture(request)
+        if fixture is not None:
+            return fixture
+        handler = request.scope["endpoint_handler"]
+        return JSONResponse(await handler(request))
+
+    # Handlers return the JSON body for the synthetic response
+
+    async def list_monitors(self, request: Request) -> Any:
+        params = request.query_params
+        page_size = int(params.get("page_size", self.size))
+        page = int(params.get("page", 0))
+        return payloads.monitors(self.size)[page * page_size:(page + 1) * page_size]
+
+    async def search_monitors(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.monitor_search(self.size, int(params.get("page", 0)), int(params.get("per_page", 30)), params.get("query", ""))
+
+    async def get_monitor(self, request: Request) -> Any:
+        monitor_id = int(request.path_params["monitor_id"])
+        return payloads.monitor(monitor_id, payloads.rng_for("monitor", monitor_id))
+
+    async def query_metrics(self, request: Request) -> Any:
+        params = request.query_params
+        now = int(time.time())
+        return payloads.metrics_query(params.get("query", ""), int(params.get("from", now - 3600)), int(params.get("to", now)), series=max(1, self.size // 50))
+
+    async def list_active_metrics(self, request: Request) -> Any:
+        return {"from": request.query_params.get("from"), "metrics": payloads.metric_names(self.size)}
+
+    async def search_metrics(self, request: Request) -> Any:
+        term = (request.query_params.get("q") or "").removeprefix("metrics:")
+        return {"results": {"metrics": [name for name in payloads.metric_names(self.size) if term in name]}}
+
+    async def get_metric_metadata(self, request: Request) -> Any:
+        return payloads.metric_metadata(request.path_params["metric_name"])
+
+    async def list_metric_tags(self, request: Request) -> Any:
+        return payloads.metric_tags(request.path_params["metric_name"])
+
+    async def list_dashboards(self, request: Request) -> Any:
+        return payloads.dashboards(self.size)
+
+    async def list_hosts(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.hosts(self.size, int(params.get("count", 100)), int(params.get("start", 0)))
+
+    async def get_host_totals(self, request: Request) -> Any:
+        return payloads.host_totals(self.size)
+
+    async def search_events(self, request: Request) -> Any:
+        body = json.loads(await request.body() or b"{}")
+        limit = int((body.get("page") or {}).get("limit", 10))
+        return payloads.events(self.size, limit, (body.get("filter") or {}).get("query", ""))
+
+    async def list_incidents(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.incidents(self.size, int(params.get("page[size]", 10)), int(params.get("page[offset]", 0)))
+
+    async def search_incidents(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.incident_search(self.size, int(params.get("page[size]", 10)), int(params.get("page[offset]", 0)), params.get("query", ""))
+
+    async def search_spans(self, request: Request) -> Any:
+        attributes = (json.loads(await request.body() or b"{}").get("data") or {}).get("attributes") or {}
+        query = (attributes.get("filter") or {}).get("query", "")
+        page = attributes.get("page") or {}
+        match = re.search(r"trace_id:(\d+)", query)
+        spans = payloads.trace(match.group(1)) if match else self._span_stream(query)
+        return payloads.spans_page(spans, page.get("cursor"), int(page.get("limit", 10)))
+
+    async def list_slos(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.slos(self.size, int(params.get("limit", 1000)), int(params.get("offset", 0)))
+
+    async def get_slo_history(self, request: Request) -> Any:
+        params = request.query_params
+        return payloads.slo_history(request.path_params["slo_id"], int(params["from_ts"]), int(params["to_ts"]))
+
+    async def create_downtime(self, request: Request) -> Any:
+        attributes = (json.loads(await request.body() or b"{}").get("data") or {}).get("attributes") or {}
+        downtime_id = f"00000000-0000-0000-0000-{len(self.downtimes) + 1:012d}"
+        self.downtimes[downtime_id] = payloads.downtime(downtime_id, attributes)
+        return {"data": self.downtimes[downtime_id]}
+
+    async def list_downtimes(self, request: Request) -> Any:
+        params = request.query_params
+        offset, limit = int(params.get("page[offset]", 0)), int(params.get("page[limit]", 30))
+        items = list(self.downtimes.values())
+        return {"data": items[offset:offset + limit], "meta": {"page": {"total_filtered_count": len(items)}}}
+
+    async def get_downtime(self, request: Request) -> Any:
+        return {"data": self.downtimes[request.path_params["downtime_id"]]}
+
+    async def update_downtime(self, request: Request) -> Any:
+        current = self.downtimes[request.path_params["downtime_id"]]["attributes"]
+        changes = (json.loads(await request.body() or b"{}").get("data") or {}).get("attributes") or {}
+        schedule = {**current["schedule"], **(changes.get("schedule") or {})}
+        self.downtimes[request.path_params["downtime_id"]] = payloads.downtime(request.path_params["downtime_id"], {**current, **changes, "schedule": schedule})
+        return {"data": self.downtimes[request.path_params["downtime_id"]]}
+
+    async def cancel_downtime(self, request: Request) -> Any:
+        self.downtimes.pop(request.path_params["downtime_id"], None)
+        return {}
+
+    async def validate(self, request: Request) -> Any:
+        return {"valid": True}
+
+    async def service_dependencies(self, request: Request) -> Any:
+        return payloads.service_dependencies()
+
+    async def service_dependency(self, request: Request) -> Any:
+        return payloads.service_dependency(request.path_params["service"])
+
+    def routes(self) -> List[Route]:
+        def route(path: str, handler, methods=("GET",)) -> Route:
+            async def endpoint(request: Request) -> Response:
+                request.scope["endpoint_handler"] = handler
+                return await self.dispatch(request)
+            return Route(path, endpoint, methods=list(methods))
+
+        async def health(request: Request) -> Response:
+            return JSONResponse({"status": "ok", "requests": self.requests})
+
+        async def fallback(request: Request) -> Response:
+            # Endpoints without a synthetic payload are only served from fixtures or the upstream
+            await self._delay()
+            if self.upstream is not None:
+                return await self._proxy(request)
+            return self._fixture(request) or JSONResponse({"errors": [f"No stand-in for {request.method} {request.url.path}"]}, status_code=404)
+
+        return [
+            Route("/healthz", health),
+            route("/api/v1/monitor", self.list_monitors),
+            route("/api/v1/monitor/search", self.search_monitors),
+            route("/api/v1/monitor/{monitor_id:int}", self.get_monitor),
+            route("/api/v1/query", self.query_metrics),
+            route("/api/v1/metrics", self.list_active_metrics),
+            route("/api/v1/metrics/{metric_name}", self.get_metric_metadata),
+            route("/api/v1/search", self.search_metrics),
+            route("/api/v2/metrics/{metric_name}/all-tags", self.list_metric_tags),
+            route("/api/v1/dashboard", self.list_dashboards),
+            route("/api/v1/hosts", self.list_hosts),
+            route("/api/v1/hosts/totals", self.get_host_totals),
+            route("/api/v2/events/search", self.search_events, methods=("POST",)),
+            route("/api/v2/incidents", self.list_incidents),
+            route("/api/v2/incidents/search", self.search_incidents),
+            route("/api/v2/spans/events/search", self.search_spans, methods=("POST",)),
+            route("/api/v1/slo", self.list_slos),
+            route("/api/v1/slo/{slo_id}/history", self.get_slo_history),
+            route("/api/v2/downtime", self.create_downtime, methods=("POST",)),
+            route("/api/v2/downtime", self.list_downtimes),
+            route("/api/v2/downtime/{downtime_id}", self.get_downtime),
+            route("/api/v2/downtime/{downtime_id}", self.update_downtime, methods=("PATCH",)),
+            route("/api/v2/downtime/{downtime_id}", self.cancel_downtime, methods=("DELETE",)),
+            route("/api/v1/validate", self.validate),
+            route("/api/v1/service_dependencies", self.service_dependencies),
+            route("/api/v1/service_dependencies/{service}", self.service_dependency),
+            Route("/{path:path}", fallback, methods=["GET", "POST", "PUT", "PATCH", "DELETE"]),
+        ]
+
+
+def create_app(standin: Standin) -> Starlette:
+    return Starlette(routes=standin.routes())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Datadog API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8126)
+    parser.add_argument("--size", type=int, default=100, help="Items returned by list endpoints")
+    parser.add_argument("--spans", type=int, default=5000, help="Spans available to each span search query")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter around the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-ms more (latency tail)")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="Directory of recorded responses to replay")
+    parser.add_argument("--upstream", help="Proxy every request to this API URL, e.g. https://api.datadoghq.com")
+    parser.add_argument("--record-to", help="With --upstream, save successful responses as fixtures here")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    standin = Standin(
+        size=args.size,
+        spans=args.spans,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        fixtures=args.fixtures,
+        upstream=args.upstream,
+        record_to=args.record_to,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(standin), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare client-side latency of the SSE and streamable HTTP transports.
+
+For each transport, and for streamable HTTP both with and without server sessions,
+the server is started against the stand-in and three costs are measured: opening
+and initializing a session, one tool call on an open session, and a one-shot call
+(connect, initialize, call, close), which is what clients that open a session per
+tool call pay. The default tool and zero stand-in latency keep the
+upstream cost small so the transport overhead dominates.
+
+    python -m bench.transports --iterations 50 --output transports.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bench.load import connect, start_server
+from bench.run import _free_port, _percentile, start_standin
+
+# Variant name: (transport, endpoint path, MCP_STATELESS_HTTP)
+VARIANTS = {
+    "sse": ("sse", "/sse", "true"),
+    "streamable-http": ("streamable-http", "/mcp/", "false"),
+    "streamable-http-stateless": ("streamable-http", "/mcp/", "true"),
+}
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+async def measure(url: str, transport: str, tool: str, arguments: Dict[str, Any], iterations: int) -> Dict[str, Any]:
+    connects: List[float] = []
+    one_shots: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        async with connect(url, transport) as session:
+            connects.append(time.perf_counter() - start)
+            await session.call_tool(tool, arguments)
+        one_shots.append(time.perf_counter() - start)
+
+    calls: List[float] = []
+    async with connect(url, transport) as session:
+        await session.call_tool(tool, arguments)
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await session.call_tool(tool, arguments)
+            calls.append(time.perf_counter() - start)
+
+    return {"connect": _stats(connects), "call": _stats(calls), "one_shot": _stats(one_shots)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SSE vs streamable HTTP latency")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--tool", default="get_host_totals")
+    parser.add_argument("--arguments", default="{}", help="Tool arguments as JSON")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stand-in latency per upstream request")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    args.size, args.spans, args.jitter_ms, args.fixtures, args.standin_port = 100, 1000, 0.0, None, None
+
+    standin, standin_url = start_standin(args)
+    results: Dict[str, Any] = {"settings": {"iterations": args.iterations, "tool": args.tool, "latency_ms": args.latency_ms}, "transports": {}}
+    try:
+        for variant, (transport, path, stateless) in VARIANTS.items():
+            port = _free_port()
+            os.environ["MCP_STATELESS_HTTP"] = stateless
+            server = start_server(standin_url, port, transport=transport)
+            try:
+                result = asyncio.run(measure(f"http://127.0.0.1:{port}{path}", transport, args.tool, json.loads(args.arguments), args.iterations))
+            finally:
+                server.terminate()
+                server.wait()
+            results["transports"][variant] = result
+            print(f"{variant:<26} connect p50 {result['connect']['p50_ms']:>7.2f} ms  call p50 {result['call']['p50_ms']:>7.2f} ms  "
+                  f"p95 {result['call']['p95_ms']:>7.2f} ms  one-shot p50 {result['one_shot']['p50_ms']:>7.2f} ms")
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Replay Datadog alert webhooks against the ingestion endpoint of a running server.
+
+Payloads come from ``--file`` (a JSON list or one JSON payload per line, e.g. deliveries
+captured from Datadog) or are synthetic (``--count``, see ``bench.payloads.alert_webhooks``).
+They are posted ``--batch`` per request by ``--concurrency`` senders, optionally capped at
+``--rate`` requests per second, and ``--repeat`` replays the whole set to check that
+redelivered alerts are stored once. Reports throughput, latency percentiles and the
+stored and duplicate counts the endpoint answered.
+
+    python -m bench.webhooks --serve --count 5000 --concurrency 8
+    python -m bench.webhooks --url http://localhost:8000/webhooks/datadog --secret s3cret --file alerts.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from bench import payloads
+from bench.run import _free_port, _percentile
+
+
+def load_payloads(path: str) -> List[Dict[str, Any]]:
+    """Payloads of a JSON list file or of a file with one JSON payload per line."""
+    text = Path(path).read_text()
+    try:
+        loaded = json.loads(text)
+        return loaded if isinstance(loaded, list) else [loaded]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def replay(url: str, secret: str, alerts: List[Dict[str, Any]], batch: int, concurrency: int, rate: float, org: Optional[str] = None) -> Dict[str, Any]:
+    """Post ``alerts`` to ``url`` and summarise the deliveries."""
+    bodies = [alerts[i:i + batch] if batch > 1 else alerts[i] for i in range(0, len(alerts), batch)]
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+    latencies: List[float] = []
+    totals = {"stored": 0, "duplicates": 0, "errors": 0}
+    interval = 1.0 / rate if rate else 0.0
+    next_send = [time.monotonic()]
+
+    async def sender(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            body = queue.get_nowait()
+            if interval:
+                now = time.monotonic()
+                wait, next_send[0] = next_send[0] - now, max(next_send[0], now) + interval
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=body, headers={"X-Webhook-Secret": secret}, params={"org": org} if org else None)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    totals["errors"] += 1
+                    continue
+                content = response.json()
+                totals["stored"] += content.get("stored", 0)
+                totals["duplicates"] += content.get("duplicates", 0)
+            except httpx.HTTPError:
+                totals["errors"] += 1
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await asyncio.gather(*(sender(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(bodies),
+        "alerts": len(alerts),
+        **totals,
+        "elapsed_s": round(elapsed, 3),
+        "alerts_per_s": round(len(alerts) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay Datadog alert webhooks against mcp-datadog")
+    parser.add_argument("--url", help="Webhook endpoint of a running server, e.g. http://localhost:8000/webhooks/datadog")
+    parser.add_argument("--serve", action="store_true", help="Start mcp-datadog locally, with a temporary alert store, instead of using --url")
+    parser.add_argument("--secret", default=os.environ.get("DATADOG_WEBHOOK_SECRET", "bench"), help="Shared webhook secret")
+    parser.add_argument("--org", help="Org the alerts belong to (default: the server's default org)")
+    parser.add_argument("--file", help="Payloads to replay (JSON list or JSON lines); default: synthetic alerts")
+    parser.add_argument("--count", type=int, default=1000, help="Synthetic alerts to send (without --file)")
+    parser.add_argument("--span-minutes", type=int, default=60, help="Minutes the synthetic alert dates are spread over")
+    parser.add_argument("--batch", type=int, default=1, help="Payloads per request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests per second (0 for no limit)")
+    parser.add_argument("--repeat", type=int, default=1, help="Times the whole set is sent")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    if not args.url and not args.serve:
+        parser.error("either --url or --serve is required")
+
+    alerts = load_payloads(args.file) if args.file else payloads.alert_webhooks(args.count, args.span_minutes * 60)
+    process: Optional[subprocess.Popen] = None
+    store = tempfile.TemporaryDirectory()
+    try:
+        url = args.url
+        if args.serve:
+            from bench.load import start_server
+            os.environ["DATADOG_WEBHOOK_SECRET"] = args.secret
+            os.environ["DATADOG_ALERT_STORE_PATH"] = str(Path(store.name) / "alerts.sqlite3")
+            port = _free_port()
+            # The replay needs no Datadog API; the server points at a closed port
+            process = start_server(f"http://127.0.0.1:{_free_port()}", port)
+            url = f"http://127.0.0.1:{port}/webhooks/datadog"
+        rounds = [asyncio.run(replay(url, args.secret, alerts, args.batch, args.concurrency, args.rate, args.org)) for _ in range(args.repeat)]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        store.cleanup()
+
+    results = {"settings": {key: getattr(args, key) for key in ("url", "serve", "org", "file", "count", "batch", "concurrency", "rate", "repeat")}, "rounds": rounds}
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if any(round_["errors"] for round_ in rounds) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
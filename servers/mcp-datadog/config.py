@@ -1,8 +1,19 @@
 import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, TextIO
 from dotenv import load_dotenv
-from datadog_api_client import Configuration, ApiClient
-from datadog_api_client.v2.api.users_api import UsersApi
-from datadog_api_client.v2.model.user import User
+from datadog_api_client import Configuration
+from datadog_api_client import ApiClient as BaseApiClient
+from datadog_api_client import rest
+from datadog_api_client.v1.api.authentication_api import AuthenticationApi
+from utils.breakers import call_upstream, configure_breakers
+from utils.cache import use_shared_cache
+from utils.deadlines import check_deadline, remaining_time
+from utils.metrics import track_upstream
+from utils.orgs import DEFAULT_ORG, current_org_name, set_default_org
+from utils.tracing import trace_upstream
 
 # Load environment variables
 load_dotenv()
@@ -11,42 +22,232 @@ load_dotenv()
 DATADOG_API_KEY = os.getenv("DATADOG_API_KEY")
 DATADOG_APP_KEY = os.getenv("DATADOG_APP_KEY")
 DATADOG_SITE = os.getenv("DATADOG_SITE", "datadoghq.com")
+# Base URL of the Datadog API; point it at a local stand-in (bench/standin.py) for offline runs
+DATADOG_API_URL = os.getenv("DATADOG_API_URL", f"https://api.{DATADOG_SITE}")
 
-# Initialize Datadog API Configuration
-configuration = Configuration()
-configuration.api_key["apiKeyAuth"] = DATADOG_API_KEY
-configuration.api_key["appKeyAuth"] = DATADOG_APP_KEY
-configuration.server_variables["site"] = DATADOG_SITE
-configuration.verify_ssl = True  # Consider setting to True for production
-# configuration.debug = True  # Enable debug mode
-
-def check_datadog_auth():
-    if not DATADOG_API_KEY or not DATADOG_APP_KEY:
-        print("❌ ERROR: DATADOG_API_KEY or DATADOG_APP_KEY not found in environment variables.")
+# Maximum number of concurrent upstream requests issued by batch tools
+DATADOG_MAX_CONCURRENCY = int(os.getenv("DATADOG_MAX_CONCURRENCY", "16"))
+
+# Datadog orgs served by this process, comma separated (e.g. "us,eu,staging"). Each org reads
+# DATADOG_<ORG>_API_KEY, _APP_KEY, _SITE, _API_URL and _RATE_LIMIT (requests per second, 0 for none),
+# falling back to the unprefixed variables. Empty serves a single org named "default".
+DATADOG_ORGS = [name.strip() for name in os.getenv("DATADOG_ORGS", "").split(",") if name.strip()] or [DEFAULT_ORG]
+DATADOG_DEFAULT_ORG = os.getenv("DATADOG_DEFAULT_ORG", DATADOG_ORGS[0])
+set_default_org(DATADOG_DEFAULT_ORG)
+
+# Hot datasets (catalogs) loaded at startup and kept warm: comma separated names, "*" for all, empty to skip
+# warm-up. Readiness (GET /ready) is only reported once they are loaded. The refresher wakes up every
+# DATADOG_PREFETCH_INTERVAL seconds (0 disables it) and reloads the datasets that are half their ttl old.
+DATADOG_WARMUP_DATASETS = [name.strip() for name in os.getenv("DATADOG_WARMUP_DATASETS", "*").split(",") if name.strip()]
+DATADOG_PREFETCH_INTERVAL = float(os.getenv("DATADOG_PREFETCH_INTERVAL", "15"))
+
+# Metric queries arriving within DATADOG_QUERY_BATCH_MS of each other (0 disables it) are fused into
+# fewer upstream calls, merging overlapping ranges and up to DATADOG_QUERY_BATCH_MAX queries per call
+DATADOG_QUERY_BATCH_MS = float(os.getenv("DATADOG_QUERY_BATCH_MS", "20"))
+DATADOG_QUERY_BATCH_MAX = int(os.getenv("DATADOG_QUERY_BATCH_MAX", "10"))
+
+# Tool results larger than DATADOG_RESULT_INLINE_BYTES of JSON (0 disables it) are kept on the server for
+# DATADOG_RESULT_TTL seconds; the tool returns a summary and a handle to page through them with fetch_result
+DATADOG_RESULT_INLINE_BYTES = int(os.getenv("DATADOG_RESULT_INLINE_BYTES", "32768"))
+DATADOG_RESULT_TTL = float(os.getenv("DATADOG_RESULT_TTL", "1800"))
+
+# Seconds between two upstream polls of a subscribed resource (monitor, incident and host state)
+DATADOG_SUBSCRIPTION_INTERVAL = float(os.getenv("DATADOG_SUBSCRIPTION_INTERVAL", "30"))
+
+# Datadog alert webhooks are accepted on /webhooks/datadog when they carry this shared secret
+# (X-Webhook-Secret header); empty disables the endpoint
+DATADOG_WEBHOOK_SECRET = os.getenv("DATADOG_WEBHOOK_SECRET", "")
+# SQLite file of the received alerts, kept DATADOG_ALERT_STORE_RETENTION seconds and at most DATADOG_ALERT_STORE_MAX of them
+DATADOG_ALERT_STORE_PATH = os.getenv("DATADOG_ALERT_STORE_PATH", "./datadog-alerts.sqlite3")
+DATADOG_ALERT_STORE_RETENTION = float(os.getenv("DATADOG_ALERT_STORE_RETENTION", str(7 * 86400)))
+DATADOG_ALERT_STORE_MAX = int(os.getenv("DATADOG_ALERT_STORE_MAX", "100000"))
+
+# Circuit breaker per API family: opens when this share of the last DATADOG_BREAKER_WINDOW calls (at least
+# DATADOG_BREAKER_MIN_CALLS) failed with 429/5xx/timeouts or took DATADOG_BREAKER_SLOW_SECONDS or more,
+# then fails fast for DATADOG_BREAKER_OPEN_SECONDS before letting one probe call through
+DATADOG_BREAKER_FAILURE_RATE = float(os.getenv("DATADOG_BREAKER_FAILURE_RATE", "0.5"))
+DATADOG_BREAKER_SLOW_SECONDS = float(os.getenv("DATADOG_BREAKER_SLOW_SECONDS", "10"))
+DATADOG_BREAKER_WINDOW = int(os.getenv("DATADOG_BREAKER_WINDOW", "20"))
+DATADOG_BREAKER_MIN_CALLS = int(os.getenv("DATADOG_BREAKER_MIN_CALLS", "10"))
+DATADOG_BREAKER_OPEN_SECONDS = float(os.getenv("DATADOG_BREAKER_OPEN_SECONDS", "30"))
+# Hedged reads: send a GET again when it has not answered after its API family's recent p95 (at least DATADOG_HEDGE_MIN_MS)
+DATADOG_HEDGE_READS = os.getenv("DATADOG_HEDGE_READS", "false").lower() in ("1", "true", "yes")
+DATADOG_HEDGE_MIN_MS = float(os.getenv("DATADOG_HEDGE_MIN_MS", "50"))
+configure_breakers(
+    DATADOG_BREAKER_FAILURE_RATE,
+    DATADOG_BREAKER_SLOW_SECONDS,
+    DATADOG_BREAKER_WINDOW,
+    DATADOG_BREAKER_MIN_CALLS,
+    DATADOG_BREAKER_OPEN_SECONDS,
+    DATADOG_HEDGE_READS,
+    DATADOG_HEDGE_MIN_MS,
+)
+
+# Deadline of a tool call in seconds; clients can ask for a shorter one with "timeoutMs" in the request _meta
+DATADOG_TOOL_TIMEOUT = float(os.getenv("DATADOG_TOOL_TIMEOUT", "60"))
+# Per-tool deadlines overriding DATADOG_TOOL_TIMEOUT, as comma separated tool=seconds pairs
+DATADOG_TOOL_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=")
+        for item in os.getenv("DATADOG_TOOL_TIMEOUTS", "summarize_traces=300,analyze_trace=120,get_hourly_usage=300,get_slo_burn_rates=180").split(",")
+    )
+    if seconds.strip()
+}
+
+# MCP transport: "sse" or "streamable-http" (served on /mcp/)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "sse")
+# Stateless streamable HTTP keeps no session on the server, so any instance behind a load balancer can answer
+MCP_STATELESS_HTTP = os.getenv("MCP_STATELESS_HTTP", "true").lower() in ("1", "true", "yes")
+
+# Worker processes behind the server port; more than one starts a router that keeps each session on its worker
+DATADOG_WORKERS = int(os.getenv("DATADOG_WORKERS", "1"))
+# Workers listen on 127.0.0.1 from this port upwards
+DATADOG_WORKER_PORT_BASE = int(os.getenv("DATADOG_WORKER_PORT_BASE", "18000"))
+# SQLite file holding the caches shared by the workers; empty keeps caches in process memory
+# (with DATADOG_WORKERS > 1 it defaults to ./datadog-cache.sqlite3)
+DATADOG_CACHE_PATH = os.getenv("DATADOG_CACHE_PATH", "")
+use_shared_cache(DATADOG_CACHE_PATH)
+
+# Tool profiling: comma separated tool names to profile ("*" for all), empty disables it
+DATADOG_PROFILE_TOOLS = os.getenv("DATADOG_PROFILE_TOOLS", "")
+DATADOG_PROFILE_DIR = os.getenv("DATADOG_PROFILE_DIR", "./profiles")
+DATADOG_PROFILE_SLOWEST = int(os.getenv("DATADOG_PROFILE_SLOWEST", "20"))
+DATADOG_PROFILE_INTERVAL_MS = float(os.getenv("DATADOG_PROFILE_INTERVAL_MS", "5"))
+
+# Tracing: "none", "console", "file" (JSON lines in OTEL_TRACES_FILE) or "otlp" (OTEL_EXPORTER_OTLP_ENDPOINT)
+OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "none")
+OTEL_TRACES_FILE = os.getenv("OTEL_TRACES_FILE", "./traces.jsonl")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "mcp-datadog")
+
+
+class ApiClient(BaseApiClient):
+    """Datadog API client that records upstream request latency and a trace span per call.
+
+    The API family is taken from the endpoint template, e.g. ``/api/v1/monitor/{monitor_id}``
+    is reported as ``v1/monitor``. Inside a tool call, requests are refused once the call
+    is cancelled or out of time, and each request's timeout is capped at the time left.
+    Each family has its own circuit breaker, and reads may be hedged (``utils/breakers.py``).
+    Clients owned by an org also spend that org's request budget.
+    """
+
+    org: Optional["DatadogOrg"] = None
+
+    def _build_rest_client(self):
+        # One pooled connection per concurrent batch request instead of the client's default of 4
+        return rest.RESTClientObject(self.configuration, maxsize=DATADOG_MAX_CONCURRENCY)
+
+    def call_api(self, resource_path, method, *args, **kwargs):
+        check_deadline()
+        if self.org is not None and self.org.limiter is not None:
+            self.org.limiter.acquire()
+        remaining = remaining_time()
+        if remaining is not None and kwargs.get("request_timeout") is None:
+            kwargs["request_timeout"] = max(remaining, 0.001)
+        api = "/".join(resource_path.strip("/").split("/")[1:3])
+
+        def call():
+            with track_upstream(api), trace_upstream(api, method, resource_path):
+                return BaseApiClient.call_api(self, resource_path, method, *args, **kwargs)
+
+        return call_upstream(api, method, call, self.org.limiter if self.org is not None else None)
+
+
+def _org_setting(org: str, name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.getenv(f"DATADOG_{org.upper().replace('-', '_')}_{name}") or os.getenv(f"DATADOG_{name}", default)
+
+
+class DatadogOrg:
+    """Credentials, API client and request budget of one Datadog org.
+
+    The org's API client, and with it its connection pool, is created once and shared
+    by every tool call on that org.
+    """
+
+    def __init__(self, name: str) -> None:
+        # utils.concurrency reads DATADOG_MAX_CONCURRENCY from this module, so it is imported once that is set
+        from utils.concurrency import RateLimiter
+
+        self.name = name
+        self.api_key = _org_setting(name, "API_KEY")
+        self.app_key = _org_setting(name, "APP_KEY")
+        self.site = _org_setting(name, "SITE", "datadoghq.com")
+        api_url = _org_setting(name, "API_URL")
+        self.api_url = api_url or f"https://api.{self.site}"
+        rate_limit = float(_org_setting(name, "RATE_LIMIT", "0"))
+        self.limiter = RateLimiter(rate=rate_limit, burst=max(1, int(rate_limit))) if rate_limit > 0 else None
+
+        self.configuration = Configuration()
+        self.configuration.api_key["apiKeyAuth"] = self.api_key
+        self.configuration.api_key["appKeyAuth"] = self.app_key
+        self.configuration.server_variables["site"] = self.site
+        self.configuration.verify_ssl = True
+        if api_url:
+            self.configuration.host = api_url
+        # self.configuration.debug = True  # Enable debug mode
+        self._client: Optional[ApiClient] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> ApiClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    client = ApiClient(self.configuration)
+                    client.org = self
+                    self._client = client
+        return self._client
+
+
+ORGS: Dict[str, DatadogOrg] = {name: DatadogOrg(name) for name in DATADOG_ORGS}
+# Configuration of the default org
+configuration = ORGS[DATADOG_DEFAULT_ORG].configuration
+
+
+def current_org() -> DatadogOrg:
+    """Org selected for the running tool call (see ``utils.orgs.select_org``)."""
+    return ORGS[current_org_name()]
+
+
+@contextmanager
+def datadog_client() -> Iterator[ApiClient]:
+    """API client of the current org; it is shared, so leaving the block does not close it."""
+    yield current_org().client
+
+
+def enable_unstable_operations(*operations: str) -> None:
+    """Enable unstable API operations on every org."""
+    for org in ORGS.values():
+        for operation in operations:
+            org.configuration.unstable_operations[operation] = True
+
+
+def check_datadog_auth(org: DatadogOrg, file: TextIO = sys.stdout):
+    if not org.api_key or not org.app_key:
+        print(f"❌ ERROR: API or APP key of org '{org.name}' not found in environment variables.", file=file)
         return False
 
     try:
-        with ApiClient(configuration) as api_client:
-            api_instance = UsersApi(api_client)
-            # Try to get the current user or a list of users
-            # This call requires valid API and Application keys
-            current_user_response = api_instance.get_current_user()
-            
-            if isinstance(current_user_response.data, User):
-                print(f"✅ Authentication successful! Logged in as: {current_user_response.data.attributes.handle}")
+        with ApiClient(org.configuration) as api_client:
+            # Validates the API key; the application key is checked by the first call that needs it
+            response = AuthenticationApi(api_client).validate()
+
+            if response.get("valid"):
+                print(f"✅ Authentication successful for org '{org.name}'!", file=file)
                 return True
             else:
-                print("⚠️ Authentication might be partially successful, but could not retrieve user data.")
+                print("⚠️ Authentication might be partially successful, but the API key was not reported as valid.", file=file)
                 return False
 
     except Exception as e:
-        print(f"❌ Authentication failed! Error: {e}")
-        print("Please check your DATADOG_API_KEY, DATADOG_APP_KEY, and DATADOG_SITE settings.")
+        print(f"❌ Authentication failed! Error: {e}", file=file)
+        print("Please check your DATADOG_API_KEY, DATADOG_APP_KEY, and DATADOG_SITE settings.", file=file)
         return False
 
 if __name__ == "__main__":
-    print("Attempting to verify Datadog API authentication...")
-    if check_datadog_auth():
-        print("Datadog API authentication is configured correctly.")
-    else:
-        print("Datadog API authentication failed. Please review your setup.")
\ No newline at end of file
+    for org in ORGS.values():
+        print(f"Attempting to verify Datadog API authentication for org '{org.name}'...")
+        if check_datadog_auth(org):
+            print("Datadog API authentication is configured correctly.")
+        else:
+            print("Datadog API authentication failed. Please review your setup.")
\ No newline at end of file
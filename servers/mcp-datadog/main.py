@@ -1,22 +1,92 @@
 import logging
 import sys
+import anyio
+from typing import Optional
 from mcp.server.fastmcp import FastMCP
-from modules import mcp_tools  # Import tool functions
+from modules import inline_result_tools, mcp_tools, org_agnostic_tools, read_result, watched_views  # Import tool functions
 from pathlib import Path
 from mcp.server.fastmcp.resources import FileResource
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from utils.alert_store import MAX_WEBHOOK_BYTES, receive_webhook
+from utils.deadlines import with_deadline
+from utils.handles import store_large_results
+from utils.metrics import instrument_tool, render_metrics
+from utils.orgs import select_org
+from utils.profiling import profile_tool
+from utils.subscriptions import SubscriptionHub
+from utils.tracing import setup_tracing, trace_tool
+from utils.warmup import readiness, start_warmup
+from utils.workers import configure_worker, run_workers, worker_index
+from config import DATADOG_ORGS, DATADOG_PREFETCH_INTERVAL, DATADOG_SUBSCRIPTION_INTERVAL, DATADOG_TOOL_TIMEOUT, DATADOG_TOOL_TIMEOUTS, DATADOG_WARMUP_DATASETS, DATADOG_WORKERS, MCP_STATELESS_HTTP, MCP_TRANSPORT, OTEL_SERVICE_NAME, OTEL_TRACES_EXPORTER, OTEL_TRACES_FILE
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s', stream=sys.stderr) # Redirect logs to stderr
 
+setup_tracing(OTEL_TRACES_EXPORTER, OTEL_TRACES_FILE, OTEL_SERVICE_NAME)
+
 # Initialize MCP server
-mcp = FastMCP("Datadog Integration Service", host="0.0.0.0", port=8000)
+mcp = FastMCP("Datadog Integration Service", host="0.0.0.0", port=8000, stateless_http=MCP_STATELESS_HTTP)
 
 # Registra cada ferramenta apenas uma vez usando um conjunto
 registered_tools = set()
 for tool in mcp_tools:
     if tool.__name__ not in registered_tools:
-        mcp.tool()(tool)
+        deadline = with_deadline(DATADOG_TOOL_TIMEOUTS.get(tool.__name__, DATADOG_TOOL_TIMEOUT))
+        handler = profile_tool(tool)
+        # Oversized results are stored on the server and returned as a summary and a handle
+        if tool.__name__ not in inline_result_tools:
+            handler = store_large_results(handler)
+        handler = deadline(handler)
+        # With several orgs configured, each tool gets an optional 'org' argument
+        if len(DATADOG_ORGS) > 1 and tool.__name__ not in org_agnostic_tools:
+            handler = select_org(handler, DATADOG_ORGS)
+        mcp.tool()(trace_tool(instrument_tool(handler)))
         registered_tools.add(tool.__name__)
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Prometheus metrics for tool calls, upstream requests and caches."""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready(request: Request) -> Response:
+    """Readiness probe: 503 until the hot datasets are warm, so load balancers skip cold instances."""
+    is_ready, status = readiness()
+    return JSONResponse(status, status_code=200 if is_ready else 503)
+
+async def read_capped_body(request: Request, limit: int) -> Optional[bytes]:
+    """Body of ``request``, or None once it is larger than ``limit`` bytes, without reading more than that."""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        return None
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+@mcp.custom_route("/webhooks/datadog", methods=["POST"])
+async def datadog_webhook(request: Request) -> Response:
+    """Datadog alert webhooks, stored locally so alert activity is answered without polling the API."""
+    body = await read_capped_body(request, MAX_WEBHOOK_BYTES)
+    status, content = await anyio.to_thread.run_sync(receive_webhook, body, request.headers.get("x-webhook-secret"), request.query_params.get("org"))
+    return JSONResponse(content, status_code=status)
+
+# Monitor, incident and host state of each org, polled once for all subscribed sessions
+subscriptions = SubscriptionHub(mcp._mcp_server, DATADOG_SUBSCRIPTION_INTERVAL)
+for org in DATADOG_ORGS:
+    for view_name, view in watched_views.items():
+        uri = f"datadog://{org}/{view_name}"
+        mcp.resource(uri, name=f"{org}-{view_name}", description=view.__doc__, mime_type="application/json")(subscriptions.watch(uri, org, view))
+
+@mcp.resource("results://{handle}", mime_type="application/json")
+def stored_result_resource(handle: str) -> str:
+    """Full JSON of a large tool result stored under ``handle``."""
+    return read_result(handle)
+
 @mcp.resource("docs://modules")
 def view_documentation():
     """
@@ -38,5 +108,19 @@ def view_documentation():
 def review_code(code: str) -> str:
     return f"Please review this code:\n\n{code}"
 
+def run() -> None:
+    """Serve over MCP_TRANSPORT from one process, or from DATADOG_WORKERS processes behind a sticky router.
+
+    Each serving process warms its hot datasets in the background while it already accepts connections.
+    """
+    index = worker_index()
+    if index is not None:
+        configure_worker(mcp.settings, index)
+    elif DATADOG_WORKERS > 1:
+        run_workers(DATADOG_WORKERS, str(Path(__file__).resolve()), mcp.settings)
+        return
+    start_warmup(DATADOG_WARMUP_DATASETS, DATADOG_PREFETCH_INTERVAL)
+    mcp.run(transport=MCP_TRANSPORT)
+
 if __name__ == "__main__":
-    mcp.run(transport="sse")
+    run()
@@ -1,6 +1,7 @@
 # Import tools from all modules
 from .monitor import (
     get_monitor_status,
+    monitor_state,
     create_monitor_config_policy,
     update_monitor_config_policy,
     delete_monitor_config_policy,
@@ -12,11 +13,11 @@ from .monitor import (
     update_monitor,
 )
 from .dashboard import list_dashboards, list_prompts
-from .downtime import create_downtime, update_downtime, cancel_downtime
-from .host import list_hosts, mute_host, unmute_host, get_host_totals
-from .incident import search_incidents, list_incidents, get_incident
-from .trace import list_traces
-from .metrics import query_metrics, list_metrics, query_p99_latency, query_error_rate, query_downstream_latency
+from .downtime import create_downtime, create_downtimes, update_downtime, cancel_downtime, check_downtime_coverage
+from .host import list_hosts, mute_host, unmute_host, get_host_totals, host_state
+from .incident import search_incidents, list_incidents, get_incident, active_incidents
+from .trace import list_traces, summarize_traces, analyze_trace
+from .metrics import query_metrics, list_metrics, search_metrics, query_p99_latency, query_error_rate, query_downstream_latency
 from .logs import archive_logs
 from .events import delete_event, search_events, get_event
 from .tags import list_host_tags, add_host_tags, delete_host_tags
@@ -27,10 +28,21 @@ from .usage import get_hourly_usage
 from .alerts import mute_alert, unmute_alert
 from .apm import query_apm_errors, query_apm_latency, query_apm_spans
 from .root_cause import analyze_service_with_apm
+from .slo import get_slo_burn_rates
+from .service_dependencies import (
+    list_service_dependencies,
+    get_service_dependency_closure,
+    get_service_blast_radius,
+    find_service_dependency_path,
+)
+from .profiling import configure_tool_profiling, get_slowest_tool_calls
+from .orgs import list_orgs, compare_orgs
+from .results import fetch_result, read_result
+from .webhooks import search_alert_activity, get_recent_monitor_states
 # List of tools for registration
 mcp_tools = [
     ## Monitor tools
-    #get_monitor_status,
+    get_monitor_status,
     create_monitor_config_policy,
     update_monitor_config_policy,
     delete_monitor_config_policy,
@@ -45,8 +57,10 @@ mcp_tools = [
     list_prompts,
     ## Downtime tools
     create_downtime,
+    create_downtimes,
     update_downtime,
     cancel_downtime,
+    check_downtime_coverage,
     ## Host tools
     list_hosts,
     # mute_host,
@@ -58,9 +72,12 @@ mcp_tools = [
     get_incident,
     ## Trace tools
     list_traces,
+    summarize_traces,
+    analyze_trace,
     ## Metrics tools
     query_metrics,
     list_metrics,
+    search_metrics,
     query_p99_latency,
     query_error_rate,
     query_downstream_latency,
@@ -95,8 +112,47 @@ mcp_tools = [
     query_apm_errors,
     query_apm_latency,
     query_apm_spans,
-    # # Root Cause Analysis tools
-    # analyze_service_with_apm,
+    # Root Cause Analysis tools
+    analyze_service_with_apm,
+    # SLO tools
+    get_slo_burn_rates,
+    # Service Dependencies tools
+    list_service_dependencies,
+    get_service_dependency_closure,
+    get_service_blast_radius,
+    find_service_dependency_path,
+    # Profiling tools
+    configure_tool_profiling,
+    get_slowest_tool_calls,
+    # Org tools
+    list_orgs,
+    compare_orgs,
+    # Stored results tools
+    fetch_result,
+    # Alert webhook tools
+    search_alert_activity,
+    get_recent_monitor_states,
 ]
 
+# Tools that do not query one Datadog org, and so take no 'org' argument
+org_agnostic_tools = {
+    "configure_tool_profiling",
+    "get_slowest_tool_calls",
+    "list_orgs",
+    "compare_orgs",
+    "fetch_result",
+}
+
+# State views served as subscribable resources, as datadog://<org>/<name>
+watched_views = {
+    "monitors": monitor_state,
+    "incidents": active_incidents,
+    "hosts": host_state,
+}
+
+# Tools that return their result inline whatever its size
+inline_result_tools = {
+    "fetch_result",
+}
+
 # Todas as ferramentas já estão incluídas na lista mcp_tools acima
@@ -1,8 +1,7 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.monitors_api import MonitorsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 from datadog_api_client.exceptions import (
     ApiException
@@ -30,7 +29,7 @@ def mute_alert(
             - content (dict): Response data from the API if successful
     """
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             body = {"scope": scope, "end": end}
             response = monitors_api.mute_monitor(monitor_id, body=body)
@@ -56,7 +55,7 @@ def unmute_alert(
             - content (dict): Response data from the API if successful
     """
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             response = monitors_api.unmute_monitor(monitor_id)
             return {"status": "success", "message": "Alert unmuted successfully", "content": response.to_dict()}
@@ -1,15 +1,33 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v2.api.spans_api import SpansApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.queries import cached_query, normalize_search_query
+from utils.spans import SpanStreamSummary, iter_spans
 from datadog_api_client.exceptions import (
     ApiException
 )
 
 mcp = FastMCP("Datadog APM Service")
 
+
+def _search_spans(query: str, from_time: int, to_time: int, limit: int = 1000, sort: Optional[str] = None) -> Dict[str, Any]:
+    """One page of a spans search, cached by canonical query and rollup-aligned range."""
+    def load(query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {
+            "filter": {"query": query, "from": str(from_time), "to": str(to_time)},
+            "page": {"limit": limit},
+        }
+        if sort:
+            attributes["sort"] = sort
+        with datadog_client() as api_client:
+            response = SpansApi(api_client).list_spans(body={"data": {"attributes": attributes, "type": "search_request"}})
+            return response.to_dict()
+
+    return cached_query("spans", query, from_time, to_time, load, normalize=normalize_search_query, widen=True, limit=limit, sort=sort)
+
+
 @mcp.tool()
 def list_apm_traces(
     query: str = Field(..., description="The query to filter traces"),
@@ -31,25 +49,7 @@ def list_apm_traces(
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with the retrieved traces.
     """
     try:
-        with ApiClient(configuration) as api_client:
-            spans_api = SpansApi(api_client)
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": query,
-                                "from": str(from_time),
-                                "to": str(to_time),
-                            },
-                            "sort": sort,
-                            "page": {"limit": limit},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
-            return {"status": "success", "message": "APM traces retrieved successfully", "content": response.to_dict()}
+        return {"status": "success", "message": "APM traces retrieved successfully", "content": _search_spans(query, from_time, to_time, limit=limit, sort=sort)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while retrieving APM traces: {e}"}
     except Exception as e:
@@ -67,7 +67,7 @@ def get_apm_trace_details(
     Returns:
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with the trace details."""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             spans_api = SpansApi(api_client)
             response = spans_api.get_span(trace_id)
             return {"status": "success", "message": "APM trace details retrieved successfully", "content": response.to_dict()}
@@ -80,46 +80,34 @@ def get_apm_trace_details(
 def summarize_apm_traces(
     query: str = Field(..., description="The query to filter traces"),
     from_time: int = Field(..., description="Start time in epoch seconds"),
-    to_time: int = Field(..., description="End time in epoch seconds")
+    to_time: int = Field(..., description="End time in epoch seconds"),
+    max_spans: int = Field(default=10000, ge=1, le=100000, description="Maximum number of spans to scan")
 ) -> Dict[str, Any]:
     """Summarize APM trace statistics.
+
+    Spans are streamed page by page in a single pass, keeping only bounded exemplar
+    samples (slowest, errored and per service and status) alongside the statistics.
     
     Args:
         query (str): The query to filter traces.
         from_time (int): Start time in epoch seconds.
         to_time (int): End time in epoch seconds.
+        max_spans (int): Maximum number of spans to scan.
     
     Returns:
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with trace statistics
+        and exemplar spans
     """
+    def load(query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+        with datadog_client() as api_client:
+            summary = SpanStreamSummary()
+            for span in iter_spans(SpansApi(api_client), query, from_time, to_time, max_spans=max_spans):
+                summary.add(span)
+        return {**summary.to_dict(), "truncated": summary.span_count >= max_spans}
+
     try:
-        with ApiClient(configuration) as api_client:
-            spans_api = SpansApi(api_client)
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": query,
-                                "from": str(from_time),
-                                "to": str(to_time),
-                            },
-                            "page": {"limit": 1000},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
-            trace_count = len(response.data)
-            services = set(d.attributes.get("service", "unknown") for d in response.data)
-            return {
-                "status": "success",
-                "message": "Trace summary retrieved successfully",
-                "content": {
-                    "trace_count": trace_count,
-                    "services": list(services)
-                }
-            }
+        content = cached_query("span_summary", query, from_time, to_time, load, normalize=normalize_search_query, widen=True, max_spans=max_spans)
+        return {"status": "success", "message": "Trace summary retrieved successfully", "content": content}
     except Exception as e:
         return {"status": "error", "message": f"Error summarizing traces: {e}"}
 
@@ -139,25 +127,8 @@ def query_apm_errors(
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with the error metrics.
     """
     try:
-        with ApiClient(configuration) as api_client:
-            spans_api = SpansApi(api_client)
-            query = f"avg:trace.{service_name}.errors{99}percent"
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": query,
-                                "from": str(from_time),
-                                "to": str(to_time),
-                            },
-                            "page": {"limit": 1000},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
-            return {"status": "success", "message": "APM errors retrieved successfully", "content": response.to_dict()}
+        query = f"avg:trace.{service_name}.errors{99}percent"
+        return {"status": "success", "message": "APM errors retrieved successfully", "content": _search_spans(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying APM errors: {e}"}
     except Exception as e:
@@ -179,25 +150,8 @@ def query_apm_latency(
     Returns:
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with the latency metrics."""
     try:
-        with ApiClient(configuration) as api_client:
-            spans_api = SpansApi(api_client)
-            query = f"avg:trace.servlet.request.hits{{service:{service_name}}}"
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": query,
-                                "from": str(from_time),
-                                "to": str(to_time),
-                            },
-                            "page": {"limit": 1000},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
-            return {"status": "success", "message": "APM latency retrieved successfully", "content": response.to_dict()}
+        query = f"avg:trace.servlet.request.hits{{service:{service_name}}}"
+        return {"status": "success", "message": "APM latency retrieved successfully", "content": _search_spans(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying APM latency: {e}"}
     except Exception as e:
@@ -219,25 +173,8 @@ def query_apm_spans(
     Returns:
         Dict[str, Any]: A dictionary containing the status and message of the operation, along with the retrieved spans."""
     try:
-        with ApiClient(configuration) as api_client:
-            spans_api = SpansApi(api_client)
-            query = f"service:{service_name}"
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": query,
-                                "from": str(from_time),
-                                "to": str(to_time),
-                            },
-                            "page": {"limit": 1000},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
-            return {"status": "success", "message": "APM spans retrieved successfully", "content": response.to_dict()}
+        query = f"service:{service_name}"
+        return {"status": "success", "message": "APM spans retrieved successfully", "content": _search_spans(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying APM spans: {e}"}
     except Exception as e:
@@ -3,10 +3,10 @@ import json
 import time
 import logging
 import sys
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.dashboards_api import DashboardsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.warmup import hot_dataset
 
 mcp = FastMCP("Datadog Dashboards Service")
 
@@ -34,6 +34,14 @@ dashboard_list_schema = {
     }
 }
 
+@hot_dataset("dashboards", ttl=600)
+def dashboard_catalog() -> list[dict]:
+    """Id, title and tags of every dashboard."""
+    with datadog_client() as api_client:
+        response = DashboardsApi(api_client).list_dashboards(filter_shared=False)
+        dashboards = [d.to_dict() for d in (response.dashboards or [])] if response is not None else []
+        return [{"id": d["id"], "title": d.get("title"), "tags": d.get("tags") or []} for d in dashboards]
+
 @mcp.tool()
 def list_dashboards(
     name: str = Field(default=None, description="Filter dashboards by name"),
@@ -52,49 +60,35 @@ def list_dashboards(
                 - total (int): Total number of dashboards found
                 - message (str): Status message of the operation"""
     try:
-        with ApiClient(configuration) as api_client:
-            dashboards_api = DashboardsApi(api_client)
-            response = dashboards_api.list_dashboards(filter_shared=False)
-
-            if response is not None and response.dashboards is not None:
-                # Apply filters if provided
-                filtered_dashboards = response.dashboards
-                if name:
-                    search_term = name.lower()
-                    filtered_dashboards = [
-                        d for d in filtered_dashboards if d.title and search_term in d.title.lower()
-                    ]
-                if tags:
-                    filtered_dashboards = [
-                        d for d in filtered_dashboards if set(tags).issubset(set(d.tags or []))
-                    ]
+        # Served from the catalog kept warm in the background
+        filtered_dashboards = dashboard_catalog.get()
+        if name:
+            search_term = name.lower()
+            filtered_dashboards = [
+                d for d in filtered_dashboards if d["title"] and search_term in d["title"].lower()
+            ]
+        if tags:
+            filtered_dashboards = [
+                d for d in filtered_dashboards if set(tags).issubset(set(d["tags"]))
+            ]
 
-                dashboards_data = [
-                    DashboardResponse(
-                        id=d.id,
-                        title=d.title,
-                        url=f"https://app.datadoghq.com/dashboard/{d.id}"
-                    ).dict()
-                    for d in filtered_dashboards
-                ]
+        dashboards_data = [
+            DashboardResponse(
+                id=d["id"],
+                title=d["title"],
+                url=f"https://app.datadoghq.com/dashboard/{d['id']}"
+            ).dict()
+            for d in filtered_dashboards
+        ]
 
-                result = {
-                    "content": {
-                        "dashboards": dashboards_data,
-                        "total": len(dashboards_data),
-                        "message": "Successfully retrieved dashboards."
-                    }
-                }
-                return result
-            else:
-                result = {
-                    "content": {
-                        "dashboards": [],
-                        "total": 0,
-                        "message": "Error: Invalid response from Datadog API."
-                    }
-                }
-                return result
+        result = {
+            "content": {
+                "dashboards": dashboards_data,
+                "total": len(dashboards_data),
+                "message": "Successfully retrieved dashboards."
+            }
+        }
+        return result
     except Exception as e:
         return {
             "content": {
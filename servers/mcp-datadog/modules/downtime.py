@@ -1,12 +1,38 @@
-from typing import Optional, Dict, Any
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
-from datadog_api_client import ApiClient
-from datadog_api_client.v1.api.downtimes_api import DowntimesApi
-from config import configuration
+from datadog_api_client.exceptions import ApiException
+from datadog_api_client.v2.api.downtimes_api import DowntimesApi
+from datadog_api_client.v2.model.downtime_create_request import DowntimeCreateRequest
+from datadog_api_client.v2.model.downtime_create_request_attributes import DowntimeCreateRequestAttributes
+from datadog_api_client.v2.model.downtime_create_request_data import DowntimeCreateRequestData
+from datadog_api_client.v2.model.downtime_monitor_identifier_id import DowntimeMonitorIdentifierId
+from datadog_api_client.v2.model.downtime_monitor_identifier_tags import DowntimeMonitorIdentifierTags
+from datadog_api_client.v2.model.downtime_resource_type import DowntimeResourceType
+from datadog_api_client.v2.model.downtime_schedule_one_time_create_update_request import DowntimeScheduleOneTimeCreateUpdateRequest
+from datadog_api_client.v2.model.downtime_update_request import DowntimeUpdateRequest
+from datadog_api_client.v2.model.downtime_update_request_attributes import DowntimeUpdateRequestAttributes
+from datadog_api_client.v2.model.downtime_update_request_data import DowntimeUpdateRequestData
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.concurrency import RateLimiter, run_concurrently
+from utils.deadlines import check_deadline
+from utils.downtime_index import DowntimeIndex, DowntimeTarget, downtime_record, record_target
+from utils.orgs import PerOrg
+from utils.progress import report_progress
+from utils.warmup import hot_dataset
 
 mcp = FastMCP("Datadog Downtime Service")
 
+# Downtimes one bulk call may create, after scopes and monitors are combined
+MAX_BULK_DOWNTIMES = 500
+# Attempts per downtime when the API answers 429
+DOWNTIME_ATTEMPTS = 3
+
+# Downtime writes of a bulk call are spread under this budget per org, on top of the org's own rate limit
+_downtime_limiter = PerOrg(lambda: RateLimiter(rate=10.0, burst=20))
+
 class DowntimeResponse(BaseModel):
     id: int
     scope: str
@@ -14,45 +40,116 @@ class DowntimeResponse(BaseModel):
     start: int
     end: int
 
+@hot_dataset("downtimes", ttl=60)
+def downtime_catalog() -> List[Dict[str, Any]]:
+    """Scope, monitor and window of every active or scheduled downtime."""
+    with datadog_client() as api_client:
+        items = DowntimesApi(api_client).list_downtimes_with_pagination(page_limit=100)
+        return [record for record in (downtime_record(item.to_dict()) for item in items) if record is not None]
+
+# Interval index of the downtimes of each org, kept in step with the downtimes catalog
+_downtime_index = PerOrg(DowntimeIndex)
+
+
+@downtime_catalog.on_refresh
+def _sync_downtime_index(loaded_at: float, records: List[Dict[str, Any]]) -> None:
+    _downtime_index.get().sync(loaded_at, records)
+
+
+def downtime_index() -> DowntimeIndex:
+    """Index of the current org's downtimes, synced with the catalog."""
+    index = _downtime_index.get()
+    index.sync(*downtime_catalog.get_entry())
+    return index
+
+
+def _brief(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": record["id"],
+        **record_target(record).describe(),
+        "start": int(record["start"]),
+        "end": int(record["end"]) if record["end"] is not None else None,
+        "status": record["status"],
+    }
+
+
+def _silenced_by(target: DowntimeTarget, start: float, end: Optional[float], exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Downtimes that together already silence ``target`` over all of ``[start, end)``, or an empty list."""
+    covering, _ = downtime_index().related(target, start, end, exclude)
+    return covering if covering and not DowntimeIndex.gaps(covering, start, end) else []
+
+
+def _overlap_note(target: DowntimeTarget, start: float, end: Optional[float], exclude: Optional[str] = None) -> str:
+    covering, covered = downtime_index().related(target, start, end, exclude)
+    ids = [record["id"] for record in covering + covered]
+    return f"; it overlaps downtimes {', '.join(ids)}" if ids else ""
+
+
+def _downtime_request(target: DowntimeTarget, message: str, start: Optional[int], end: Optional[int], timezone: str) -> DowntimeCreateRequest:
+    if target.monitor_id is None:
+        monitor_identifier = DowntimeMonitorIdentifierTags(monitor_tags=sorted(target.monitor_tags) or ["*"])
+    else:
+        monitor_identifier = DowntimeMonitorIdentifierId(monitor_id=target.monitor_id)
+    schedule = {}
+    if start is not None:
+        schedule["start"] = datetime.fromtimestamp(start, tz=dt_timezone.utc)
+    if end is not None:
+        schedule["end"] = datetime.fromtimestamp(end, tz=dt_timezone.utc)
+    attributes = DowntimeCreateRequestAttributes(
+        scope=target.scope,
+        monitor_identifier=monitor_identifier,
+        message=message,
+        display_timezone=timezone,
+        schedule=DowntimeScheduleOneTimeCreateUpdateRequest(**schedule),
+    )
+    return DowntimeCreateRequest(data=DowntimeCreateRequestData(attributes=attributes, type=DowntimeResourceType.DOWNTIME))
+
 @mcp.tool()
 def create_downtime(
     scope: str = Field(..., description="The scope to apply the downtime to"),
     message: str = Field(default="", description="The message for the downtime"),
     start: int = Field(default_factory=lambda: int(time.time()), description="Start time in epoch seconds"),
     end: Optional[int] = Field(default=None, description="End time in epoch seconds"),
-    timezone: str = Field(default="UTC", description="Timezone for the downtime")
+    timezone: str = Field(default="UTC", description="Timezone for the downtime"),
+    monitor_id: Optional[int] = Field(default=None, description="Only silence this monitor (default: every monitor)"),
+    force: bool = Field(default=False, description="Create the downtime even if existing downtimes already silence the scope")
 ) -> Dict[str, Any]:
     """Create a new downtime.
-    
+
+    Existing downtimes are checked first, against the local downtime index: when they
+    already silence the scope and monitor for the whole window, nothing is created
+    unless ``force`` is set.
+
     Args:
         scope (str): The scope to apply the downtime to.
         message (str, optional): The message for the downtime.
         start (int, optional): Start time in epoch seconds. Defaults to current time.
         end (Optional[int], optional): End time in epoch seconds.
         timezone (str, optional): Timezone for the downtime. Defaults to "UTC".
+        monitor_id (Optional[int], optional): Only silence this monitor. Defaults to every monitor.
+        force (bool, optional): Create the downtime even if it duplicates existing ones. Defaults to False.
 
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
-            - content (dict): Response data from the API if successful"""
+            - content (dict): Response data from the API if successful, or the downtimes
+              already silencing the scope"""
     try:
-        with ApiClient(configuration) as api_client:
-            downtimes_api = DowntimesApi(api_client)
-            body = {
-                "data": {
-                    "type": "downtime",
-                    "attributes": {
-                        "scope": scope,
-                        "message": message,
-                        "start": start,
-                        "end": end,
-                        "timezone": timezone,
-                    },
-                }
+        target = DowntimeTarget(scope, monitor_id)
+        silenced_by = _silenced_by(target, start, end)
+        if silenced_by and not force:
+            return {
+                "status": "error",
+                "message": f"Already silenced for the whole window by downtimes {', '.join(record['id'] for record in silenced_by)}; use force to create it anyway",
+                "content": {"silenced_by": [_brief(record) for record in silenced_by]},
             }
-            response = downtimes_api.create_downtime(body)
-            return {"status": "success", "message": "Downtime created successfully", "content": response.to_dict()}
+        note = _overlap_note(target, start, end)
+        with datadog_client() as api_client:
+            downtimes_api = DowntimesApi(api_client)
+            response = downtimes_api.create_downtime(_downtime_request(target, message, start, end, timezone)).to_dict()
+            downtime_index().put(downtime_record(response["data"]))
+            return {"status": "success", "message": f"Downtime created successfully{note}", "content": response}
     except Exception as e:
         return {"status": "error", "message": f"Error creating downtime: {e}"}
 
@@ -61,15 +158,20 @@ def update_downtime(
     downtime_id: str = Field(..., description="The ID of the downtime to update"),
     scope: Optional[str] = Field(default=None, description="The new scope for the downtime"),
     message: Optional[str] = Field(default=None, description="The new message for the downtime"),
-    end: Optional[int] = Field(default=None, description="The new end time in epoch seconds")
+    end: Optional[int] = Field(default=None, description="The new end time in epoch seconds"),
+    force: bool = Field(default=False, description="Update the downtime even if other downtimes would then duplicate it")
 ) -> Dict[str, Any]:
     """Update an existing downtime.
 
+    When other downtimes would already silence the new scope for the whole window, the
+    downtime is left unchanged unless ``force`` is set.
+
     Args:
         downtime_id (str): The ID of the downtime to update.
         scope (Optional[str], optional): The new scope for the downtime.
         message (Optional[str], optional): The new message for the downtime.
         end (Optional[int], optional): The new end time in epoch seconds.
+        force (bool, optional): Update the downtime even if it then duplicates others. Defaults to False.
 
     Returns:
         Dict[str, Any]: A dictionary containing:
@@ -77,17 +179,34 @@ def update_downtime(
             - message (str): Description of the operation result
             - content (dict): Response data from the API if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             downtimes_api = DowntimesApi(api_client)
-            body = {"data": {"type": "downtime", "id": downtime_id, "attributes": {}}}
+            current = downtime_index().get(downtime_id) or downtime_record(downtimes_api.get_downtime(downtime_id).to_dict()["data"])
+            if current is None:
+                return {"status": "error", "message": f"Downtime {downtime_id} is canceled or has ended"}
+            if end and current["recurring"]:
+                return {"status": "error", "message": "The end of a recurring downtime cannot be changed here"}
+            target = DowntimeTarget(scope or current["scope"], current["monitor_id"], current["monitor_tags"])
+            window_end = end or current["end"]
+            silenced_by = _silenced_by(target, current["start"], window_end, exclude=downtime_id)
+            if silenced_by and not force:
+                return {
+                    "status": "error",
+                    "message": f"Downtimes {', '.join(record['id'] for record in silenced_by)} would already silence it for the whole window; use force to update it anyway",
+                    "content": {"silenced_by": [_brief(record) for record in silenced_by]},
+                }
+            note = _overlap_note(target, current["start"], window_end, exclude=downtime_id)
+            attributes = DowntimeUpdateRequestAttributes()
             if scope:
-                body["data"]["attributes"]["scope"] = scope
+                attributes.scope = target.scope
             if message:
-                body["data"]["attributes"]["message"] = message
+                attributes.message = message
             if end:
-                body["data"]["attributes"]["end"] = end
-            response = downtimes_api.update_downtime(downtime_id, body)
-            return {"status": "success", "message": "Downtime updated successfully", "content": response.to_dict()}
+                attributes.schedule = DowntimeScheduleOneTimeCreateUpdateRequest(end=datetime.fromtimestamp(end, tz=dt_timezone.utc))
+            body = DowntimeUpdateRequest(data=DowntimeUpdateRequestData(attributes=attributes, id=downtime_id, type=DowntimeResourceType.DOWNTIME))
+            response = downtimes_api.update_downtime(downtime_id, body).to_dict()
+            downtime_index().put(downtime_record(response["data"]), downtime_id)
+            return {"status": "success", "message": f"Downtime updated successfully{note}", "content": response}
     except Exception as e:
         return {"status": "error", "message": f"Error updating downtime: {e}"}
 
@@ -105,9 +224,174 @@ def cancel_downtime(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             downtimes_api = DowntimesApi(api_client)
             downtimes_api.cancel_downtime(downtime_id)
+            downtime_index().put(None, downtime_id)
             return {"status": "success", "message": "Downtime canceled successfully"}
     except Exception as e:
         return {"status": "error", "message": f"Error canceling downtime: {e}"}
+
+
+@mcp.tool()
+def check_downtime_coverage(
+    scope: str = Field(default="*", description="Scope to check (e.g., 'host:web-01' or 'env:prod AND service:checkout')"),
+    monitor_id: Optional[int] = Field(default=None, description="Monitor to check (default: every monitor)"),
+    start: Optional[int] = Field(default=None, description="Start of the window in epoch seconds (default: now)"),
+    end: Optional[int] = Field(default=None, description="End of the window in epoch seconds (default: only the start instant)")
+) -> Dict[str, Any]:
+    """Check whether a scope and monitor are silenced by downtimes, e.g. "is this alert silenced?".
+
+    Answered from the local index of active and scheduled downtimes, refreshed from the
+    Datadog API every minute and updated at once by the downtime tools of this server.
+
+    Args:
+        scope (str, optional): Scope to check. Defaults to '*'.
+        monitor_id (Optional[int], optional): Monitor to check. Defaults to every monitor.
+        start (Optional[int], optional): Start of the window in epoch seconds. Defaults to now.
+        end (Optional[int], optional): End of the window in epoch seconds. Defaults to the start instant only.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): silenced (whether the whole window is covered), covering
+              (downtimes silencing the scope), narrower (downtimes on part of the scope)
+              and gaps (parts of the window left unsilenced, an open end as None)"""
+    try:
+        start = int(time.time()) if start is None else start
+        end = start + 1 if end is None else end
+        if end <= start:
+            return {"status": "error", "message": "end must be after start"}
+        target = DowntimeTarget(scope, monitor_id)
+        covering, covered = downtime_index().related(target, start, end)
+        gaps = DowntimeIndex.gaps(covering, start, end)
+        if not gaps:
+            summary = f"Silenced for the whole window by {len(covering)} downtimes"
+        elif covering:
+            summary = f"Silenced for part of the window by {len(covering)} downtimes ({len(gaps)} gaps)"
+        else:
+            summary = "Not silenced"
+        return {
+            "status": "success",
+            "message": summary,
+            "content": {
+                "target": target.describe(),
+                "silenced": not gaps,
+                "covering": [_brief(record) for record in covering],
+                "narrower": [_brief(record) for record in covered],
+                "gaps": [[int(gap_start), int(gap_end) if gap_end is not None else None] for gap_start, gap_end in gaps],
+            },
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error checking downtime coverage: {e}"}
+
+
+def plan_downtimes(scopes: List[str], monitor_ids: List[int]) -> Tuple[List[DowntimeTarget], List[Tuple[DowntimeTarget, DowntimeTarget]]]:
+    """Downtimes to create for every scope and monitor pair, and the (skipped, covered by) pairs another one covers."""
+    targets = [DowntimeTarget(scope, monitor_id) for scope in scopes or ["*"] for monitor_id in monitor_ids or [None]]
+    # Widest first, so each target is compared with the ones that could cover it
+    targets.sort(key=lambda target: target.breadth)
+    kept: List[DowntimeTarget] = []
+    skipped = []
+    for target in targets:
+        cover = next((other for other in kept if other.covers(target)), None)
+        if cover is None:
+            kept.append(target)
+        else:
+            skipped.append((target, cover))
+    return kept, skipped
+
+
+def _create_one(downtimes_api: DowntimesApi, request: DowntimeCreateRequest) -> str:
+    """Create one downtime, waiting out 429 answers; returns its ID."""
+    for attempt in range(1, DOWNTIME_ATTEMPTS + 1):
+        _downtime_limiter.get().acquire()
+        try:
+            record = downtime_record(downtimes_api.create_downtime(request).to_dict()["data"])
+            downtime_index().put(record)
+            return record["id"]
+        except ApiException as e:
+            if e.status != 429 or attempt == DOWNTIME_ATTEMPTS:
+                raise
+            reset = (e.headers or {}).get("x-ratelimit-reset")
+            wait = float(reset) if reset and reset.isdigit() else float(attempt)
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                check_deadline()
+                time.sleep(min(0.2, deadline - time.monotonic()))
+    raise RuntimeError("Downtime was not created")
+
+
+@mcp.tool()
+def create_downtimes(
+    scopes: Optional[List[str]] = Field(default=None, description="Scopes to silence, one downtime each (e.g., ['host:web-01', 'env:prod AND service:checkout']); default: '*'"),
+    monitor_ids: Optional[List[int]] = Field(default=None, description="Monitors to silence; with scopes, each monitor is silenced on each scope; default: every monitor"),
+    message: str = Field(default="", description="The message for the downtimes"),
+    start: Optional[int] = Field(default=None, description="Start time in epoch seconds (default: now)"),
+    end: Optional[int] = Field(default=None, description="End time in epoch seconds (default: no end)"),
+    timezone: str = Field(default="UTC", description="Timezone for the downtimes"),
+    force: bool = Field(default=False, description="Create downtimes even for pairs existing downtimes already silence")
+) -> Dict[str, Any]:
+    """Create many downtimes at once, e.g. for a maintenance wave over many hosts.
+
+    One downtime is planned per scope and monitor pair. Repeated pairs, and pairs another
+    pair of the call already silences (a scope with fewer tags, or every monitor on the
+    same scope), are skipped, as are pairs existing downtimes already silence for the
+    whole window unless ``force`` is set. The rest are created concurrently within the
+    downtime rate limit.
+
+    Args:
+        scopes (Optional[List[str]], optional): Scopes to silence, one downtime each. Defaults to '*'.
+        monitor_ids (Optional[List[int]], optional): Monitors to silence. Defaults to every monitor.
+        message (str, optional): The message for the downtimes.
+        start (Optional[int], optional): Start time in epoch seconds. Defaults to now.
+        end (Optional[int], optional): End time in epoch seconds. Defaults to no end.
+        timezone (str, optional): Timezone for the downtimes. Defaults to "UTC".
+        force (bool, optional): Ignore existing downtimes. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success', or 'error' when no downtime could be created
+            - message (str): Description of the operation result
+            - content (dict): created, skipped and failed counts, and one item per pair
+              with its status ('created', 'skipped' or 'error') and the downtime ID,
+              the pair or existing downtimes covering it, or the error"""
+    if not scopes and not monitor_ids:
+        return {"status": "error", "message": "Provide at least one scope or monitor ID"}
+    if len(scopes or [None]) * len(monitor_ids or [None]) > MAX_BULK_DOWNTIMES:
+        return {"status": "error", "message": f"At most {MAX_BULK_DOWNTIMES} downtimes can be created in one call"}
+    if end is not None and end <= max(start or 0, int(time.time())):
+        return {"status": "error", "message": "end must be in the future and after start"}
+    try:
+        targets, skipped = plan_downtimes(scopes or [], monitor_ids or [])
+        items = [{**target.describe(), "status": "skipped", "covered_by": cover.describe()} for target, cover in skipped]
+        if not force:
+            window_start = start if start is not None else int(time.time())
+            pending = []
+            for target in targets:
+                silenced_by = _silenced_by(target, window_start, end)
+                if silenced_by:
+                    items.append({**target.describe(), "status": "skipped", "silenced_by": [record["id"] for record in silenced_by]})
+                else:
+                    pending.append(target)
+            targets = pending
+        with datadog_client() as api_client:
+            downtimes_api = DowntimesApi(api_client)
+            results = run_concurrently(
+                lambda target: _create_one(downtimes_api, _downtime_request(target, message, start, end, timezone)),
+                targets,
+                on_progress=lambda done, total: report_progress(done, total, f"{done} of {total} downtimes created"),
+            )
+        items = [{**target.describe(), "status": "created", "id": downtime_id} if error is None else {**target.describe(), "status": "error", "error": str(error)}
+                 for target, downtime_id, error in results] + items
+        failed = sum(item["status"] == "error" for item in items)
+        created = len(targets) - failed
+        skipped_count = len(items) - len(targets)
+        summary = f"Created {created} of {len(items)} downtimes ({skipped_count} skipped as duplicates, {failed} failed)"
+        content = {"created": created, "skipped": skipped_count, "failed": failed, "items": items}
+        if targets and not created:
+            return {"status": "error", "message": summary, "content": content}
+        return {"status": "success", "message": summary, "content": content}
+    except Exception as e:
+        return {"status": "error", "message": f"Error creating downtimes: {e}"}
@@ -1,7 +1,6 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 from datadog_api_client.v1.api.events_api import EventsApi as EventsApiV1
 from datadog_api_client.v2.api.events_api import EventsApi as EventsApiV2
@@ -51,7 +50,7 @@ def search_events(
         )
 
         # Fazer a chamada à API
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             api_instance = EventsApiV2(api_client)
             response = api_instance.search_events(body=body)
             return {
@@ -79,7 +78,7 @@ def get_event(
             - content (dict): The event details if successful
     """
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             api_instance = EventsApiV1(api_client)
             response = api_instance.get_event(
                 event_id=int(event_id),
@@ -106,7 +105,7 @@ def delete_event(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             events_api = EventsApiV1(api_client)
             events_api.delete_event(event_id)
             return {"status": "success", "message": "Event deleted successfully"}
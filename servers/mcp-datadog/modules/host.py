@@ -1,9 +1,9 @@
 import json
 import sys
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.hosts_api import HostsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.warmup import hot_dataset
 from pydantic import BaseModel, Field
 
 mcp = FastMCP("Datadog Host Service")
@@ -31,7 +31,7 @@ def list_hosts(
             - content (list): List of host objects with name, id, mute status, last reported time, up status, and URL
             - error (str): Error message if the operation fails"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             hosts_api = HostsApi(api_client)
             kwargs = {"count": count}
             if filter:
@@ -66,6 +66,22 @@ def list_hosts(
     except Exception as e:
         return {"error": f"Error fetching hosts: {e}"}
 
+@hot_dataset("host_totals", ttl=60)
+def host_totals() -> dict:
+    """Active and up host counts."""
+    with datadog_client() as api_client:
+        return HostsApi(api_client).get_host_totals().to_dict()
+
+def host_state() -> dict:
+    """Active, up and down host counts, for the watched hosts resource.
+
+    Read upstream, as the subscription poller runs more often than the totals are reloaded;
+    the fresh totals also replace the cached ones.
+    """
+    totals = host_totals.reload()
+    active, up = totals.get("total_active") or 0, totals.get("total_up") or 0
+    return {"total_active": active, "total_up": up, "total_down": max(0, active - up)}
+
 @mcp.tool()
 def get_host_totals() -> dict:
     """Gets the total number of active hosts.
@@ -79,10 +95,7 @@ def get_host_totals() -> dict:
                 - type (str): Type of content ('text')
                 - text (str): JSON string with host totals data or error message"""
     try:
-        with ApiClient(configuration) as api_client:
-            hosts_api = HostsApi(api_client)
-            response = hosts_api.get_host_totals()
-            return {"content": [{"type": "text", "text": json.dumps(response.to_dict(), indent=2)}]}
+        return {"content": [{"type": "text", "text": json.dumps(host_totals.get(), indent=2)}]}
     except Exception as e:
         return {"content": [{"type": "text", "text": f"Error fetching host totals: {e}"}]}
 
@@ -100,7 +113,7 @@ def mute_host(host_name: str, message: str = "Muted via MCP") -> dict:
                 - type (str): Type of content ('text')
                 - text (str): JSON string with mute operation result or error message"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             hosts_api = HostsApi(api_client)
             settings = HostMuteSettings(message=message)
             response = hosts_api.mute_host(host_name, body=settings)
@@ -121,7 +134,7 @@ def unmute_host(host_name: str) -> dict:
                 - type (str): Type of content ('text')
                 - text (str): JSON string with unmute operation result or error message"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             hosts_api = HostsApi(api_client)
             response = hosts_api.unmute_host(host_name)
             return {"content": [{"type": "text", "text": json.dumps(response.to_dict(), indent=2)}]}
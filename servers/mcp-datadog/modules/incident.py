@@ -2,20 +2,15 @@ from pydantic import BaseModel, Field
 import json
 import logging
 import sys
-from datadog_api_client import ApiClient
 from datadog_api_client.v2.api.incidents_api import IncidentsApi
-from config import configuration
+from config import datadog_client, enable_unstable_operations
 from mcp.server.fastmcp import FastMCP
 from typing import Optional
 
 mcp = FastMCP("Datadog Incident Service")
 
 
-configuration.unstable_operations["search_incidents"] = True
-configuration.unstable_operations["list_incidents"] = True
-configuration.unstable_operations["get_incident"] = True
-configuration.unstable_operations["update_incident"] = True
-configuration.unstable_operations["delete_incident"] = True
+enable_unstable_operations("search_incidents", "list_incidents", "get_incident", "update_incident", "delete_incident")
 
 @mcp.tool()
 def search_incidents(
@@ -35,7 +30,7 @@ def search_incidents(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
             - content (list): List of incidents data as JSON strings"""
-    with ApiClient(configuration) as api_client:
+    with datadog_client() as api_client:
         api_instance = IncidentsApi(api_client)
         try:
             response = api_instance.search_incidents(
@@ -69,7 +64,7 @@ def list_incidents(
             - message (str): Description of the operation result
             - content (list): List of incidents data as JSON strings"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             incidents_api = IncidentsApi(api_client)
             response = incidents_api.list_incidents(
                 page_size=page_size, 
@@ -89,6 +84,35 @@ def list_incidents(
     finally:
         pass
 
+# Incidents read per page by the watched incidents resource
+INCIDENT_PAGE_SIZE = 100
+
+def active_incidents() -> dict:
+    """Incidents that are active or stable, for the watched incidents resource."""
+    incidents = []
+    with datadog_client() as api_client:
+        incidents_api = IncidentsApi(api_client)
+        offset = 0
+        while True:
+            response = incidents_api.search_incidents(query="state:(active OR stable)", page_size=INCIDENT_PAGE_SIZE, page_offset=offset).to_dict()
+            page = ((response.get("data") or {}).get("attributes") or {}).get("incidents") or []
+            for item in page:
+                incident = item.get("data") or {}
+                attributes = incident.get("attributes") or {}
+                incidents.append({
+                    "id": incident.get("id"),
+                    "public_id": attributes.get("public_id"),
+                    "title": attributes.get("title"),
+                    "state": attributes.get("state"),
+                    "severity": attributes.get("severity"),
+                    "customer_impacted": attributes.get("customer_impacted"),
+                    "created": attributes.get("created"),
+                })
+            if len(page) < INCIDENT_PAGE_SIZE:
+                break
+            offset += INCIDENT_PAGE_SIZE
+    return {"count": len(incidents), "incidents": sorted(incidents, key=lambda incident: str(incident["created"]))}
+
 @mcp.tool()
 def get_incident(
     incident_id: str = Field(..., description="The ID of the incident to retrieve"),
@@ -106,7 +130,7 @@ def get_incident(
                 - type (str): Type of content ('text')
                 - text (str): JSON string with incident data"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             incidents_api = IncidentsApi(api_client)
             response = incidents_api.get_incident(incident_id)
 
@@ -142,7 +166,7 @@ def update_incident(
             - message (str): Description of the operation result
             - content (dict): Updated incident data or empty list on error"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             incidents_api = IncidentsApi(api_client)
             body = {"data": {"attributes": {}}}
             if title:
@@ -169,7 +193,7 @@ def delete_incident(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             incidents_api = IncidentsApi(api_client)
             incidents_api.delete_incident(incident_id)
             return {"status": "success", "message": "Incident deleted successfully"}
@@ -1,8 +1,7 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.logs_api import LogsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Datadog Logs Service")
@@ -26,7 +25,7 @@ def archive_logs(
             - message (str): Description of the operation result
             - content (dict): Archive operation response data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             logs_api = LogsApi(api_client)
             body = {"query": query, "from": start, "to": end}
             response = logs_api.archive_logs(body=body)
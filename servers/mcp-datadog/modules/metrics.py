@@ -1,15 +1,32 @@
 from typing import Optional, Dict, Any, List
+import time
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.metrics_api import MetricsApi
-from config import configuration
+from datadog_api_client.v2.api.metrics_api import MetricsApi as MetricsApiV2
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.cache import create_cache
+from utils.concurrency import run_concurrently
+from utils.metric_index import MetricIndex
+from utils.orgs import PerOrg
+from utils.queries import cached_query
+from utils.query_planner import planned_metric_query
+from utils.warmup import hot_dataset
 from datadog_api_client.exceptions import (
     ApiException
 )
 
 mcp = FastMCP("Datadog Metrics Service")
 
+
+def _query_metrics(query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+    """Timeseries of a metric query, cached by canonical query and rollup-aligned range.
+
+    Misses go through the query planner, which fuses them with concurrent queries.
+    """
+    return cached_query("metrics", query, from_time, to_time, planned_metric_query)
+
+
 @mcp.tool()
 def query_metrics(
     query: str = Field(..., description="The query to execute"),
@@ -29,19 +46,126 @@ def query_metrics(
             - message (str): Description of the operation result
             - content (dict): Query results if successful"""
     try:
-        with ApiClient(configuration) as api_client:
-            metrics_api = MetricsApi(api_client)
-            response = metrics_api.query_metrics(from_time, to_time, query)
-            return {"status": "success", "message": "Metrics queried successfully", "content": response.to_dict()}
+        return {"status": "success", "message": "Metrics queried successfully", "content": _query_metrics(query, from_time, to_time)}
     except Exception as e:
         return {"status": "error", "message": f"Error querying metrics: {e}"}
 
+@hot_dataset("metric_names", ttl=900)
+def metric_names() -> List[str]:
+    """Names of the metrics reported in the last 24 hours, the window the metric search covers."""
+    with datadog_client() as api_client:
+        response = MetricsApi(api_client).list_active_metrics(_from=int(time.time()) - 86400)
+        return sorted(response.to_dict().get("metrics") or [])
+
+# Index of the metric names of each org, kept in step with the metric_names catalog
+_metric_index = PerOrg(MetricIndex)
+# Units, type and tags of searched metrics change rarely
+_metric_details = create_cache("metric_details", max_entries=4096, default_ttl=3600)
+# Tags returned per metric by search_metrics
+METRIC_DETAIL_TAGS = 20
+
+
+@metric_names.on_refresh
+def _sync_metric_index(loaded_at: float, names: List[str]) -> None:
+    _metric_index.get().sync(loaded_at, names)
+
+
+def metric_index() -> MetricIndex:
+    """Index of the current org's metric names, synced with the catalog.
+
+    The catalog is only read when a copy newer than the indexed one was loaded, so a
+    catalog in a shared cache is not unpickled on every search.
+    """
+    index = _metric_index.get()
+    loaded_at = metric_names.loaded_at()
+    if loaded_at is None or loaded_at != index.version:
+        index.sync(*metric_names.get_entry())
+    return index
+
+
+def unknown_metric(metric: str) -> Optional[Dict[str, Any]]:
+    """Error result for a metric that has not reported in the last 24 hours, or None if it has.
+
+    Lets tools that build metric names skip a query that can only return no data, and
+    point to the closest existing metrics instead.
+    """
+    index = metric_index()
+    if not len(index) or metric in index:
+        return None
+    suggestions = index.suggest(metric)
+    return {
+        "status": "error",
+        "message": f"Metric '{metric}' has not reported in the last 24 hours. Closest metrics: {', '.join(suggestions) or 'none'}",
+        "content": {"suggestions": suggestions},
+    }
+
+
+def _load_metric_details(name: str) -> Dict[str, Any]:
+    with datadog_client() as api_client:
+        metadata = MetricsApi(api_client).get_metric_metadata(name).to_dict()
+        tags = MetricsApiV2(api_client).list_tags_by_metric_name(name).to_dict()
+    tags = ((tags.get("data") or {}).get("attributes") or {}).get("tags") or []
+    return {
+        "type": metadata.get("type"),
+        "unit": metadata.get("unit"),
+        "per_unit": metadata.get("per_unit"),
+        "description": metadata.get("description"),
+        "tag_count": len(tags),
+        "tags": tags[:METRIC_DETAIL_TAGS],
+    }
+
+
+@mcp.tool()
+def search_metrics(
+    query: str = Field(..., description="Metric name, a part of it or words from it (e.g., 'checkout duration')"),
+    limit: int = Field(default=10, ge=1, le=50, description="Maximum number of metrics to return (default: 10)"),
+    details: bool = Field(default=True, description="Include the type, unit, description and tags of each metric")
+) -> Dict[str, Any]:
+    """Find metric names in the local catalog of metrics reported in the last 24 hours.
+
+    Names are matched by prefix and, for typos or partial names, by character trigram
+    similarity, without reading the whole metric list.
+
+    Args:
+        query (str): Metric name, a part of it or words from it.
+        limit (int, optional): Maximum number of metrics to return (1-50). Defaults to 10.
+        details (bool, optional): Include the type, unit, description and tags of each metric. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): catalog_size and the best matches, each with name, match
+              ('exact', 'prefix', 'substring' or 'fuzzy'), score and, with details,
+              type, unit, per_unit, description, tag_count and up to 20 tags"""
+    try:
+        index = metric_index()
+        matches = index.search(query, limit)
+        if details and matches:
+            results = run_concurrently(lambda match: _metric_details.get_or_load(match["name"], lambda: _load_metric_details(match["name"])), matches)
+            for match, metric_details, error in results:
+                if error is None:
+                    match.update(metric_details)
+                else:
+                    match["details_error"] = str(error)
+        return {
+            "status": "success",
+            "message": f"Found {len(matches)} matching metrics" if matches else f"No metric matches '{query}'",
+            "content": {"catalog_size": len(index), "metrics": matches},
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error searching metrics: {e}"}
+
 @mcp.tool()
 def list_metrics(
-    q: Optional[str] = Field(default=None, description="Query to filter metrics")
+    q: Optional[str] = Field(default=None, description="Query to filter metrics (e.g., 'metrics:system.cpu')")
 ) -> Dict[str, Any]:
     """List available metrics.
 
+    With a query, metrics are searched with the Datadog metric search endpoint. Without
+    one, the names of the metrics reported in the last 24 hours are served from the
+    catalog kept warm in the background.
+
     Args:
         q (Optional[str], optional): Query to filter metrics.
     
@@ -51,7 +175,9 @@ def list_metrics(
             - message (str): Description of the operation result
             - content (dict): List of available metrics if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        if not q:
+            return {"status": "success", "message": "Metrics listed successfully", "content": {"results": {"metrics": metric_names.get()}}}
+        with datadog_client() as api_client:
             metrics_api = MetricsApi(api_client)
             response = metrics_api.list_metrics(q=q)
             return {"status": "success", "message": "Metrics listed successfully", "content": response.to_dict()}
@@ -79,7 +205,7 @@ def update_metric_metadata(
             - message (str): Description of the operation result
             - content (dict): Updated metadata if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             metrics_api = MetricsApi(api_client)
             body = {}
             if type:
@@ -107,7 +233,7 @@ def delete_metric_metadata(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             metrics_api = MetricsApi(api_client)
             metrics_api.delete_metric_metadata(metric_name)
             return {"status": "success", "message": "Metric metadata deleted successfully"}
@@ -133,11 +259,12 @@ def query_p99_latency(
             - message (str): Description of the operation result
             - content (dict): P99 latency metrics if successful"""
     try:
-        with ApiClient(configuration) as api_client:
-            metrics_api = MetricsApi(api_client)
-            query = f"avg:trace.{service_name}.duration{99}percent"
-            response = metrics_api.query_metrics(from_time, to_time, query)
-            return {"status": "success", "message": "P99 latency retrieved successfully", "content": response.to_dict()}
+        metric = f"trace.{service_name}.duration"
+        unknown = unknown_metric(metric)
+        if unknown is not None:
+            return unknown
+        query = f"p99:{metric}{{*}}"
+        return {"status": "success", "message": "P99 latency retrieved successfully", "content": _query_metrics(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying P99 latency: {e}"}
     except Exception as e:
@@ -162,11 +289,12 @@ def query_error_rate(
             - message (str): Description of the operation result
             - content (dict): Error rate metrics if successful"""
     try:
-        with ApiClient(configuration) as api_client:
-            metrics_api = MetricsApi(api_client)
-            query = f"avg:trace.{service_name}.errors{99}percent"
-            response = metrics_api.query_metrics(from_time, to_time, query)
-            return {"status": "success", "message": "Error rate retrieved successfully", "content": response.to_dict()}
+        metric = f"trace.{service_name}.errors"
+        unknown = unknown_metric(metric)
+        if unknown is not None:
+            return unknown
+        query = f"sum:{metric}{{*}}.as_rate()"
+        return {"status": "success", "message": "Error rate retrieved successfully", "content": _query_metrics(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying error rate: {e}"}
     except Exception as e:
@@ -191,11 +319,12 @@ def query_downstream_latency(
             - message (str): Description of the operation result
             - content (dict): Downstream latency metrics if successful"""
     try:
-        with ApiClient(configuration) as api_client:
-            metrics_api = MetricsApi(api_client)
-            query = f"avg:trace.{service_name}.downstream.duration{99}percent"
-            response = metrics_api.query_metrics(from_time, to_time, query)
-            return {"status": "success", "message": "Downstream latency retrieved successfully", "content": response.to_dict()}
+        metric = f"trace.{service_name}.downstream.duration"
+        unknown = unknown_metric(metric)
+        if unknown is not None:
+            return unknown
+        query = f"p99:{metric}{{*}}"
+        return {"status": "success", "message": "Downstream latency retrieved successfully", "content": _query_metrics(query, from_time, to_time)}
     except ApiException as e:
         return {"status": "error", "message": f"API error while querying downstream latency: {e}"}
     except Exception as e:
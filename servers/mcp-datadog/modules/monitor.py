@@ -1,9 +1,9 @@
 from typing import Optional, List, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.monitors_api import MonitorsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.warmup import hot_dataset
 
 mcp = FastMCP("Datadog Monitor Service")
 
@@ -30,7 +30,7 @@ def create_monitor(
             - message (str): Description of the operation result
             - content (dict): Created monitor data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             body = {
                 "name": name,
@@ -58,13 +58,59 @@ def delete_monitor(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             monitors_api.delete_monitor(monitor_id)
             return {"status": "success", "message": "Monitor deleted successfully"}
     except Exception as e:
         return {"status": "error", "message": f"Error deleting monitor: {e}"}
 
+# Page size used to list every monitor
+MONITOR_PAGE_SIZE = 1000
+
+
+def _monitor_row(monitor) -> Dict[str, Any]:
+    return {
+        "name": monitor.name or "",
+        "id": monitor.id or 0,
+        "status": str(monitor.overall_state).lower() if monitor.overall_state else "unknown",
+        "message": monitor.message,
+        "tags": monitor.tags or [],
+        "query": monitor.query or "",
+        "last_updated_ts": int(monitor.modified.timestamp()) if monitor.modified else None,
+    }
+
+
+@hot_dataset("monitors", ttl=60)
+def monitor_catalog() -> List[Dict[str, Any]]:
+    """Name, state, tags and query of every monitor."""
+    with datadog_client() as api_client:
+        monitors_api = MonitorsApi(api_client)
+        rows = []
+        page = 0
+        while True:
+            response = monitors_api.list_monitors(page=page, page_size=MONITOR_PAGE_SIZE)
+            rows.extend(_monitor_row(monitor) for monitor in response)
+            if len(response) < MONITOR_PAGE_SIZE:
+                return rows
+            page += 1
+
+
+def monitor_state() -> Dict[str, Any]:
+    """Count of monitors per state and the monitors not OK, for the watched monitors resource.
+
+    Read upstream, as the subscription poller runs more often than the catalog is reloaded;
+    the fresh copy also replaces the cached catalog.
+    """
+    summary: Dict[str, int] = {}
+    triggered = []
+    for monitor in monitor_catalog.reload():
+        summary[monitor["status"]] = summary.get(monitor["status"], 0) + 1
+        if monitor["status"] not in ("ok", "ignored", "skipped"):
+            triggered.append({"id": monitor["id"], "name": monitor["name"], "status": monitor["status"], "tags": monitor["tags"]})
+    return {"summary": summary, "triggered": sorted(triggered, key=lambda monitor: monitor["id"])}
+
+
 @mcp.tool()
 def get_monitor_status(
     name: Optional[str] = Field(default="", description="The name of the monitor to filter"),
@@ -73,6 +119,8 @@ def get_monitor_status(
 ) -> Dict[str, Any]:
     """Fetch the status of Datadog monitors.
 
+    Without filters, the status is served from the monitor catalog kept warm in the background.
+
     Args:
         name (Optional[str], optional): The name of the monitor to filter.
         group_states (Optional[List[str]], optional): Filter by group states (e.g., 'alert', 'warn').
@@ -89,43 +137,34 @@ def get_monitor_status(
     tags = tags or []
 
     try:
-        with ApiClient(configuration) as api_client:
-            monitors_api = MonitorsApi(api_client)
-            response = monitors_api.list_monitors(
-                group_states=','.join(group_states) if group_states else None,
-                name=','.join(name) if name else None,
-                tags=','.join(tags) if tags else None
-            )
-
-            if not response:
-                return {"status": "error", "message": "No monitor data returned", "content": []}
-
-            monitors_data = [
-                {
-                    "name": monitor.name or "",
-                    "id": monitor.id or 0,
-                    "status": str(monitor.overall_state).lower() if monitor.overall_state else "unknown",
-                    "message": monitor.message,
-                    "tags": monitor.tags or [],
-                    "query": monitor.query or "",
-                    "last_updated_ts": int(monitor.modified.timestamp()) if monitor.modified else None,
-                }
-                for monitor in response
-            ]
-
-            summary = {status: 0 for status in ["alert", "warn", "no_data", "ok", "ignored", "skipped", "unknown"]}
-            for monitor in response:
-                status = str(monitor.overall_state).lower() if monitor.overall_state else "unknown"
-                summary[status] = summary.get(status, 0) + 1
-
-            return {
-                "status": "success",
-                "message": "Monitors retrieved successfully",
-                "content": {
-                    "monitors": monitors_data,
-                    "summary": summary
-                }
+        if not name and not group_states and not tags:
+            monitors_data = monitor_catalog.get()
+        else:
+            with datadog_client() as api_client:
+                monitors_api = MonitorsApi(api_client)
+                response = monitors_api.list_monitors(
+                    group_states=','.join(group_states) if group_states else None,
+                    name=name or None,
+                    tags=','.join(tags) if tags else None
+                )
+
+                if not response:
+                    return {"status": "error", "message": "No monitor data returned", "content": []}
+
+                monitors_data = [_monitor_row(monitor) for monitor in response]
+
+        summary = {status: 0 for status in ["alert", "warn", "no_data", "ok", "ignored", "skipped", "unknown"]}
+        for monitor in monitors_data:
+            summary[monitor["status"]] = summary.get(monitor["status"], 0) + 1
+
+        return {
+            "status": "success",
+            "message": "Monitors retrieved successfully",
+            "content": {
+                "monitors": monitors_data,
+                "summary": summary
             }
+        }
     except Exception as e:
         return {"status": "error", "message": f"Error fetching monitor status: {e}", "content": []}
 
@@ -152,7 +191,7 @@ def update_monitor(
             - message (str): Description of the operation result
             - content (dict): Updated monitor data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             body = {}
             if name:
@@ -189,7 +228,7 @@ def create_monitor_config_policy(
             - message (str): Description of the operation result
             - content (dict): Created policy data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             body = {
                 "data": {
@@ -226,7 +265,7 @@ def update_monitor_config_policy(
             - message (str): Description of the operation result
             - content (dict): Updated policy data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             body = {"data": {"type": "monitor_config_policy", "id": policy_id, "attributes": {}}}
             if name:
@@ -252,7 +291,7 @@ def delete_monitor_config_policy(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             monitors_api.delete_monitor_config_policy(policy_id)
             return {"status": "success", "message": "Monitor config policy deleted successfully"}
@@ -272,7 +311,7 @@ def list_monitor_config_policies() -> Dict[str, Any]:
             - message (str): Description of the operation result
             - content (dict): List of monitor configuration policies if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             response = monitors_api.list_monitor_config_policies()
             return {"status": "success", "message": "Monitor config policies retrieved successfully", "content": response.to_dict()}
@@ -298,7 +337,7 @@ def search_monitors(
             - message (str): Description of the operation result
             - content (dict): Search results if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             response = monitors_api.search_monitors(query=query, page=page, per_page=per_page)
             return {"status": "success", "message": "Monitors retrieved successfully", "content": response.to_dict()}
@@ -320,7 +359,7 @@ def get_monitor(
             - message (str): Description of the operation result
             - content (dict): Monitor details if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             monitors_api = MonitorsApi(api_client)
             response = monitors_api.get_monitor(monitor_id)
             return {"status": "success", "message": "Monitor retrieved successfully", "content": response.to_dict()}
@@ -0,0 +1,83 @@
+import time
+from typing import Any, Dict, Optional
+from pydantic import Field
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.utilities.func_metadata import func_metadata
+from config import DATADOG_DEFAULT_ORG, ORGS
+from utils.concurrency import run_concurrently
+from utils.orgs import use_org
+from utils.progress import report_progress, without_progress
+
+mcp = FastMCP("Datadog Orgs Service")
+
+
+@mcp.tool()
+def list_orgs() -> Dict[str, Any]:
+    """List the Datadog orgs this server can query.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): The default org and each org's name, site and request budget"""
+    try:
+        orgs = [
+            {"name": org.name, "site": org.site, "rate_limit": org.limiter.rate if org.limiter else None, "default": org.name == DATADOG_DEFAULT_ORG}
+            for org in ORGS.values()
+        ]
+        return {"status": "success", "message": f"Found {len(orgs)} orgs", "content": {"default": DATADOG_DEFAULT_ORG, "orgs": orgs}}
+    except Exception as e:
+        return {"status": "error", "message": f"Error listing orgs: {e}"}
+
+
+@mcp.tool()
+def compare_orgs(
+    tool: str = Field(..., description="Name of the tool to run in every org (e.g., 'get_slo_burn_rates')"),
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="Arguments of the tool"),
+    orgs: Optional[str] = Field(default=None, description="Comma separated orgs to compare (default: all orgs)")
+) -> Dict[str, Any]:
+    """Run the same tool with the same arguments in several Datadog orgs at once.
+
+    The orgs are queried concurrently, each with its own API client, request budget
+    and cache, so e.g. staging and production can be compared side by side.
+
+    Args:
+        tool (str): Name of the tool to run in every org.
+        arguments (Dict[str, Any], optional): Arguments of the tool. Defaults to none.
+        orgs (Optional[str], optional): Comma separated orgs to compare. Defaults to all orgs.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): The result and duration of the tool in each org"""
+    # modules/__init__ imports this module, so the tool list is looked up on first use
+    from modules import mcp_tools, org_agnostic_tools
+
+    try:
+        functions = {fn.__name__: fn for fn in mcp_tools if fn.__name__ not in org_agnostic_tools}
+        if tool not in functions:
+            return {"status": "error", "message": f"Tool '{tool}' cannot be compared across orgs"}
+        names = [name.strip() for name in orgs.split(",") if name.strip()] if orgs else list(ORGS)
+        unknown = [name for name in names if name not in ORGS]
+        if unknown:
+            return {"status": "error", "message": f"Unknown Datadog orgs: {', '.join(unknown)}. Available orgs: {', '.join(ORGS)}"}
+        fn = functions[tool]
+        kwargs = func_metadata(fn).arg_model.model_validate(arguments).model_dump_one_level()
+
+        def run_in_org(name):
+            started = time.perf_counter()
+            with use_org(name), without_progress():
+                result = fn(**kwargs)
+            return {"duration_ms": round((time.perf_counter() - started) * 1000, 1), "result": result}
+
+        results = run_concurrently(
+            run_in_org, names, on_progress=lambda done, total: report_progress(done, total, f"{done} of {total} orgs done")
+        )
+        content = {
+            name: value if error is None else {"result": {"status": "error", "message": str(error)}}
+            for name, value, error in results
+        }
+        return {"status": "success", "message": f"Ran {tool} in {len(names)} orgs", "content": {"tool": tool, "orgs": content}}
+    except Exception as e:
+        return {"status": "error", "message": f"Error comparing orgs: {e}"}
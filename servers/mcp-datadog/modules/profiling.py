@@ -0,0 +1,76 @@
+from typing import Dict, Any, Optional
+from pydantic import Field
+from mcp.server.fastmcp import FastMCP
+from utils.profiling import profiler
+
+mcp = FastMCP("Tool Profiling Service")
+
+
+def _profiling_state() -> Dict[str, Any]:
+    return {
+        "enabled": profiler.enabled,
+        "tools": sorted(profiler.tools),
+        "directory": profiler.directory,
+        "interval_ms": profiler.interval * 1000,
+        "slowest_kept": profiler.slowest.k,
+    }
+
+
+@mcp.tool()
+def configure_tool_profiling(
+    tools: str = Field(default="*", description="Comma separated tool names to profile, '*' for all tools, empty to disable"),
+    reset: bool = Field(default=False, description="Clear the slowest-calls buffer")
+) -> Dict[str, Any]:
+    """Enable or disable profiling of tool calls on this server.
+
+    Profiled calls are sampled with a stack profiler and tracemalloc, and each writes a
+    JSON report plus a collapsed stack file (for flame graphs) to the profile directory.
+
+    Args:
+        tools (str, optional): Comma separated tool names, '*' for all tools, empty to disable. Defaults to "*".
+        reset (bool, optional): Clear the slowest-calls buffer. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): The resulting profiling configuration"""
+    try:
+        profiler.configure(tools.split(","))
+        if reset:
+            profiler.reset()
+        return {
+            "status": "success",
+            "message": "Tool profiling enabled" if profiler.enabled else "Tool profiling disabled",
+            "content": _profiling_state(),
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error configuring tool profiling: {e}"}
+
+
+@mcp.tool()
+def get_slowest_tool_calls(
+    limit: int = Field(default=10, ge=1, description="Maximum number of calls to return"),
+    tool: Optional[str] = Field(default=None, description="Only return calls of this tool")
+) -> Dict[str, Any]:
+    """Get the slowest profiled tool calls with their arguments and profile summaries.
+
+    Args:
+        limit (int, optional): Maximum number of calls to return. Defaults to 10.
+        tool (Optional[str], optional): Only return calls of this tool.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): Profiling configuration and the slowest calls, each with
+              duration, CPU time, arguments, hottest lines, allocation growth and report path"""
+    try:
+        calls = [call for call in profiler.slowest_calls() if not tool or call["tool"] == tool]
+        return {
+            "status": "success",
+            "message": f"Found {len(calls)} profiled calls" if calls else "No profiled calls recorded",
+            "content": {"profiling": _profiling_state(), "calls": calls[:limit]},
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error retrieving profiled calls: {e}"}
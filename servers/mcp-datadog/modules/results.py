@@ -0,0 +1,80 @@
+import json
+import time
+from typing import Any, Dict, List, Optional
+from pydantic import Field
+from mcp.server.fastmcp import FastMCP
+from utils.handles import stored_result
+
+mcp = FastMCP("Datadog Results Service")
+
+
+def _field(item: Any, path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+@mcp.tool()
+def fetch_result(
+    handle: str = Field(..., description="Handle of a stored result (e.g., 'res_0123456789abcdef')"),
+    offset: int = Field(default=0, ge=0, description="Index of the first item to return (default: 0)"),
+    limit: int = Field(default=50, ge=1, le=500, description="Maximum number of items to return (default: 50)"),
+    filter: Optional[str] = Field(default=None, description="Only items containing this text, case-insensitive"),
+    fields: Optional[List[str]] = Field(default=None, description="Only these fields of each item, as dotted paths (e.g., ['host_name', 'meta.platform'])")
+) -> Dict[str, Any]:
+    """Page through a large tool result stored on the server.
+
+    Tools whose result is too large to return inline store it and return a summary with
+    a handle instead. The full result is also readable as the resource ``results://{handle}``.
+
+    Args:
+        handle (str): Handle of a stored result.
+        offset (int, optional): Index of the first item to return, among the matching items. Defaults to 0.
+        limit (int, optional): Maximum number of items to return (1-500). Defaults to 50.
+        filter (Optional[str], optional): Only items containing this text, case-insensitive.
+        fields (Optional[List[str]], optional): Only these fields of each item, as dotted paths.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): total_items, matched_items, offset, next_offset (None on the
+              last page), expires_in_seconds and the items of the page"""
+    try:
+        stored = stored_result(handle)
+        if stored is None:
+            return {"status": "error", "message": f"Result '{handle}' does not exist or has expired; run the tool again"}
+        items = stored["items"]
+        if filter:
+            text = filter.lower()
+            items = [item for item in items if text in json.dumps(item, default=str).lower()]
+        page = items[offset:offset + limit]
+        if fields:
+            page = [{path: _field(item, path) for path in fields} for item in page]
+        next_offset = offset + limit if offset + limit < len(items) else None
+        return {
+            "status": "success",
+            "message": f"Returned items {offset} to {offset + len(page)} of {len(items)}",
+            "content": {
+                "handle": handle,
+                "items_path": stored["path"],
+                "total_items": len(stored["items"]),
+                "matched_items": len(items),
+                "offset": offset,
+                "next_offset": next_offset,
+                "expires_in_seconds": max(0, int(stored["expires_at"] - time.time())),
+                "items": page,
+            },
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error fetching result: {e}"}
+
+
+def read_result(handle: str) -> str:
+    """Full JSON of a stored result, for clients that read it outside the model's context."""
+    stored = stored_result(handle)
+    if stored is None:
+        raise ValueError(f"Result '{handle}' does not exist or has expired")
+    return json.dumps(stored["content"], default=str)
@@ -1,8 +1,7 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v2.api.roles_api import RolesApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Datadog Roles Service")
@@ -20,7 +19,7 @@ def list_roles() -> Dict[str, Any]:
             - message (str): Description of the operation result
             - content (dict): List of roles if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             roles_api = RolesApi(api_client)
             response = roles_api.list_roles()
             return {"status": "success", "message": "Roles listed successfully", "content": response.to_dict()}
@@ -42,7 +41,7 @@ def get_role(
             - message (str): Description of the operation result
             - content (dict): Role details if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             roles_api = RolesApi(api_client)
             response = roles_api.get_role(role_id)
             return {"status": "success", "message": "Role retrieved successfully", "content": response.to_dict()}
@@ -66,7 +65,7 @@ def create_role(
             - message (str): Description of the operation result
             - content (dict): Created role data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             roles_api = RolesApi(api_client)
             body = {"data": {"type": "roles", "attributes": {"name": name, "description": description}}}
             response = roles_api.create_role(body=body)
@@ -88,7 +87,7 @@ def delete_role(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             roles_api = RolesApi(api_client)
             roles_api.delete_role(role_id)
             return {"status": "success", "message": "Role deleted successfully"}
@@ -114,7 +113,7 @@ def update_role(
             - message (str): Description of the operation result
             - content (dict): Updated role data if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             roles_api = RolesApi(api_client)
             body = {"data": {"type": "roles", "id": role_id, "attributes": {}}}
             if name:
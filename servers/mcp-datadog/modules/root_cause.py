@@ -7,6 +7,7 @@ from datadog_api_client.exceptions import (
 )
 import json
 import time
+from utils.progress import report_progress
 
 
 mcp = FastMCP("Datadog Root Cause Analysis Service")
@@ -19,6 +20,8 @@ def analyze_service_with_apm(
 ) -> Dict[str, Any]:
     """Perform root cause analysis for a service, including APM spans, errors, and latency.
 
+    Progress is reported after each of the three steps, with that step's result message.
+
     Args:
         service_name (str): The name of the service to analyze.
         from_time (Optional[int], optional): Start time in epoch seconds. Defaults to 2 hours ago if not provided.
@@ -44,18 +47,21 @@ def analyze_service_with_apm(
 
         # Step 1: Query APM latency
         latency_result = query_apm_latency(service_name, from_time, to_time)
-        if latency_result.get("status") != "success" or "data" not in latency_result:
+        if latency_result.get("status") != "success" or "content" not in latency_result:
             return {"status": "error", "message": "Failed to retrieve APM latency", "details": latency_result}
+        report_progress(1, 3, f"latency: {latency_result['message']}")
 
         # Step 2: Query APM errors
         error_result = query_apm_errors(service_name, from_time, to_time)
-        if error_result.get("status") != "success" or "data" not in error_result:
+        if error_result.get("status") != "success" or "content" not in error_result:
             return {"status": "error", "message": "Failed to retrieve APM errors", "details": error_result}
+        report_progress(2, 3, f"errors: {error_result['message']}")
 
         # Step 3: Query APM spans
         spans_result = query_apm_spans(service_name, from_time, to_time)
-        if spans_result.get("status") != "success" or "data" not in spans_result:
+        if spans_result.get("status") != "success" or "content" not in spans_result:
             return {"status": "error", "message": "Failed to retrieve APM spans", "details": spans_result}
+        report_progress(3, 3, f"spans: {spans_result['message']}")
 
         # Structure the analysis result
         analysis_result = {
@@ -66,9 +72,9 @@ def analyze_service_with_apm(
                 "to": to_time
             },
             "data": {
-                "latency": latency_result.get("data", {}),
-                "errors": error_result.get("data", {}),
-                "spans": spans_result.get("data", {})
+                "latency": latency_result.get("content", {}),
+                "errors": error_result.get("content", {}),
+                "spans": spans_result.get("content", {})
             }
         }
         
@@ -1,8 +1,7 @@
 from typing import List, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.service_checks_api import ServiceChecksApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Datadog Service Checks Service")
@@ -29,7 +28,7 @@ def submit_service_check(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             service_checks_api = ServiceChecksApi(api_client)
             body = [{"check": check_name, "host_name": host_name, "status": status, "message": message, "tags": tags}]
             service_checks_api.submit_service_check(body=body)
@@ -50,7 +49,7 @@ def list_service_checks() -> Dict[str, Any]:
             - message (str): Description of the operation result
             - content (dict): List of service checks if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             service_checks_api = ServiceChecksApi(api_client)
             response = service_checks_api.list_service_checks()
             return {"status": "success", "message": "Service checks listed successfully", "content": response.to_dict()}
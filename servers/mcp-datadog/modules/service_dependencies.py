@@ -1,97 +1,313 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
+from collections import deque
+import threading
+import time
+import httpx
 from pydantic import Field
-from datadog_api_client import ApiClient
-from datadog_api_client.v2.api.service_dependencies_api import ServiceDependenciesApi
-from config import configuration
+from config import current_org
 from mcp.server.fastmcp import FastMCP
-from datadog_api_client.exceptions import (
-    ApiException
-)
+from utils.breakers import call_upstream
+from utils.cache import create_cache
+from utils.deadlines import check_deadline, remaining_time
+from utils.metrics import track_upstream
+from utils.orgs import current_org_name, use_org
+from utils.tracing import trace_upstream
 
 mcp = FastMCP("Datadog Service Dependencies Service")
 
+# The dependency map changes slowly; rebuild it in the background once it is this old
+SERVICE_GRAPH_REFRESH_SECONDS = 300
+
+
+def _get_service_dependencies(path: str, env: str) -> Dict[str, Any]:
+    """Call the APM service dependencies endpoint, which the Python client does not wrap."""
+    check_deadline()
+    org = current_org()
+    if org.limiter is not None:
+        org.limiter.acquire()
+    remaining = remaining_time()
+
+    def call():
+        with track_upstream("v1/service_dependencies"), trace_upstream("v1/service_dependencies", "GET", f"/api/v1/service_dependencies{path}"):
+            response = httpx.get(
+                f"{org.api_url}/api/v1/service_dependencies{path}",
+                params={"env": env},
+                headers={"DD-API-KEY": org.api_key or "", "DD-APPLICATION-KEY": org.app_key or ""},
+                timeout=30.0 if remaining is None else min(30.0, max(remaining, 0.001)),
+            )
+            response.raise_for_status()
+        return response.json()
+
+    return call_upstream("v1/service_dependencies", "GET", call, org.limiter)
+
+
+class ServiceGraph:
+    """Directed service call graph with forward (calls) and reverse (called by) adjacency lists."""
+
+    def __init__(self, env: str, calls: Dict[str, List[str]]) -> None:
+        self.env = env
+        self.built_at = time.time()
+        self.calls: Dict[str, Set[str]] = {}
+        self.called_by: Dict[str, Set[str]] = {}
+        for service, callees in calls.items():
+            self.calls.setdefault(service, set())
+            self.called_by.setdefault(service, set())
+            for callee in callees:
+                self.calls[service].add(callee)
+                self.calls.setdefault(callee, set())
+                self.called_by.setdefault(callee, set()).add(service)
+
+    def __contains__(self, service: str) -> bool:
+        return service in self.calls
+
+    def closure(self, service: str, direction: str = "downstream", max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Breadth-first closure from ``service``, mapping each reached service to its hop distance."""
+        edges = self.calls if direction == "downstream" else self.called_by
+        depths = {service: 0}
+        queue = deque([service])
+        while queue:
+            current = queue.popleft()
+            if max_depth is not None and depths[current] >= max_depth:
+                continue
+            for neighbour in edges.get(current, ()):
+                if neighbour not in depths:
+                    depths[neighbour] = depths[current] + 1
+                    queue.append(neighbour)
+        del depths[service]
+        return depths
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Shortest call chain from ``source`` to ``target`` following call direction."""
+        parents: Dict[str, Optional[str]] = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            for neighbour in self.calls.get(current, ()):
+                if neighbour not in parents:
+                    parents[neighbour] = current
+                    queue.append(neighbour)
+        return None
+
+    def blast_radius(self, service: str) -> Dict[str, Any]:
+        """Services that directly or transitively call ``service`` and are affected when it breaks."""
+        affected = self.closure(service, "upstream")
+        by_depth: Dict[int, List[str]] = {}
+        for name, depth in affected.items():
+            by_depth.setdefault(depth, []).append(name)
+        return {
+            "affected_count": len(affected),
+            "direct_callers": sorted(by_depth.get(1, [])),
+            "by_depth": {depth: sorted(names) for depth, names in sorted(by_depth.items())},
+            "entry_points": sorted(name for name in affected if not self.called_by.get(name)),
+        }
+
+
+# Graphs per org and environment, and when each was built; shared by the workers when a shared cache is configured
+_graphs = create_cache("service_graphs", max_entries=128)
+# The graph this process last read per (org, env), reused while the shared build time matches,
+# so a shared graph is only unpickled again after another worker rebuilt it
+_local_graphs: Dict[Tuple[str, str], ServiceGraph] = {}
+_graph_lock = threading.Lock()
+# (org, env) pairs being rebuilt in the background
+_refreshing: Set[Tuple[str, str]] = set()
+
+
+def _cached_graph(env: str) -> Optional[ServiceGraph]:
+    built_at = _graphs.get(("built_at", env))
+    if built_at is None:
+        return None
+    key = (current_org_name(), env)
+    graph = _local_graphs.get(key)
+    if graph is None or graph.built_at != built_at:
+        graph = _graphs.get(env)
+        if graph is None:
+            return None
+        _local_graphs[key] = graph
+    return graph
+
+
+def _build_graph(env: str) -> ServiceGraph:
+    payload = _get_service_dependencies("", env)
+    graph = ServiceGraph(env, {service: (info or {}).get("calls") or [] for service, info in payload.items()})
+    # The graph is written before its build time, so a reader seeing the new time finds the new graph
+    _graphs.set(env, graph)
+    _graphs.set(("built_at", env), graph.built_at)
+    with _graph_lock:
+        _local_graphs[(current_org_name(), env)] = graph
+        _refreshing.discard((current_org_name(), env))
+    return graph
+
+
+def _refresh_in_background(org: str, env: str) -> None:
+    def refresh():
+        with use_org(org):
+            try:
+                _build_graph(env)
+            except Exception:
+                with _graph_lock:
+                    _refreshing.discard((org, env))
+
+    threading.Thread(target=refresh, name=f"service-graph-{org}-{env}", daemon=True).start()
+
+
+def get_service_graph(env: str, refresh: bool = False) -> ServiceGraph:
+    """Return the cached graph for ``env``, building it on first use.
+
+    A stale graph is still served while a background thread rebuilds it, so queries
+    never wait on the dependency API once the graph exists.
+    """
+    with _graph_lock:
+        graph = _cached_graph(env)
+        stale = graph is not None and time.time() - graph.built_at > SERVICE_GRAPH_REFRESH_SECONDS
+        key = (current_org_name(), env)
+        if stale and not refresh and key not in _refreshing:
+            _refreshing.add(key)
+            _refresh_in_background(*key)
+    if graph is None or refresh:
+        graph = _build_graph(env)
+    return graph
+
+
+def _graph_info(graph: ServiceGraph) -> Dict[str, Any]:
+    return {"env": graph.env, "services": len(graph.calls), "age_seconds": int(time.time() - graph.built_at)}
+
+
 @mcp.tool()
 def list_service_dependencies(
-    service_id: str = Field(..., description="The ID of the service to retrieve dependencies for")
+    service_id: str = Field(..., description="The name of the service to retrieve dependencies for"),
+    env: str = Field(..., description="The environment of the service (e.g., 'prod')")
 ) -> Dict[str, Any]:
-    """List all dependencies for a specific service.
+    """List the services a specific service calls and is called by.
 
     Args:
-        service_id (str): The ID of the service to retrieve dependencies for.
-    
+        service_id (str): The name of the service to retrieve dependencies for.
+        env (str): The environment of the service (e.g., 'prod').
+
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
-            - content (dict): List of service dependencies if successful"""
+            - content (dict): 'calls' and 'called_by' service lists if successful"""
     try:
-        with ApiClient(configuration) as api_client:
-            service_dependencies_api = ServiceDependenciesApi(api_client)
-            response = service_dependencies_api.list_service_dependencies(service_id)
-            return {"status": "success", "message": "Service dependencies retrieved successfully", "content": response.to_dict()}
-    except ApiException as e:
+        response = _get_service_dependencies(f"/{service_id}", env)
+        return {"status": "success", "message": "Service dependencies retrieved successfully", "content": response}
+    except httpx.HTTPStatusError as e:
         return {"status": "error", "message": f"API error while retrieving service dependencies: {e}"}
     except Exception as e:
         return {"status": "error", "message": f"Unexpected error while retrieving service dependencies: {e}"}
 
+
 @mcp.tool()
-def create_service_dependency(
-    service_id: str = Field(..., description="The ID of the service to add a dependency to"),
-    dependent_service_id: str = Field(..., description="The ID of the dependent service"),
-    relationship_type: str = Field(..., description="The type of relationship (e.g., 'uses', 'depends_on')")
+def get_service_dependency_closure(
+    service_id: str = Field(..., description="The name of the service"),
+    env: str = Field(..., description="The environment of the service (e.g., 'prod')"),
+    direction: str = Field(default="downstream", description="'downstream' (services it calls) or 'upstream' (services calling it)"),
+    max_depth: Optional[int] = Field(default=None, ge=1, description="Maximum number of hops (default: unlimited)"),
+    refresh: bool = Field(default=False, description="Rebuild the cached dependency graph before answering")
 ) -> Dict[str, Any]:
-    """Create a new service dependency.
+    """Get every service transitively reachable from a service in the cached dependency graph.
 
     Args:
-        service_id (str): The ID of the service to add a dependency to.
-        dependent_service_id (str): The ID of the dependent service.
-        relationship_type (str): The type of relationship (e.g., 'uses', 'depends_on').
-    
+        service_id (str): The name of the service.
+        env (str): The environment of the service (e.g., 'prod').
+        direction (str, optional): 'downstream' or 'upstream'. Defaults to "downstream".
+        max_depth (Optional[int], optional): Maximum number of hops. Defaults to unlimited.
+        refresh (bool, optional): Rebuild the cached dependency graph before answering. Defaults to False.
+
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
-            - content (dict): Created dependency data if successful"""
+            - content (dict): Graph info and the reached services with their hop distance"""
     try:
-        with ApiClient(configuration) as api_client:
-            service_dependencies_api = ServiceDependenciesApi(api_client)
-            body = {
-                "data": {
-                    "type": "service_dependency",
-                    "attributes": {
-                        "dependent_service_id": dependent_service_id,
-                        "relationship_type": relationship_type,
-                    },
-                }
-            }
-            response = service_dependencies_api.create_service_dependency(service_id, body=body)
-            return {"status": "success", "message": "Service dependency created successfully", "content": response.to_dict()}
-    except ApiException as e:
-        return {"status": "error", "message": f"API error while creating service dependency: {e}"}
+        if direction not in ("downstream", "upstream"):
+            return {"status": "error", "message": "direction must be 'downstream' or 'upstream'"}
+        graph = get_service_graph(env, refresh)
+        if service_id not in graph:
+            return {"status": "error", "message": f"Service '{service_id}' not found in the {env} dependency graph"}
+        closure = graph.closure(service_id, direction, max_depth)
+        return {
+            "status": "success",
+            "message": f"{direction.capitalize()} services retrieved successfully",
+            "content": {
+                "graph": _graph_info(graph),
+                "service": service_id,
+                "direction": direction,
+                "services": [{"name": name, "depth": depth} for name, depth in sorted(closure.items(), key=lambda item: (item[1], item[0]))],
+            },
+        }
     except Exception as e:
-        return {"status": "error", "message": f"Unexpected error while creating service dependency: {e}"}
+        return {"status": "error", "message": f"Error querying service dependency graph: {e}"}
+
 
 @mcp.tool()
-def delete_service_dependency(
-    service_id: str = Field(..., description="The ID of the service to delete a dependency from"),
-    dependency_id: str = Field(..., description="The ID of the dependency to delete")
+def get_service_blast_radius(
+    service_id: str = Field(..., description="The name of the failing service"),
+    env: str = Field(..., description="The environment of the service (e.g., 'prod')"),
+    refresh: bool = Field(default=False, description="Rebuild the cached dependency graph before answering")
 ) -> Dict[str, Any]:
-    """Delete a specific service dependency.
+    """Get the services affected when a service breaks, i.e. everything that depends on it.
 
     Args:
-        service_id (str): The ID of the service to delete a dependency from.
-        dependency_id (str): The ID of the dependency to delete.
-    
+        service_id (str): The name of the failing service.
+        env (str): The environment of the service (e.g., 'prod').
+        refresh (bool, optional): Rebuild the cached dependency graph before answering. Defaults to False.
+
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
-            - message (str): Description of the operation result"""
+            - message (str): Description of the operation result
+            - content (dict): affected_count, direct_callers, affected services grouped by
+              hop distance and the affected entry points (services nothing else calls)"""
+    try:
+        graph = get_service_graph(env, refresh)
+        if service_id not in graph:
+            return {"status": "error", "message": f"Service '{service_id}' not found in the {env} dependency graph"}
+        return {
+            "status": "success",
+            "message": "Blast radius computed successfully",
+            "content": {"graph": _graph_info(graph), "service": service_id, **graph.blast_radius(service_id)},
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error computing blast radius: {e}"}
+
+
+@mcp.tool()
+def find_service_dependency_path(
+    source_service: str = Field(..., description="The calling service"),
+    target_service: str = Field(..., description="The service to reach"),
+    env: str = Field(..., description="The environment of the services (e.g., 'prod')"),
+    refresh: bool = Field(default=False, description="Rebuild the cached dependency graph before answering")
+) -> Dict[str, Any]:
+    """Find the shortest call chain from one service to another.
+
+    Args:
+        source_service (str): The calling service.
+        target_service (str): The service to reach.
+        env (str): The environment of the services (e.g., 'prod').
+        refresh (bool, optional): Rebuild the cached dependency graph before answering. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): The path as an ordered list of services, or null if unreachable"""
     try:
-        with ApiClient(configuration) as api_client:
-            service_dependencies_api = ServiceDependenciesApi(api_client)
-            service_dependencies_api.delete_service_dependency(service_id, dependency_id)
-            return {"status": "success", "message": "Service dependency deleted successfully"}
-    except ApiException as e:
-        return {"status": "error", "message": f"API error while deleting service dependency: {e}"}
+        graph = get_service_graph(env, refresh)
+        for name in (source_service, target_service):
+            if name not in graph:
+                return {"status": "error", "message": f"Service '{name}' not found in the {env} dependency graph"}
+        path = graph.shortest_path(source_service, target_service)
+        return {
+            "status": "success",
+            "message": "Dependency path found" if path else f"'{source_service}' does not reach '{target_service}'",
+            "content": {"graph": _graph_info(graph), "path": path, "hops": len(path) - 1 if path else None},
+        }
     except Exception as e:
-        return {"status": "error", "message": f"Unexpected error while deleting service dependency: {e}"}
+        return {"status": "error", "message": f"Error finding dependency path: {e}"}
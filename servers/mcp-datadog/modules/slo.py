@@ -1,9 +1,12 @@
 from typing import Optional, Dict, Any, List
 from pydantic import Field
-from datadog_api_client import ApiClient
+import time
 from datadog_api_client.v1.api.service_level_objectives_api import ServiceLevelObjectivesApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.concurrency import run_concurrently
+from utils.progress import report_progress
+from utils.warmup import hot_dataset
 
 mcp = FastMCP("Datadog SLO Service")
 
@@ -26,7 +29,7 @@ def list_slos(
             - message (str): Description of the operation result
             - content (dict): List of SLOs if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             slo_api = ServiceLevelObjectivesApi(api_client)
             response = slo_api.list_slos(query=query, limit=limit, offset=offset)
             return {"status": "success", "message": "SLOs listed successfully", "content": response.to_dict()}
@@ -48,7 +51,7 @@ def get_slo(
             - message (str): Description of the operation result
             - content (dict): SLO details if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             slo_api = ServiceLevelObjectivesApi(api_client)
             response = slo_api.get_slo(slo_id)
             return {"status": "success", "message": "SLO retrieved successfully", "content": response.to_dict()}
@@ -69,9 +72,154 @@ def delete_slo(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             slo_api = ServiceLevelObjectivesApi(api_client)
             slo_api.delete_slo(slo_id)
             return {"status": "success", "message": "SLO deleted successfully"}
     except Exception as e:
         return {"status": "error", "message": f"Error deleting SLO: {e}"}
+
+# Multi-window burn-rate evaluation (windows and page thresholds from the SRE workbook)
+BURN_RATE_WINDOWS = {"1h": 3600, "6h": 6 * 3600, "3d": 3 * 86400}
+BURN_RATE_THRESHOLDS = {"1h": 14.4, "6h": 6.0, "3d": 1.0}
+TIMEFRAME_SECONDS = {"7d": 7 * 86400, "30d": 30 * 86400, "90d": 90 * 86400}
+
+
+def _list_all_slos(slo_api: ServiceLevelObjectivesApi, query: Optional[str], tags_query: Optional[str], page_size: int = 1000) -> List[Dict[str, Any]]:
+    """Page through list_slos and return every matching SLO definition."""
+    kwargs = {}
+    if query:
+        kwargs["query"] = query
+    if tags_query:
+        kwargs["tags_query"] = tags_query
+
+    slos = []
+    offset = 0
+    while True:
+        response = slo_api.list_slos(limit=page_size, offset=offset, **kwargs).to_dict()
+        page = response.get("data") or []
+        slos.extend(page)
+        if len(page) < page_size:
+            return slos
+        offset += page_size
+
+
+@hot_dataset("slos", ttl=600)
+def slo_catalog() -> List[Dict[str, Any]]:
+    """Every SLO definition."""
+    with datadog_client() as api_client:
+        return _list_all_slos(ServiceLevelObjectivesApi(api_client), None, None)
+
+
+def _primary_threshold(slo: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Pick the threshold used for the error budget, preferring the 30d timeframe."""
+    thresholds = [t for t in slo.get("thresholds") or [] if t.get("timeframe") in TIMEFRAME_SECONDS]
+    if not thresholds:
+        return None
+    return next((t for t in thresholds if t["timeframe"] == "30d"), thresholds[0])
+
+
+def _burn(error_rate: Optional[float], allowed: float) -> Optional[float]:
+    if error_rate is None or allowed <= 0:
+        return None
+    return error_rate / allowed
+
+
+@mcp.tool()
+def get_slo_burn_rates(
+    query: Optional[str] = Field(default=None, description="Query to filter SLOs by name"),
+    tags_query: Optional[str] = Field(default=None, description="Tags to filter SLOs (e.g., 'team:sre')"),
+    top: int = Field(default=20, ge=1, le=500, description="Number of ranked SLOs to return (default: 20)")
+) -> Dict[str, Any]:
+    """Compute multi-window burn rates and remaining error budget for many SLOs at once.
+
+    SLO histories for the 1h, 6h and 3d windows and for each SLO's own timeframe are
+    fetched concurrently, and the SLOs are ranked by how far their burn rates exceed the
+    paging thresholds (1h: 14.4, 6h: 6, 3d: 1).
+
+    Args:
+        query (Optional[str], optional): Query to filter SLOs by name.
+        tags_query (Optional[str], optional): Tags to filter SLOs (e.g., 'team:sre').
+        top (int, optional): Number of ranked SLOs to return (1-500). Defaults to 20.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): Ranking if successful
+                - evaluated (int): Number of SLOs evaluated
+                - failed_queries (int): Number of history queries that failed
+                - slos (list): SLOs ordered by severity with target, burn_rates,
+                  error_budget_remaining (fraction of the budget left) and state"""
+    try:
+        with datadog_client() as api_client:
+            slo_api = ServiceLevelObjectivesApi(api_client)
+            # Unfiltered requests use the SLO catalog kept warm in the background
+            definitions = _list_all_slos(slo_api, query, tags_query) if query or tags_query else slo_catalog.get()
+            slos = [(slo, _primary_threshold(slo)) for slo in definitions]
+            slos = [(slo, threshold) for slo, threshold in slos if threshold]
+            if not slos:
+                return {"status": "success", "message": "No SLOs with a supported timeframe found", "content": {"evaluated": 0, "failed_queries": 0, "slos": []}}
+
+            now = int(time.time())
+            requests = []
+            for slo, threshold in slos:
+                for window, seconds in BURN_RATE_WINDOWS.items():
+                    requests.append((slo["id"], window, seconds))
+                requests.append((slo["id"], "budget", TIMEFRAME_SECONDS[threshold["timeframe"]]))
+
+            def fetch_sli(request):
+                slo_id, _, seconds = request
+                history = slo_api.get_slo_history(slo_id, now - seconds, now).to_dict()
+                return ((history.get("data") or {}).get("overall") or {}).get("sli_value")
+
+            results = run_concurrently(
+                fetch_sli, requests, on_progress=lambda done, total: report_progress(done, total, f"{done} of {total} SLO history queries done")
+            )
+            failed = sum(1 for _, _, error in results if error is not None)
+            sli = {(slo_id, window): value for (slo_id, window, _), value, _ in results}
+
+        # Error rates and allowed error per SLO, evaluated column by column
+        ids = [slo["id"] for slo, _ in slos]
+        allowed = [(100.0 - threshold["target"]) / 100.0 for _, threshold in slos]
+        columns = {}
+        for window in list(BURN_RATE_WINDOWS) + ["budget"]:
+            errors = [None if sli.get((slo_id, window)) is None else (100.0 - sli[(slo_id, window)]) / 100.0 for slo_id in ids]
+            columns[window] = [_burn(e, a) for e, a in zip(errors, allowed)]
+
+        ranked = []
+        for i, (slo, threshold) in enumerate(slos):
+            burn_rates = {window: columns[window][i] for window in BURN_RATE_WINDOWS}
+            over = [burn_rates[w] / BURN_RATE_THRESHOLDS[w] for w in BURN_RATE_WINDOWS if burn_rates[w] is not None]
+            if burn_rates["1h"] is not None and burn_rates["6h"] is not None and burn_rates["1h"] >= BURN_RATE_THRESHOLDS["1h"] and burn_rates["6h"] >= BURN_RATE_THRESHOLDS["6h"]:
+                state = "fast_burn"
+            elif burn_rates["3d"] is not None and burn_rates["3d"] >= BURN_RATE_THRESHOLDS["3d"]:
+                state = "slow_burn"
+            elif not over:
+                state = "no_data"
+            else:
+                state = "ok"
+            consumed = columns["budget"][i]
+            ranked.append({
+                "id": slo["id"],
+                "name": slo.get("name"),
+                "tags": slo.get("tags") or [],
+                "target": threshold["target"],
+                "timeframe": threshold["timeframe"],
+                "burn_rates": {w: round(v, 3) if v is not None else None for w, v in burn_rates.items()},
+                "error_budget_remaining": round(1.0 - consumed, 4) if consumed is not None else None,
+                "state": state,
+                "_score": max(over) if over else -1.0,
+            })
+
+        ranked.sort(key=lambda r: r["_score"], reverse=True)
+        for item in ranked:
+            del item["_score"]
+
+        return {
+            "status": "success",
+            "message": "SLO burn rates computed successfully",
+            "content": {"evaluated": len(ranked), "failed_queries": failed, "slos": ranked[:top]},
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error computing SLO burn rates: {e}"}
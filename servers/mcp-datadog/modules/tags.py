@@ -1,8 +1,7 @@
 from typing import Optional, Dict, Any, List
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v1.api.tags_api import TagsApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Datadog Tags Service")
@@ -22,7 +21,7 @@ def list_host_tags(
             - message (str): Description of the operation result
             - content (dict): List of host tags if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             tags_api = TagsApi(api_client)
             response = tags_api.list_host_tags(source=source)
             return {"status": "success", "message": "Host tags listed successfully", "content": response.to_dict()}
@@ -47,7 +46,7 @@ def add_host_tags(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             tags_api = TagsApi(api_client)
             tags_api.create_host_tags(host_name, body={"tags": tags}, source=source)
             return {"status": "success", "message": "Tags added to host successfully"}
@@ -70,7 +69,7 @@ def delete_host_tags(
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             tags_api = TagsApi(api_client)
             tags_api.delete_host_tags(host_name, source=source)
             return {"status": "success", "message": "Tags deleted from host successfully"}
@@ -1,14 +1,21 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict
 from pydantic import BaseModel, Field
+import heapq
 import json
 import time
-from datadog_api_client import ApiClient
 from datadog_api_client.v2.api.spans_api import SpansApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.progress import report_progress
+from utils.queries import cached_query, normalize_search_query
+from utils.spans import SpanStreamSummary, iter_spans
 
 mcp = FastMCP("Datadog Traces Service")
 
+# Spans per search page; progress is reported once per page
+SPAN_PAGE_SIZE = 1000
+
 @mcp.tool()
 def list_traces(
     query: str,
@@ -36,7 +43,7 @@ def list_traces(
             - message (str): Description of the operation result
             - content (List): List of trace data as formatted JSON text"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             spans_api = SpansApi(api_client)
             filter_query = [query]
             if service:
@@ -87,7 +94,7 @@ def get_trace_details(
             - message (str): Description of the operation result
             - content (List): List containing trace details as formatted JSON text"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             spans_api = SpansApi(api_client)
             response = spans_api.get_span(trace_id)
 
@@ -106,56 +113,203 @@ def get_trace_details(
 def summarize_traces(
     query: str = Field(..., description="Query to filter traces"),
     from_time: int = Field(default_factory=lambda: int(time.time()) - 900, description="Start time in epoch seconds"),
-    to_time: int = Field(default_factory=lambda: int(time.time()), description="End time in epoch seconds")
+    to_time: int = Field(default_factory=lambda: int(time.time()), description="End time in epoch seconds"),
+    max_spans: int = Field(default=10000, ge=1, le=100000, description="Maximum number of spans to scan (default: 10000)")
 ) -> Dict[str, Any]:
     """Summarize trace statistics for a given query.
 
+    Spans are streamed page by page and summarized in a single pass; only a bounded
+    set of exemplar spans (slowest, errored and a sample per service and status) is kept.
+    Clients that ask for progress receive the running totals as each page arrives.
+
     Args:
         query (str): Query to filter traces.
         from_time (int, optional): Start time in epoch seconds. Defaults to last 15 minutes.
         to_time (int, optional): End time in epoch seconds. Defaults to current time.
+        max_spans (int, optional): Maximum number of spans to scan (1-100000). Defaults to 10000.
     
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
             - content (dict): Summary statistics including:
-                - trace_count (int): Number of traces found
-                - services (list): List of unique service names"""
-    try:
-        with ApiClient(configuration) as api_client:
+                - trace_count (int): Number of traces found, estimated beyond 1024 traces
+                - trace_count_approximate (bool): Whether trace_count is an estimate
+                - span_count (int): Number of spans scanned
+                - services (list): Span, error and duration statistics per service
+                - exemplars (dict): Slowest, errored and sampled spans as evidence"""
+    def load(query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+        with datadog_client() as api_client:
             spans_api = SpansApi(api_client)
-            filter_query = [query]
+            summary = SpanStreamSummary()
+            for span in iter_spans(spans_api, query, from_time, to_time, max_spans=max_spans):
+                summary.add(span)
+                if summary.span_count % SPAN_PAGE_SIZE == 0:
+                    report_progress(summary.span_count, max_spans, summary.headline())
+            # Always close with the full total, unless the last page already reported it
+            if summary.span_count != max_spans or max_spans % SPAN_PAGE_SIZE:
+                report_progress(max_spans, max_spans, summary.headline())
+        return {**summary.to_dict(), "truncated": summary.span_count >= max_spans}
 
-            response = spans_api.list_spans(
-                body={
-                    "data": {
-                        "attributes": {
-                            "filter": {
-                                "query": " ".join(filter_query),
-                                "from": from_time,
-                                "to": to_time,
-                            },
-                            "page": {"limit": 1000},
-                        },
-                        "type": "search_request",
-                    }
-                }
-            )
+    try:
+        # Repeated summaries of the same spans within a rollup interval are served from the cache
+        content = cached_query("span_summary", query, from_time, to_time, load, normalize=normalize_search_query, widen=True, max_spans=max_spans)
+        if not content["span_count"]:
+            return {"status": "error", "message": "No trace data returned", "content": []}
 
-            if not response.data:
-                return {"status": "error", "message": "No trace data returned", "content": []}
+        return {"status": "success", "message": "Trace summary retrieved successfully", "content": content}
+    except Exception as e:
+        return {"status": "error", "message": f"Error summarizing traces: {e}", "content": []}
 
-            trace_count = len(response.data)
-            services = set(d.attributes.get("service", "unknown") for d in response.data)
+# Spans of a single trace are fetched with a trace_id query; larger traces are truncated
+TRACE_MAX_SPANS = 20000
 
-            return {
-                "status": "success",
-                "message": "Trace summary retrieved successfully",
-                "content": {
-                    "trace_count": trace_count,
-                    "services": list(services)
-                }
-            }
+
+def _covered_time(intervals: List[Tuple[float, float]], start: float, end: float) -> float:
+    """Length of the union of ``intervals`` clipped to [start, end]."""
+    covered = 0.0
+    cursor = start
+    for s, e in sorted(intervals):
+        s, e = max(s, cursor), min(e, end)
+        if e > s:
+            covered += e - s
+            cursor = e
+    return covered
+
+
+def _critical_path(root_id: str, spans: Dict[str, Dict[str, Any]], children: Dict[str, List[str]]) -> Dict[str, float]:
+    """Time each span spends on the critical path below ``root_id``.
+
+    Walks back from the end of each span, repeatedly descending into the child that
+    finished last before the cursor; time not covered by such a child is blocked on
+    the span itself.
+    """
+    contributions: Dict[str, float] = defaultdict(float)
+    stack = [(root_id, spans[root_id]["start"], spans[root_id]["end"])]
+    while stack:
+        span_id, start, end = stack.pop()
+        cursor = end
+        for child_id in sorted(children.get(span_id, ()), key=lambda c: spans[c]["end"], reverse=True):
+            child = spans[child_id]
+            if child["start"] >= cursor:
+                continue
+            child_start, child_end = max(child["start"], start), min(child["end"], cursor)
+            if child_end <= child_start:
+                continue
+            contributions[span_id] += cursor - child_end
+            stack.append((child_id, child_start, child_end))
+            cursor = child_start
+        contributions[span_id] += max(0.0, cursor - start)
+    return contributions
+
+
+def _span_ref(span: Dict[str, Any]) -> Dict[str, Any]:
+    return {"span_id": span["span_id"], "service": span["service"], "resource": span["resource"], "error": span["error"]}
+
+
+def _analyze_span_tree(span_list: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    spans = {s["span_id"]: s for s in span_list if s["span_id"] and s["start"] is not None}
+    children: Dict[str, List[str]] = defaultdict(list)
+    roots = []
+    for span_id, span in spans.items():
+        if span["parent_id"] in spans:
+            children[span["parent_id"]].append(span_id)
+        else:
+            roots.append(span_id)
+    if not roots:
+        return {}
+    root_id = max(roots, key=lambda r: spans[r]["duration"])
+    root = spans[root_id]
+
+    # Post-order pass: subtree span counts and self time (duration not covered by children)
+    order = []
+    stack = list(roots)
+    while stack:
+        span_id = stack.pop()
+        order.append(span_id)
+        stack.extend(children.get(span_id, ()))
+    subtree_size = {}
+    self_time_by_service: Dict[str, float] = defaultdict(float)
+    for span_id in reversed(order):
+        span = spans[span_id]
+        kids = children.get(span_id, ())
+        subtree_size[span_id] = 1 + sum(subtree_size[c] for c in kids)
+        covered = _covered_time([(spans[c]["start"], spans[c]["end"]) for c in kids], span["start"], span["end"])
+        self_time_by_service[span["service"]] += max(0.0, span["duration"] - covered)
+
+    total = root["duration"] or 1e-9
+    contributions = _critical_path(root_id, spans, children)
+    critical_path = [
+        {**_span_ref(spans[span_id]), "critical_ms": round(seconds * 1000, 3), "pct": round(100 * seconds / total, 1)}
+        for span_id, seconds in sorted(contributions.items(), key=lambda item: item[1], reverse=True)[:top]
+        if seconds > 0
+    ]
+    slowest_subtrees = [
+        {**_span_ref(spans[span_id]), "duration_ms": round(spans[span_id]["duration"] * 1000, 3), "span_count": subtree_size[span_id]}
+        for span_id in heapq.nlargest(top, (s for s in spans if s != root_id), key=lambda s: spans[s]["duration"])
+    ]
+    self_time_total = sum(self_time_by_service.values()) or 1e-9
+
+    return {
+        "root": {**_span_ref(root), "duration_ms": round(root["duration"] * 1000, 3)},
+        "span_count": len(spans),
+        "orphan_roots": len(roots) - 1,
+        "error_count": sum(1 for s in spans.values() if s["error"]),
+        "services": len(self_time_by_service),
+        "critical_path": critical_path,
+        "self_time_by_service": [
+            {"service": service, "self_ms": round(seconds * 1000, 3), "pct": round(100 * seconds / self_time_total, 1)}
+            for service, seconds in sorted(self_time_by_service.items(), key=lambda item: item[1], reverse=True)
+        ],
+        "slowest_subtrees": slowest_subtrees,
+    }
+
+
+@mcp.tool()
+def analyze_trace(
+    trace_id: str = Field(..., description="The ID of the trace to analyze"),
+    from_time: int = Field(default_factory=lambda: int(time.time()) - 86400, description="Start time in epoch seconds (default: last 24 hours)"),
+    to_time: int = Field(default_factory=lambda: int(time.time()), description="End time in epoch seconds (default: now)"),
+    top: int = Field(default=10, ge=1, le=50, description="Number of entries in each ranked list (default: 10)")
+) -> Dict[str, Any]:
+    """Rebuild the span tree of a trace and explain where its time went.
+
+    All spans of the trace are fetched page by page, linked to their parents and
+    reduced to the critical path, the self time per service and the slowest subtrees.
+
+    Args:
+        trace_id (str): The ID of the trace to analyze.
+        from_time (int, optional): Start time in epoch seconds. Defaults to last 24 hours.
+        to_time (int, optional): End time in epoch seconds. Defaults to current time.
+        top (int, optional): Number of entries in each ranked list (1-50). Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): Trace analysis if successful
+                - root (dict): Root span and total duration
+                - span_count, error_count, services (int): Trace size
+                - critical_path (list): Spans ranked by time spent on the critical path
+                - self_time_by_service (list): Time spent in each service excluding children
+                - slowest_subtrees (list): Longest non-root spans with their subtree size"""
+    try:
+        with datadog_client() as api_client:
+            spans_api = SpansApi(api_client)
+            span_list = []
+            for span in iter_spans(spans_api, f"trace_id:{trace_id}", from_time, to_time, max_spans=TRACE_MAX_SPANS):
+                span_list.append(span)
+                if len(span_list) % SPAN_PAGE_SIZE == 0:
+                    report_progress(len(span_list), message=f"{len(span_list)} spans of trace {trace_id} fetched")
+
+        if not span_list:
+            return {"status": "error", "message": f"No spans found for trace {trace_id}", "content": {}}
+
+        analysis = _analyze_span_tree(span_list, top)
+        if not analysis:
+            return {"status": "error", "message": f"Could not rebuild the span tree of trace {trace_id}", "content": {}}
+        analysis["truncated"] = len(span_list) >= TRACE_MAX_SPANS
+
+        return {"status": "success", "message": "Trace analyzed successfully", "content": analysis}
     except Exception as e:
-        return {"status": "error", "message": f"Error summarizing traces: {e}", "content": []}
+        return {"status": "error", "message": f"Error analyzing trace: {e}", "content": {}}
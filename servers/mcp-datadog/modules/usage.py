@@ -1,34 +1,153 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Tuple
+from datetime import datetime, timedelta, timezone
 from pydantic import Field
-from datadog_api_client import ApiClient
-from datadog_api_client.v1.api.usage_metering_api import UsageMeteringApi
-from config import configuration
+from datadog_api_client.v2.api.usage_metering_api import UsageMeteringApi
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
+from utils.cache import create_cache
+from utils.concurrency import RateLimiter, run_concurrently
+from utils.orgs import PerOrg
+from utils.progress import report_progress
 
 mcp = FastMCP("Datadog Usage Service")
 
+# Long ranges are split into chunks of this many days and fetched concurrently
+USAGE_CHUNK_DAYS = 7
+# Datadog finalizes usage within 72 hours; older chunks never change and are cached forever
+USAGE_FINALIZED_AFTER = timedelta(hours=72)
+USAGE_RECENT_TTL = 600
+
+# The usage metering endpoints have a low rate limit per org, shared by every chunk and page
+_usage_limiter = PerOrg(lambda: RateLimiter(rate=2.0, burst=4))
+_usage_cache = create_cache("usage_chunks", max_entries=4096)
+
+UsageRecord = Tuple[str, str, str, float]
+
+
+def _chunk_ranges(start: datetime, end: datetime, days: int) -> List[Tuple[datetime, datetime]]:
+    chunks = []
+    while start < end:
+        chunk_end = min(start + timedelta(days=days), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end
+    return chunks
+
+
+def _fetch_usage_chunk(usage_api: UsageMeteringApi, product_families: str, start: datetime, end: datetime) -> List[UsageRecord]:
+    """Fetch every page of hourly usage for one chunk as (hour, product_family, usage_type, value) records."""
+    records = []
+    next_record_id = None
+    while True:
+        kwargs = {"filter_timestamp_end": end, "page_limit": 500}
+        if next_record_id:
+            kwargs["page_next_record_id"] = next_record_id
+        _usage_limiter.get().acquire()
+        response = usage_api.get_hourly_usage(start, product_families, **kwargs).to_dict()
+
+        for item in response.get("data") or []:
+            attributes = item.get("attributes") or {}
+            timestamp = attributes.get("timestamp")
+            hour = timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp)
+            for measurement in attributes.get("measurements") or []:
+                if measurement.get("value") is not None:
+                    records.append((hour, attributes.get("product_family"), measurement.get("usage_type"), measurement["value"]))
+
+        next_record_id = ((response.get("meta") or {}).get("pagination") or {}).get("next_record_id")
+        if not next_record_id:
+            return records
+
+
+def _rollup(records: List[UsageRecord], granularity: str) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+    """Aggregate hourly records per product family, period and usage type into sum and hourly peak."""
+    period_length = 7 if granularity == "month" else 10
+    rollup: Dict[str, Dict[str, Dict[str, Dict[str, float]]]] = {}
+    for hour, family, usage_type, value in records:
+        periods = rollup.setdefault(family, {})
+        usage = periods.setdefault(hour[:period_length], {})
+        totals = usage.setdefault(usage_type, {"sum": 0, "max": value})
+        totals["sum"] += value
+        totals["max"] = max(totals["max"], value)
+    return rollup
+
+
 @mcp.tool()
 def get_hourly_usage(
     start_date: str = Field(..., description="The start date for hourly usage in YYYY-MM-DD format"),
-    end_date: str = Field(..., description="The end date for hourly usage in YYYY-MM-DD format"),
-    usage_type: Optional[str] = Field(default=None, description="The type of usage to retrieve (e.g., 'logs', 'hosts')")
+    end_date: str = Field(..., description="The end date (inclusive) for hourly usage in YYYY-MM-DD format"),
+    product_families: str = Field(default="all", description="Comma separated product families (e.g., 'infra_hosts,logs'), default: all"),
+    granularity: str = Field(default="day", description="Rollup granularity: 'day' or 'month'")
 ) -> Dict[str, Any]:
-    """Retrieve hourly usage data.
+    """Retrieve hourly usage and aggregate it per product family into daily or monthly rollups.
+
+    Long ranges are split into chunks that are fetched concurrently (following pagination
+    within each chunk) under a shared rate limit. Chunks older than 72 hours are cached
+    permanently because finalized usage does not change. Progress is reported per chunk.
 
     Args:
         start_date (str): The start date for hourly usage in YYYY-MM-DD format.
-        end_date (str): The end date for hourly usage in YYYY-MM-DD format.
-        usage_type (Optional[str], optional): The type of usage to retrieve (e.g., 'logs', 'hosts').
-    
+        end_date (str): The end date (inclusive) for hourly usage in YYYY-MM-DD format.
+        product_families (str, optional): Comma separated product families (e.g., 'infra_hosts,logs'). Defaults to "all".
+        granularity (str, optional): Rollup granularity: 'day' or 'month'. Defaults to "day".
+
     Returns:
         Dict[str, Any]: A dictionary containing:
             - status (str): 'success' or 'error'
             - message (str): Description of the operation result
-            - content (dict): Hourly usage data if successful"""
+            - content (dict): Usage rollup if successful
+                - granularity (str): Granularity used for the periods
+                - chunks (dict): Number of chunks fetched, served from cache and failed
+                - usage (dict): product_family -> period -> usage_type -> {sum, max}"""
     try:
-        with ApiClient(configuration) as api_client:
+        if granularity not in ("day", "month"):
+            return {"status": "error", "message": "granularity must be 'day' or 'month'"}
+
+        start = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        end = min(datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1), now)
+        if start >= end:
+            return {"status": "error", "message": "start_date must be before end_date and not in the future"}
+
+        chunks = _chunk_ranges(start, end, USAGE_CHUNK_DAYS)
+        cached = {}
+        missing = []
+        for chunk in chunks:
+            records = _usage_cache.get((product_families, chunk))
+            if records is None:
+                missing.append(chunk)
+            else:
+                cached[chunk] = records
+
+        with datadog_client() as api_client:
             usage_api = UsageMeteringApi(api_client)
-            response = usage_api.get_hourly_usage(start_date=start_date, end_date=end_date, usage_type=usage_type)
-            return {"status": "success", "message": "Hourly usage retrieved successfully", "content": response.to_dict()}
+            results = run_concurrently(
+                lambda chunk: _fetch_usage_chunk(usage_api, product_families, *chunk),
+                missing,
+                on_progress=lambda done, total: report_progress(
+                    len(cached) + done, len(chunks), f"{len(cached) + done} of {len(chunks)} usage chunks retrieved"
+                ),
+            )
+
+        records = [record for chunk_records in cached.values() for record in chunk_records]
+        failed = []
+        for chunk, chunk_records, error in results:
+            if error is not None:
+                failed.append({"start": chunk[0].isoformat(), "end": chunk[1].isoformat(), "error": str(error)})
+                continue
+            ttl = None if now - chunk[1] >= USAGE_FINALIZED_AFTER else USAGE_RECENT_TTL
+            _usage_cache.set((product_families, chunk), chunk_records, ttl)
+            records.extend(chunk_records)
+
+        if failed and len(failed) == len(chunks):
+            return {"status": "error", "message": f"Error retrieving hourly usage: {failed[0]['error']}"}
+
+        return {
+            "status": "success",
+            "message": "Hourly usage retrieved successfully" if not failed else "Hourly usage partially retrieved",
+            "content": {
+                "granularity": granularity,
+                "chunks": {"total": len(chunks), "cached": len(cached), "failed": failed},
+                "usage": _rollup(records, granularity),
+            },
+        }
     except Exception as e:
         return {"status": "error", "message": f"Error retrieving hourly usage: {e}"}
@@ -1,8 +1,7 @@
 from typing import Optional, Dict, Any
 from pydantic import Field
-from datadog_api_client import ApiClient
 from datadog_api_client.v2.api.users_api import UsersApi
-from config import configuration
+from config import datadog_client
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Datadog Users Service")
@@ -20,7 +19,7 @@ def list_users() -> Dict[str, Any]:
             - message (str): Description of the operation result
             - content (dict): List of users if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             users_api = UsersApi(api_client)
             response = users_api.list_users()
             return {"status": "success", "message": "Users listed successfully", "content": response.to_dict()}
@@ -42,7 +41,7 @@ def get_user(
             - message (str): Description of the operation result
             - content (dict): User details if successful"""
     try:
-        with ApiClient(configuration) as api_client:
+        with datadog_client() as api_client:
             users_api = UsersApi(api_client)
             response = users_api.get_user(user_id)
             return {"status": "success", "message": "User retrieved successfully", "content": response.to_dict()}
@@ -0,0 +1,98 @@
+import time
+from typing import Any, Dict, List, Optional
+from pydantic import Field
+from mcp.server.fastmcp import FastMCP
+from utils.alert_store import alert_store
+from utils.orgs import current_org_name
+
+mcp = FastMCP("Datadog Webhooks Service")
+
+
+def _service_tags(service: Optional[str], tags: Optional[List[str]]) -> List[str]:
+    return [*(tags or []), *([f"service:{service}"] if service else [])]
+
+
+@mcp.tool()
+def search_alert_activity(
+    monitor_id: Optional[int] = Field(default=None, description="Only alerts of this monitor"),
+    service: Optional[str] = Field(default=None, description="Only alerts tagged service:<service>"),
+    tags: Optional[List[str]] = Field(default=None, description="Only alerts carrying all these tags (e.g., ['env:prod'])"),
+    transitions: Optional[List[str]] = Field(default=None, description="Only these transitions (e.g., ['Triggered', 'Recovered', 'Warn', 'No Data'])"),
+    minutes: int = Field(default=60, ge=1, le=7 * 24 * 60, description="How many minutes back to search (default: 60)"),
+    limit: int = Field(default=50, ge=1, le=500, description="Maximum number of alerts to return (default: 50)")
+) -> Dict[str, Any]:
+    """Search the recent alert activity received from Datadog alert webhooks.
+
+    Answered from the local alert store, with no call to the Datadog API. Only alerts
+    delivered to the webhook endpoint since the store's retention are known.
+
+    Args:
+        monitor_id (Optional[int], optional): Only alerts of this monitor.
+        service (Optional[str], optional): Only alerts tagged service:<service>.
+        tags (Optional[List[str]], optional): Only alerts carrying all these tags.
+        transitions (Optional[List[str]], optional): Only these transitions.
+        minutes (int, optional): How many minutes back to search. Defaults to 60.
+        limit (int, optional): Maximum number of alerts to return (1-500). Defaults to 50.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): total, by_transition (count per transition) and the alerts,
+              newest first"""
+    try:
+        now = time.time()
+        result = alert_store().search(
+            current_org_name(),
+            now - minutes * 60,
+            now,
+            monitor_id=monitor_id,
+            tags=_service_tags(service, tags),
+            transitions=transitions or (),
+            limit=limit,
+        )
+        return {"status": "success", "message": f"Found {result['total']} alerts in the last {minutes} minutes", "content": result}
+    except Exception as e:
+        return {"status": "error", "message": f"Error searching alert activity: {e}"}
+
+
+@mcp.tool()
+def get_recent_monitor_states(
+    service: Optional[str] = Field(default=None, description="Only monitors alerting on service:<service>"),
+    tags: Optional[List[str]] = Field(default=None, description="Only alerts carrying all these tags (e.g., ['env:prod'])"),
+    states: Optional[List[str]] = Field(default=None, description="Only monitors in these states (e.g., ['Alert', 'Warn'])"),
+    minutes: int = Field(default=60, ge=1, le=7 * 24 * 60, description="How many minutes back to look (default: 60)")
+) -> Dict[str, Any]:
+    """Latest state of each monitor that alerted recently, from Datadog alert webhooks.
+
+    Answered from the local alert store, with no call to the Datadog API. Each monitor's
+    state is the one its latest webhook transitioned to (Alert, Warn, OK or No Data).
+
+    Args:
+        service (Optional[str], optional): Only monitors alerting on service:<service>.
+        tags (Optional[List[str]], optional): Only alerts carrying all these tags.
+        states (Optional[List[str]], optional): Only monitors in these states.
+        minutes (int, optional): How many minutes back to look. Defaults to 60.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - status (str): 'success' or 'error'
+            - message (str): Description of the operation result
+            - content (dict): summary (count of monitors per state) and monitors (latest
+              alert of each monitor with its alert count), most recent first"""
+    try:
+        monitors = alert_store().monitor_states(current_org_name(), time.time() - minutes * 60, _service_tags(service, tags))
+        if states:
+            wanted = {state.lower() for state in states}
+            monitors = [monitor for monitor in monitors if (monitor["state"] or "").lower() in wanted]
+        summary: Dict[str, int] = {}
+        for monitor in monitors:
+            state = monitor["state"] or "Unknown"
+            summary[state] = summary.get(state, 0) + 1
+        return {
+            "status": "success",
+            "message": f"{len(monitors)} monitors alerted in the last {minutes} minutes",
+            "content": {"summary": summary, "monitors": monitors},
+        }
+    except Exception as e:
+        return {"status": "error", "message": f"Error reading monitor states: {e}"}
@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# The server modules import each other from the server directory, as main.py runs them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATADOG_API_KEY", "test")
+os.environ.setdefault("DATADOG_APP_KEY", "test")
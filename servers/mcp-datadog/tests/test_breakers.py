@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from utils import breakers
+from utils.deadlines import Deadline, _deadline
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(breakers, "_settings", {**breakers._settings, "min_calls": 2, "window": 4})
+    monkeypatch.setattr(breakers.CircuitBreaker, "instances", {})
+
+
+def _timeout():
+    raise TimeoutError("read timed out")
+
+
+def test_timeouts_of_expired_deadlines_do_not_open_the_circuit():
+    token = _deadline.set(Deadline(0))
+    try:
+        for _ in range(5):
+            with pytest.raises(TimeoutError):
+                breakers.call_upstream("v2/spans", "POST", _timeout)
+    finally:
+        _deadline.reset(token)
+
+    assert breakers.CircuitBreaker.for_api("v2/spans").state == breakers.CLOSED
+
+
+def test_timeouts_with_time_left_open_the_circuit():
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breakers.call_upstream("v2/spans", "POST", _timeout)
+
+    assert breakers.CircuitBreaker.for_api("v2/spans").state == breakers.OPEN
+
+
+class _Limiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+def test_hedged_request_spends_a_limiter_token(monkeypatch):
+    monkeypatch.setitem(breakers._settings, "hedge_reads", True)
+    monkeypatch.setattr(breakers.CircuitBreaker, "hedge_delay", lambda self: 0.01)
+    calls = []
+    release = threading.Event()
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(1)
+        return len(calls)
+
+    limiter = _Limiter()
+    started = time.perf_counter()
+    assert breakers.call_upstream("v1/monitor", "GET", call, limiter) == 2
+    release.set()
+
+    assert limiter.acquired == 1
+    assert time.perf_counter() - started < 1
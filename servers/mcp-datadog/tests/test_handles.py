@@ -0,0 +1,43 @@
+import json
+
+from utils import handles
+
+
+def _spans(count):
+    return [
+        {"trace_id": f"{i:032x}", "service": "checkout", "resource": "GET /cart", "meta": {"http.url": "/cart?" + "x" * 2000}, "error": "y" * 5000}
+        for i in range(count)
+    ]
+
+
+def test_text_content_is_parsed_before_choosing_the_items():
+    spans = _spans(100)
+    content = [{"type": "text", "text": json.dumps({"traces": spans})}]
+
+    summary = handles.store_result(content, len(json.dumps(content)))
+
+    assert summary["items_path"] == "traces"
+    assert summary["total_items"] == 100
+    assert summary["fields"] == ["error", "meta", "resource", "service", "trace_id"]
+    assert handles.stored_result(summary["handle"])["items"] == spans
+
+
+def test_summary_stays_small_for_large_items():
+    content = {"traces": _spans(100)}
+    size = len(json.dumps(content))
+
+    summary = handles.store_result(content, size)
+
+    assert len(json.dumps(summary)) < 4096 < size
+    assert summary["preview"][0]["meta"] == "<1 items>"
+    assert summary["preview"][0]["error"].endswith("<5000 chars>")
+
+
+def test_preview_of_wide_items_is_cut():
+    content = [{f"field_{i}": i for i in range(1000)} for _ in range(3)]
+
+    summary = handles.store_result(content, len(json.dumps(content)))
+
+    assert len(summary["fields"]) == handles.SUMMARY_MAX_FIELDS
+    assert len(json.dumps(summary)) < 4096
+    assert all(item.endswith("<17780 chars>") for item in summary["preview"])
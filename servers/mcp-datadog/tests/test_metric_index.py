@@ -0,0 +1,42 @@
+from modules import metrics
+from utils.cache import OrgScopedCache, SharedCache
+from utils.metric_index import MetricIndex
+from utils import warmup
+
+
+def test_names_differing_by_separators_stay_apart():
+    index = MetricIndex()
+    index.sync(1, ["my_app.requests", "my.app.requests", "trace.http.request.hits"])
+
+    assert len(index) == 3
+    assert "my_app.requests" in index and "my.app.requests" in index
+    assert "trace.http_request.hits" not in index
+    assert index.search("my.app.requests")[0] == {"name": "my.app.requests", "match": "exact", "score": 1.0}
+    assert {match["name"] for match in index.search("my_app.requests", 2)} == {"my_app.requests", "my.app.requests"}
+    assert sorted(index.prefix("my.app")) == ["my.app.requests", "my_app.requests"]
+
+
+def test_sync_removes_one_of_colliding_names():
+    index = MetricIndex()
+    index.sync(1, [f"metric.{i}" for i in range(20)] + ["my_app.requests", "my.app.requests"])
+    index.sync(2, [f"metric.{i}" for i in range(20)] + ["my.app.requests"])
+
+    assert "my_app.requests" not in index
+    assert index.prefix("my.app") == ["my.app.requests"]
+    assert "my_app.requests" not in [match["name"] for match in index.search("my app requests", 5)]
+
+
+def test_metric_index_reads_the_shared_catalog_once_per_copy(monkeypatch, tmp_path):
+    monkeypatch.setattr(warmup, "_datasets", OrgScopedCache(SharedCache("hot_datasets", str(tmp_path / "cache.sqlite3"))))
+    monkeypatch.setattr(metrics, "_metric_index", metrics.PerOrg(MetricIndex))
+    loads = []
+    monkeypatch.setattr(metrics.metric_names, "loader", lambda: loads.append(1) or ["system.cpu.idle"])
+    reads = []
+    get_entry = metrics.metric_names.get_entry
+    monkeypatch.setattr(metrics.metric_names, "get_entry", lambda: reads.append(1) or get_entry())
+
+    for _ in range(3):
+        assert "system.cpu.idle" in metrics.metric_index()
+
+    assert loads == [1]
+    assert reads == [1]
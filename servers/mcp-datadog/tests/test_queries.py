@@ -0,0 +1,20 @@
+from utils.queries import align_time_range
+
+NOW = 1_700_000_000
+
+
+def test_metric_ranges_keep_their_rollup():
+    start, end, interval = align_time_range(NOW - 3 * 86400 + 100, NOW + 100)
+
+    assert interval == 3600
+    assert start % interval == 0 and end % interval == 0
+    assert end - start == 3 * 86400
+
+
+def test_widened_ranges_cover_the_requested_range():
+    from_time, to_time = NOW - 3 * 86400 + 100, NOW + 100
+    start, end, interval = align_time_range(from_time, to_time, widen=True)
+
+    assert start <= from_time < start + interval
+    assert to_time <= end < to_time + interval
+    assert start % interval == 0 and end % interval == 0
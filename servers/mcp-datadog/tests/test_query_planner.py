@@ -0,0 +1,156 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from utils import deadlines, query_planner
+from utils.deadlines import CallAborted, Deadline, check_deadline
+from utils.query_planner import MetricQueryPlanner, _Request
+
+NOW = 1_700_000_000
+
+
+class FakeMetricsApi:
+    """Answers a fused query after ``delay`` seconds, checking the deadline like ``ApiClient.call_api``."""
+
+    calls = []
+    delay = 0.3
+
+    def __init__(self, api_client) -> None:
+        pass
+
+    def query_metrics(self, start, end, query):
+        check_deadline()
+        FakeMetricsApi.calls.append(query)
+        time.sleep(self.delay)
+        check_deadline()
+        series = [
+            {"query_index": index, "pointlist": [[start * 1000, float(index)], [end * 1000, float(index)]], "start": start * 1000, "end": end * 1000}
+            for index, _ in enumerate(query.split(","))
+        ]
+        return type("Response", (), {"to_dict": lambda self: {"series": series, "query": query}})()
+
+
+@contextmanager
+def fake_client():
+    yield None
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    FakeMetricsApi.calls = []
+    monkeypatch.setattr(query_planner, "MetricsApi", FakeMetricsApi)
+    monkeypatch.setattr(query_planner, "datadog_client", fake_client)
+    return FakeMetricsApi
+
+
+def run_with_deadline(planner, query, timeout, results, name):
+    context = contextvars.copy_context()
+    context.run(deadlines._deadline.set, Deadline(timeout))
+    try:
+        results[name] = context.run(planner.query, query, NOW - 3600, NOW)
+    except Exception as e:
+        results[name] = e
+
+
+def test_aborted_first_caller_does_not_fail_the_others(fake_api):
+    planner = MetricQueryPlanner(window=0.05, max_queries=10)
+    results = {}
+    first = threading.Thread(target=run_with_deadline, args=(planner, "avg:a{*}", 0.1, results, "first"))
+    first.start()
+    time.sleep(0.01)
+    second = threading.Thread(target=run_with_deadline, args=(planner, "avg:b{*}", 60, results, "second"))
+    second.start()
+    first.join()
+    second.join()
+
+    assert isinstance(results["first"], CallAborted)
+    assert isinstance(results["second"], dict)
+    assert results["second"]["query"] == "avg:b{*}"
+    # Both queries still went upstream together
+    assert fake_api.calls == ["avg:a{*},avg:b{*}"]
+
+
+def test_abandoned_request_is_left_out_of_its_batch(fake_api):
+    fake_api.delay = 0.0
+    planner = MetricQueryPlanner(window=0.2, max_queries=10)
+    results = {}
+    first = threading.Thread(target=run_with_deadline, args=(planner, "avg:a{*}", 0.05, results, "first"))
+    second = threading.Thread(target=run_with_deadline, args=(planner, "avg:b{*}", 60, results, "second"))
+    first.start()
+    second.start()
+    first.join()
+    second.join()
+    fake_api.delay = 0.3
+
+    assert isinstance(results["first"], CallAborted)
+    assert fake_api.calls == ["avg:b{*}"]
+
+
+def test_batch_runs_under_the_longest_deadline_of_its_callers(fake_api, monkeypatch):
+    fake_api.delay = 0.0
+    remaining = []
+    query_metrics = FakeMetricsApi.query_metrics
+
+    def record_deadline(self, start, end, query):
+        remaining.append(deadlines.remaining_time())
+        return query_metrics(self, start, end, query)
+
+    monkeypatch.setattr(FakeMetricsApi, "query_metrics", record_deadline)
+    planner = MetricQueryPlanner(window=0.05, max_queries=10)
+    results = {}
+    first = threading.Thread(target=run_with_deadline, args=(planner, "avg:a{*}", 5, results, "first"))
+    second = threading.Thread(target=run_with_deadline, args=(planner, "avg:b{*}", 10, results, "second"))
+    first.start()
+    second.start()
+    first.join()
+    second.join()
+    fake_api.delay = 0.3
+
+    assert len(fake_api.calls) == 1
+    assert 5 < remaining[0] <= 10
+
+
+def test_plan_merges_overlapping_ranges_with_the_same_rollup():
+    planner = MetricQueryPlanner(window=0, max_queries=10)
+    a = _Request("avg:a{*}", NOW - 3600, NOW)
+    b = _Request("avg:b{*}", NOW - 3000, NOW - 60)
+    c = _Request("avg:c{*}", NOW + 7200, NOW + 9000)
+    calls = planner.plan([a, b, c])
+
+    assert sorted(len(call) for call in calls) == [1, 2]
+    assert [a, b] in calls
+
+
+def test_plan_keeps_apart_ranges_with_different_rollups():
+    planner = MetricQueryPlanner(window=0, max_queries=10)
+    hour = _Request("avg:a{*}", NOW - 3600, NOW)
+    day = _Request("avg:a{*}", NOW - 86400, NOW)
+
+    assert len(planner.plan([hour, day])) == 2
+
+
+def test_plan_splits_past_max_queries():
+    planner = MetricQueryPlanner(window=0, max_queries=2)
+    requests = [_Request(f"avg:m{index}{{*}}", NOW - 3600, NOW) for index in range(5)]
+    calls = planner.plan(requests)
+
+    assert [len(call) for call in calls] == [2, 2, 1]
+    assert max(len({request.query for request in call}) for call in calls) <= 2
+
+
+def test_plan_shares_a_query_repeated_over_the_same_range():
+    planner = MetricQueryPlanner(window=0, max_queries=1)
+    requests = [_Request("avg:a{*}", NOW - 3600, NOW) for _ in range(3)]
+
+    assert len(planner.plan(requests)) == 1
+
+
+def test_plan_does_not_merge_when_the_union_changes_the_rollup():
+    planner = MetricQueryPlanner(window=0, max_queries=10)
+    a = _Request("avg:a{*}", NOW - 3600, NOW)
+    b = _Request("avg:b{*}", NOW - 3000, NOW + 600)
+
+    assert len(planner.plan([a, b])) == 2
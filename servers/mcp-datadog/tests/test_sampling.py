@@ -0,0 +1,33 @@
+from utils.sampling import DistinctCounter
+from utils.spans import SpanStreamSummary
+
+
+def test_distinct_counter_is_exact_below_k():
+    counter = DistinctCounter(k=64)
+    for i in range(500):
+        counter.add(f"trace-{i % 50}")
+
+    assert counter.exact
+    assert counter.count() == 50
+
+
+def test_distinct_counter_estimates_in_bounded_memory():
+    counter = DistinctCounter(k=1024)
+    for repeat in range(2):
+        for i in range(100_000):
+            counter.add(f"{i:032x}")
+
+    assert not counter.exact
+    assert len(counter._hashes) == 1024
+    assert abs(counter.count() - 100_000) < 100_000 * 0.1
+
+
+def test_span_summary_reports_approximate_trace_counts():
+    summary = SpanStreamSummary()
+    for i in range(5000):
+        summary.add({"trace_id": str(i), "span_id": str(i), "service": "web", "resource": "GET /", "duration": 0.01, "error": False})
+
+    content = summary.to_dict()
+    assert content["trace_count_approximate"]
+    assert abs(content["trace_count"] - 5000) < 500
+    assert "~" in summary.headline()
@@ -0,0 +1,42 @@
+import pytest
+
+from modules import service_dependencies
+from utils.cache import OrgScopedCache, SharedCache
+
+CALLS = {"web": {"calls": ["checkout"]}, "checkout": {"calls": ["payments"]}}
+
+
+@pytest.fixture
+def shared_graphs(monkeypatch, tmp_path):
+    """Graphs in a shared cache, as with several workers; returns the dependency API calls and the cache."""
+    graphs = OrgScopedCache(SharedCache("service_graphs", str(tmp_path / "cache.sqlite3"), max_entries=128))
+    monkeypatch.setattr(service_dependencies, "_graphs", graphs)
+    monkeypatch.setattr(service_dependencies, "_local_graphs", {})
+    calls = []
+    monkeypatch.setattr(service_dependencies, "_get_service_dependencies", lambda path, env: calls.append(env) or CALLS)
+    return calls, graphs
+
+
+def test_shared_graph_is_reused_while_unchanged(shared_graphs):
+    calls, _ = shared_graphs
+    graph = service_dependencies.get_service_graph("prod")
+
+    assert service_dependencies.get_service_graph("prod") is graph
+    assert calls == ["prod"]
+
+
+def test_graph_rebuilt_by_another_worker_is_read_again(shared_graphs):
+    calls, graphs = shared_graphs
+    graph = service_dependencies.get_service_graph("prod")
+
+    # Another worker rebuilds the graph
+    rebuilt = service_dependencies.ServiceGraph("prod", {"web": ["search"]})
+    rebuilt.built_at = graph.built_at + 60
+    graphs.set("prod", rebuilt)
+    graphs.set(("built_at", "prod"), rebuilt.built_at)
+
+    current = service_dependencies.get_service_graph("prod")
+    assert current is not graph
+    assert "search" in current
+    assert service_dependencies.get_service_graph("prod") is current
+    assert calls == ["prod"]
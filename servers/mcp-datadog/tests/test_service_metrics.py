@@ -0,0 +1,39 @@
+import pytest
+
+from modules import metrics
+from utils.metric_index import MetricIndex
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    index = MetricIndex()
+    index.sync(1, ["trace.checkout.duration", "trace.checkout.errors", "trace.checkout.downstream.duration", "trace.web.duration"])
+    monkeypatch.setattr(metrics, "metric_index", lambda: index)
+    sent = []
+    monkeypatch.setattr(metrics, "_query_metrics", lambda query, from_time, to_time: sent.append(query) or {"series": []})
+    return sent
+
+
+@pytest.mark.parametrize(
+    "tool, query",
+    [
+        (metrics.query_p99_latency, "p99:trace.checkout.duration{*}"),
+        (metrics.query_error_rate, "sum:trace.checkout.errors{*}.as_rate()"),
+        (metrics.query_downstream_latency, "p99:trace.checkout.downstream.duration{*}"),
+    ],
+)
+def test_service_metric_tools_query_existing_metrics(queries, tool, query):
+    result = tool(service_name="checkout", from_time=NOW - 3600, to_time=NOW)
+
+    assert result["status"] == "success"
+    assert queries == [query]
+
+
+def test_service_metric_tools_reject_unknown_services(queries):
+    result = metrics.query_p99_latency(service_name="chekout", from_time=NOW - 3600, to_time=NOW)
+
+    assert result["status"] == "error"
+    assert "trace.checkout.duration" in result["content"]["suggestions"]
+    assert queries == []
@@ -0,0 +1,50 @@
+import asyncio
+import concurrent.futures
+
+from modules import host, monitor
+from utils import subscriptions
+
+
+def test_watched_views_read_upstream_every_poll(monkeypatch):
+    totals = iter([{"total_active": 10, "total_up": 10}, {"total_active": 10, "total_up": 7}])
+    monkeypatch.setattr(host.host_totals, "loader", lambda: next(totals))
+    monitors = []
+    monkeypatch.setattr(monitor.monitor_catalog, "loader", lambda: monitors.append(1) or [])
+
+    assert host.host_state()["total_down"] == 0
+    assert host.host_state()["total_down"] == 3
+    assert host.host_totals.get() == {"total_active": 10, "total_up": 7}
+    monitor.monitor_state()
+    monitor.monitor_state()
+    assert monitors == [1, 1]
+
+
+class _Server:
+    def subscribe_resource(self):
+        return lambda handler: handler
+
+    unsubscribe_resource = subscribe_resource
+
+    def get_capabilities(self, *args, **kwargs):
+        return None
+
+
+class _Session:
+    async def send_resource_updated(self, uri):
+        pass
+
+
+def test_cancelled_notification_drops_the_session(monkeypatch):
+    hub = subscriptions.SubscriptionHub(_Server(), interval=30)
+    hub.watch("datadog://default/hosts", "default", lambda: {})
+    resource = hub.resources["datadog://default/hosts"]
+    loop = asyncio.new_event_loop()
+    resource.subscribers[_Session()] = loop
+    notification = concurrent.futures.Future()
+    monkeypatch.setattr(subscriptions.asyncio, "run_coroutine_threadsafe", lambda coroutine, loop: coroutine.close() or notification)
+
+    hub._notify(resource)
+    notification.cancel()
+    loop.close()
+
+    assert resource.subscribers == {}
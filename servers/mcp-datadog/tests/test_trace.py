@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+
+import pytest
+
+from modules import trace
+
+NOW = 1_700_000_000
+
+
+def _spans(count):
+    return [
+        {"trace_id": str(i), "span_id": str(i), "service": "web", "resource": "GET /", "duration": 0.01, "error": False}
+        for i in range(count)
+    ]
+
+
+@contextmanager
+def fake_client():
+    yield None
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    sent = []
+    monkeypatch.setattr(trace, "datadog_client", fake_client)
+    monkeypatch.setattr(trace, "SpansApi", lambda api_client: None)
+    monkeypatch.setattr(trace, "report_progress", lambda progress, total, message: sent.append((progress, total)))
+    monkeypatch.setattr(trace, "cached_query", lambda name, query, from_time, to_time, load, **params: load(query, from_time, to_time))
+    return sent
+
+
+@pytest.mark.parametrize(
+    "found, max_spans, expected",
+    [
+        (1500, 1500, [(1000, 1500), (1500, 1500)]),
+        (2000, 2000, [(1000, 2000), (2000, 2000)]),
+        (1200, 5000, [(1000, 5000), (5000, 5000)]),
+    ],
+)
+def test_summarize_traces_reports_completion_once(reports, monkeypatch, found, max_spans, expected):
+    monkeypatch.setattr(trace, "iter_spans", lambda spans_api, query, from_time, to_time, max_spans: iter(_spans(min(found, max_spans))))
+
+    result = trace.summarize_traces(query="service:web", from_time=NOW - 900, to_time=NOW, max_spans=max_spans)
+
+    assert result["status"] == "success"
+    assert reports == expected
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from utils import warmup
+
+
+@pytest.fixture
+def accepted(monkeypatch):
+    """Orgs 'prod' and 'staging', with the names in the returned set accepted by the auth check."""
+    accepted = {"prod"}
+    orgs = {"prod": object(), "staging": object()}
+    monkeypatch.setattr(warmup, "ORGS", orgs)
+    monkeypatch.setattr(warmup, "check_datadog_auth", lambda org, file=None: next(name for name, value in orgs.items() if value is org) in accepted)
+    monkeypatch.setattr(warmup, "WARMUP_AUTH_RETRY_SECONDS", 0.05)
+    monkeypatch.setitem(warmup.HotDataset.registry, "test_catalog", warmup.HotDataset("test_catalog", lambda: [], ttl=60))
+    monkeypatch.setattr(warmup.HotDataset, "refresh", lambda self: time.time())
+    return accepted
+
+
+@pytest.fixture
+def warmer(accepted):
+    warmer = warmup.Warmer(["test_catalog"], interval=0)
+    yield warmer
+    warmer.stop()
+
+
+def _wait(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_rejected_org_does_not_block_readiness(accepted, warmer):
+    warmer.start()
+
+    assert warmer.ready.wait(2)
+    assert warmer.status()["failed_orgs"] == ["staging"]
+    assert list(warmer.loaded_at) == ["prod/test_catalog"]
+
+    accepted.add("staging")
+    assert _wait(lambda: "staging/test_catalog" in warmer.loaded_at)
+    assert warmer.status()["failed_orgs"] == []
+
+
+def test_not_ready_without_any_accepted_org(accepted, warmer):
+    accepted.clear()
+    warmer.start()
+
+    assert not warmer.ready.wait(0.2)
+    assert warmer.status()["failed_orgs"] == ["prod", "staging"]
+
+    accepted.add("prod")
+    assert warmer.ready.wait(2)
@@ -0,0 +1,68 @@
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+import main
+from utils import alert_store
+
+ALERT = {"id": "1", "title": "High latency", "alert_transition": "Triggered", "date": 1_700_000_000_000}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(alert_store, "DATADOG_WEBHOOK_SECRET", "s3cret")
+    monkeypatch.setattr(alert_store, "_store", alert_store.AlertStore(str(tmp_path / "alerts.sqlite3"), 86400, 1000))
+    return TestClient(main.mcp.streamable_http_app())
+
+
+def test_webhook_stores_alerts(client):
+    response = client.post("/webhooks/datadog", json=ALERT, headers={"X-Webhook-Secret": "s3cret"})
+
+    assert response.status_code == 200
+    assert response.json()["stored"] == 1
+
+
+def test_webhook_secret_is_only_read_from_the_header(client):
+    response = client.post("/webhooks/datadog?token=s3cret", json=ALERT)
+
+    assert response.status_code == 401
+
+
+def test_webhook_rejects_large_declared_bodies(client):
+    response = client.post("/webhooks/datadog", content=b"x" * (alert_store.MAX_WEBHOOK_BYTES + 1), headers={"X-Webhook-Secret": "s3cret"})
+
+    assert response.status_code == 413
+
+
+def test_webhook_stops_reading_large_streamed_bodies():
+    read = []
+
+    class Request:
+        headers = {}
+
+        async def stream(self):
+            for _ in range(64):
+                read.append(1)
+                yield b"x" * 65536
+
+    body = anyio.run(main.read_capped_body, Request(), alert_store.MAX_WEBHOOK_BYTES)
+
+    assert body is None
+    assert len(read) == alert_store.MAX_WEBHOOK_BYTES // 65536 + 1
+
+
+def test_tags_of_expired_alerts_never_match_new_alerts(monkeypatch, tmp_path):
+    store = alert_store.AlertStore(str(tmp_path / "alerts.sqlite3"), retention=60, max_alerts=1000)
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(alert_store.time, "time", lambda: now[0])
+    store.add("default", [alert_store.parse_alert({"id": "e1", "date": now[0] * 1000, "tags": "service:web,env:prod"})])
+
+    # Retention expires every alert, then a new one arrives
+    now[0] += 3600
+    store.add("default", [])
+    store.add("default", [alert_store.parse_alert({"id": "e2", "date": now[0] * 1000, "tags": "service:api,env:prod"})])
+
+    assert len(store) == 1
+    assert store.search("default", now[0] - 7200, now[0], tags=["service:web"])["total"] == 0
+    recent = store.search("default", now[0] - 60, now[0], tags=["env:prod"])
+    assert [alert["event_id"] for alert in recent["alerts"]] == ["e2"]
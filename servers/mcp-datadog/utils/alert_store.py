@@ -0,0 +1,274 @@
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config import DATADOG_ALERT_STORE_MAX, DATADOG_ALERT_STORE_PATH, DATADOG_ALERT_STORE_RETENTION, DATADOG_ORGS, DATADOG_DEFAULT_ORG, DATADOG_WEBHOOK_SECRET
+from utils.metrics import WEBHOOK_ALERTS
+
+# Largest webhook request body accepted, in bytes
+MAX_WEBHOOK_BYTES = 1024 * 1024
+
+# Keys of each field in a webhook payload: the recommended template's key first, then the
+# Datadog template variable it is filled from ($ALERT_ID, $EVENT_TITLE...), lowercased
+_FIELDS = {
+    "event_id": ("id", "event_id"),
+    "date": ("date", "last_updated", "timestamp"),
+    "monitor_id": ("monitor_id", "alert_id"),
+    "title": ("title", "event_title"),
+    "transition": ("transition", "alert_transition"),
+    "alert_type": ("alert_type",),
+    "priority": ("priority",),
+    "hostname": ("hostname",),
+    "scope": ("scope", "alert_scope"),
+    "link": ("link",),
+    "message": ("message", "event_msg", "body"),
+    "tags": ("tags",),
+}
+
+# Monitor state after each alert transition
+TRANSITION_STATES = {
+    "triggered": "Alert",
+    "re-triggered": "Alert",
+    "renotify": "Alert",
+    "warn": "Warn",
+    "re-warn": "Warn",
+    "recovered": "OK",
+    "no data": "No Data",
+    "re-nodata": "No Data",
+}
+
+_COLUMNS = ("event_id", "ts", "monitor_id", "transition", "alert_type", "priority", "hostname", "title", "scope", "link", "message", "tags")
+
+
+def _field(payload: Dict[str, Any], name: str) -> Any:
+    for key in _FIELDS[name]:
+        value = payload.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds of a webhook date: epoch seconds or milliseconds ($DATE), or ISO 8601 ($LAST_UPDATED)."""
+    if value is None:
+        return time.time()
+    try:
+        number = float(value)
+        return number / 1000 if number > 1e11 else number
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00").replace(" UTC", "+00:00")).timestamp()
+    except ValueError:
+        return time.time()
+
+
+def _tags(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return sorted({str(tag).strip().lower() for tag in value or [] if str(tag).strip()})
+
+
+def parse_alert(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Alert record of one webhook payload, with its tags split and its date in epoch seconds."""
+    if not isinstance(payload, dict):
+        raise ValueError("A webhook payload must be a JSON object")
+    payload = {str(key).lower().lstrip("$"): value for key, value in payload.items()}
+    monitor_id = _field(payload, "monitor_id")
+    try:
+        monitor_id = int(monitor_id) if monitor_id is not None else None
+    except (TypeError, ValueError):
+        monitor_id = None
+    transition = _field(payload, "transition")
+    event_id = _field(payload, "event_id")
+    if event_id is None:
+        # Without an event ID, a payload replayed as is is recognised by its content
+        event_id = "sha1:" + hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    alert = {
+        "event_id": str(event_id),
+        "ts": _timestamp(_field(payload, "date")),
+        "monitor_id": monitor_id,
+        "transition": str(transition).strip().lower() if transition is not None else None,
+        "tags": _tags(_field(payload, "tags")),
+    }
+    for name in ("alert_type", "priority", "hostname", "title", "scope", "link", "message"):
+        value = _field(payload, name)
+        alert[name] = str(value) if value is not None else None
+    return alert
+
+
+class AlertStore:
+    """Alert webhooks received from Datadog, in a local SQLite database indexed for recent-activity queries.
+
+    Alerts are indexed by org and time, by monitor, and by tag (a service is the tag
+    ``service:<name>``). They are kept for ``retention`` seconds and at most ``max_alerts``
+    of them, oldest dropped first. A payload delivered twice, as Datadog retries failed
+    deliveries, is stored once. Worker processes pointed at the same file share the store.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, org TEXT NOT NULL, event_id TEXT NOT NULL, ts REAL NOT NULL, received_at REAL NOT NULL,
+            monitor_id INTEGER, transition TEXT, alert_type TEXT, priority TEXT, hostname TEXT,
+            title TEXT, scope TEXT, link TEXT, message TEXT, tags TEXT NOT NULL,
+            UNIQUE (org, event_id)
+        );
+        CREATE INDEX IF NOT EXISTS alerts_by_time ON alerts (org, ts);
+        CREATE INDEX IF NOT EXISTS alerts_by_monitor ON alerts (org, monitor_id, ts);
+        CREATE TABLE IF NOT EXISTS alert_tags (
+            alert INTEGER NOT NULL, org TEXT NOT NULL, tag TEXT NOT NULL, ts REAL NOT NULL, PRIMARY KEY (alert, tag)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS alert_tags_by_tag ON alert_tags (org, tag, ts);
+    """
+
+    def __init__(self, path: str, retention: float, max_alerts: int) -> None:
+        self.path = path
+        self.retention = retention
+        self.max_alerts = max_alerts
+        self._local = threading.local()
+        self._connection().executescript(self._schema)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, org: str, alerts: Sequence[Dict[str, Any]]) -> Tuple[int, int]:
+        """Store parsed alerts of ``org``; returns (stored, duplicates)."""
+        connection = self._connection()
+        now = time.time()
+        stored = 0
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for alert in alerts:
+                cursor = connection.execute(
+                    f"INSERT OR IGNORE INTO alerts (org, received_at, {', '.join(_COLUMNS)}) VALUES (?, ?, {', '.join('?' * len(_COLUMNS))})",
+                    (org, now, *(json.dumps(alert["tags"]) if column == "tags" else alert[column] for column in _COLUMNS)),
+                )
+                if cursor.rowcount:
+                    stored += 1
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO alert_tags (alert, org, tag, ts) VALUES (?, ?, ?, ?)",
+                        [(cursor.lastrowid, org, tag, alert["ts"]) for tag in alert["tags"]],
+                    )
+            self._prune(connection, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return stored, len(alerts) - stored
+
+    def _prune(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute("DELETE FROM alerts WHERE received_at < ?", (now - self.retention,))
+        # Alert IDs are never reused (AUTOINCREMENT), so a tag row left behind could not match a newer alert
+        connection.execute("DELETE FROM alert_tags WHERE alert NOT IN (SELECT id FROM alerts)")
+        row = connection.execute("SELECT id FROM alerts ORDER BY id DESC LIMIT 1 OFFSET ?", (self.max_alerts,)).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM alerts WHERE id <= ?", (row[0],))
+            connection.execute("DELETE FROM alert_tags WHERE alert <= ?", (row[0],))
+
+    @staticmethod
+    def _where(org: str, from_time: float, to_time: float, monitor_id: Optional[int], tags: Sequence[str], transitions: Sequence[str]) -> Tuple[str, List[Any]]:
+        clauses, params = ["org = ?", "ts >= ?", "ts <= ?"], [org, from_time, to_time]
+        if monitor_id is not None:
+            clauses.append("monitor_id = ?")
+            params.append(monitor_id)
+        if transitions:
+            clauses.append(f"transition IN ({', '.join('?' * len(transitions))})")
+            params.extend(transition.lower() for transition in transitions)
+        for tag in tags:
+            clauses.append("id IN (SELECT alert FROM alert_tags WHERE org = ? AND tag = ? AND ts >= ? AND ts <= ?)")
+            params.extend([org, tag.lower(), from_time, to_time])
+        return " AND ".join(clauses), params
+
+    def search(
+        self,
+        org: str,
+        from_time: float,
+        to_time: float,
+        monitor_id: Optional[int] = None,
+        tags: Sequence[str] = (),
+        transitions: Sequence[str] = (),
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """Alerts of ``org`` in ``[from_time, to_time]`` matching every filter, newest first, with their count per transition."""
+        where, params = self._where(org, from_time, to_time, monitor_id, tags, transitions)
+        connection = self._connection()
+        counts = {row[0] or "unknown": row[1] for row in connection.execute(f"SELECT transition, COUNT(*) FROM alerts WHERE {where} GROUP BY transition", params)}
+        rows = connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM alerts WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?", (*params, limit)).fetchall()
+        return {"total": sum(counts.values()), "by_transition": counts, "alerts": [self._alert(row) for row in rows]}
+
+    def monitor_states(self, org: str, from_time: float, tags: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """Latest alert of each monitor of ``org`` since ``from_time``, with the monitor's alert count, most recent first."""
+        where, params = self._where(org, from_time, time.time(), None, tags, ())
+        # With MAX(), SQLite takes the other bare columns from the row holding the maximum
+        rows = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS[:1])}, MAX(ts) AS ts, {', '.join(_COLUMNS[2:])}, COUNT(*) AS alerts "
+            f"FROM alerts WHERE {where} AND monitor_id IS NOT NULL GROUP BY monitor_id ORDER BY ts DESC",
+            params,
+        ).fetchall()
+        return [{**self._alert(row), "alerts": row["alerts"]} for row in rows]
+
+    @staticmethod
+    def _alert(row: sqlite3.Row) -> Dict[str, Any]:
+        alert = {column: row[column] for column in _COLUMNS}
+        alert["tags"] = json.loads(alert["tags"])
+        alert["state"] = TRANSITION_STATES.get(alert["transition"] or "")
+        return alert
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+
+_store: Optional[AlertStore] = None
+_store_lock = threading.Lock()
+
+
+def alert_store() -> AlertStore:
+    """The process's alert store, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AlertStore(DATADOG_ALERT_STORE_PATH, DATADOG_ALERT_STORE_RETENTION, DATADOG_ALERT_STORE_MAX)
+    return _store
+
+
+def receive_webhook(body: Optional[bytes], secret: Optional[str], org: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+    """Check and store one webhook delivery; returns the HTTP status and response body.
+
+    The body is one payload or a list of payloads, or None when it was larger than
+    MAX_WEBHOOK_BYTES and left unread. ``secret`` must match DATADOG_WEBHOOK_SECRET,
+    and ``org`` (default: the default org) names the org the alerts belong to.
+    """
+    if not DATADOG_WEBHOOK_SECRET:
+        return 404, {"error": "Webhook ingestion is disabled; set DATADOG_WEBHOOK_SECRET to enable it"}
+    if not secret or not hmac.compare_digest(secret.encode(), DATADOG_WEBHOOK_SECRET.encode()):
+        WEBHOOK_ALERTS.labels("rejected").inc()
+        return 401, {"error": "Missing or invalid webhook secret"}
+    org = org or DATADOG_DEFAULT_ORG
+    if org not in DATADOG_ORGS:
+        WEBHOOK_ALERTS.labels("rejected").inc()
+        return 400, {"error": f"Unknown Datadog org '{org}'. Available orgs: {', '.join(DATADOG_ORGS)}"}
+    if body is None or len(body) > MAX_WEBHOOK_BYTES:
+        WEBHOOK_ALERTS.labels("rejected").inc()
+        return 413, {"error": f"Webhook body larger than {MAX_WEBHOOK_BYTES} bytes"}
+    try:
+        payload = json.loads(body)
+        alerts = [parse_alert(item) for item in (payload if isinstance(payload, list) else [payload])]
+    except ValueError as e:
+        WEBHOOK_ALERTS.labels("rejected").inc()
+        return 400, {"error": f"Invalid webhook payload: {e}"}
+    stored, duplicates = alert_store().add(org, alerts)
+    WEBHOOK_ALERTS.labels("stored").inc(stored)
+    WEBHOOK_ALERTS.labels("duplicate").inc(duplicates)
+    return 200, {"org": org, "stored": stored, "duplicates": duplicates}
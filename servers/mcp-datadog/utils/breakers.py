@@ -0,0 +1,218 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, ClassVar, Deque, Dict, Iterator, Optional, Tuple
+from datadog_api_client.exceptions import ApiException
+from utils.orgs import current_org_name
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+# Gauge value of each state in mcp_upstream_circuit_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Hedged requests need at least this many recent successful calls to estimate the p95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_POOL_SIZE = 64
+
+_settings: Dict[str, Any] = {
+    "failure_rate": 0.5,
+    "slow_seconds": 10.0,
+    "window": 20,
+    "min_calls": 10,
+    "open_seconds": 30.0,
+    "hedge_reads": False,
+    "hedge_min_seconds": 0.05,
+}
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE, thread_name_prefix="datadog-hedge")
+
+
+def configure_breakers(
+    failure_rate: float,
+    slow_seconds: float,
+    window: int,
+    min_calls: int,
+    open_seconds: float,
+    hedge_reads: bool,
+    hedge_min_ms: float,
+) -> None:
+    """Set the thresholds of every circuit breaker and whether idempotent reads are hedged."""
+    _settings.update(
+        failure_rate=failure_rate,
+        slow_seconds=slow_seconds,
+        window=window,
+        min_calls=min_calls,
+        open_seconds=open_seconds,
+        hedge_reads=hedge_reads,
+        hedge_min_seconds=hedge_min_ms / 1000,
+    )
+
+
+class CircuitOpenError(ApiException):
+    """Raised instead of calling an API family whose circuit is open."""
+
+    def __init__(self, api: str, retry_in: float) -> None:
+        super().__init__(status=503, reason=f"Circuit open for {api}; retry in {max(retry_in, 0):.0f}s")
+        self.api = api
+
+
+def _status(error: Exception) -> Optional[int]:
+    return getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_failure(error: Exception) -> bool:
+    """Throttling, server errors, timeouts and connection failures count against a circuit; client errors do not."""
+    status = _status(error)
+    if not status:
+        return True
+    return status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """Circuit breaker of one Datadog API family (e.g. ``v2/spans``) in one org.
+
+    The outcomes of the last ``window`` calls are kept. Once at least ``min_calls`` are
+    known and the share of failed or of slow calls reaches ``failure_rate``, the circuit
+    opens: calls fail at once with ``CircuitOpenError`` for ``open_seconds``. Then one
+    probe call is let through. It closes the circuit if it is fast and succeeds, and
+    reopens it otherwise.
+    """
+
+    instances: ClassVar[Dict[Tuple[str, str], "CircuitBreaker"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, org: str, api: str) -> None:
+        self.org = org
+        self.api = api
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=_settings["window"])
+        self.latencies: Deque[float] = deque(maxlen=100)
+        self.opened = 0
+        self.rejected = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_api(cls, api: str) -> "CircuitBreaker":
+        """Breaker of ``api`` in the org of the running tool call."""
+        key = (current_org_name(), api)
+        breaker = cls.instances.get(key)
+        if breaker is None:
+            with cls._instances_lock:
+                breaker = cls.instances.setdefault(key, cls(*key))
+        return breaker
+
+    def _allow(self) -> None:
+        with self._lock:
+            if self.state == OPEN:
+                retry_in = self.opened_at + _settings["open_seconds"] - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.api} in org {self.org}", retry_in)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.api} in org {self.org}", 0)
+                self._probing = True
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        self.outcomes.clear()
+
+    def _record(self, failed: bool, duration: float, counted: bool = True) -> None:
+        slow = duration >= _settings["slow_seconds"]
+        with self._lock:
+            if not counted:
+                # Says nothing about the API; a probe that ends this way lets the next call probe instead
+                if self.state == HALF_OPEN:
+                    self._probing = False
+                return
+            if not failed:
+                self.latencies.append(duration)
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if failed or slow:
+                    self._trip()
+                else:
+                    self.state = CLOSED
+                return
+            self.outcomes.append((failed, slow))
+            if len(self.outcomes) >= _settings["min_calls"]:
+                threshold = _settings["failure_rate"] * len(self.outcomes)
+                if sum(f for f, _ in self.outcomes) >= threshold or sum(s for _, s in self.outcomes) >= threshold:
+                    self._trip()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Fail fast while the circuit is open, otherwise record the outcome of the wrapped call."""
+        self._allow()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            # utils.deadlines imports utils.metrics, which imports this module, so it is imported here
+            from utils.deadlines import remaining_time
+
+            # A request timing out because its caller ran out of time (its timeout is capped at the
+            # caller's deadline) is not held against the API, so one short deadline cannot open the circuit
+            remaining = remaining_time()
+            self._record(is_failure(e), time.perf_counter() - started, counted=not (remaining == 0 and not _status(e)))
+            raise
+        self._record(False, time.perf_counter() - started)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of the recent successful calls, or None until there are enough of them."""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(_settings["hedge_min_seconds"], samples[int(0.95 * (len(samples) - 1))])
+
+
+def call_upstream(api: str, method: str, call: Callable[[], Any], limiter: Optional[Any] = None) -> Any:
+    """Run one upstream request through the circuit breaker of its API family.
+
+    With hedging enabled, a GET that has not answered after the family's recent p95
+    latency is sent a second time while the circuit is closed. The first successful
+    response wins and the other one is discarded, which costs about 5% more reads
+    to cut the tail latency. The second request spends a token of ``limiter`` (the
+    org's request budget, already spent once by the caller for the first one).
+    """
+    breaker = CircuitBreaker.for_api(api)
+    delay = breaker.hedge_delay() if _settings["hedge_reads"] and method == "GET" else None
+    if delay is None:
+        with breaker.guard():
+            return call()
+
+    def attempt():
+        with breaker.guard():
+            return call()
+
+    primary = _hedge_pool.submit(contextvars.copy_context().run, attempt)
+    if wait([primary], timeout=delay).done or breaker.state != CLOSED:
+        return primary.result()
+
+    if limiter is not None:
+        limiter.acquire()
+        if primary.done() or breaker.state != CLOSED:
+            return primary.result()
+    breaker.hedged += 1
+    hedge = _hedge_pool.submit(contextvars.copy_context().run, attempt)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    breaker.hedge_wins += 1
+                return future.result()
+            error = future.exception()
+    raise error
@@ -0,0 +1,234 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+from utils.orgs import current_org_name
+
+_MISSING = object()
+
+# SQLite database shared by the worker processes; None keeps caches in process memory
+_shared_path: Optional[str] = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with an optional expiry per entry.
+
+    Entries stored with ``ttl=None`` never expire and are only evicted when the
+    cache grows past ``max_entries``.
+    """
+
+    # Every cache created, so the metrics endpoint can report hit ratios
+    instances: List["TTLCache"] = []
+
+    def __init__(self, name: str, max_entries: int = 1024, default_ttl: Optional[float] = None) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        TTLCache.instances.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING) -> None:
+        ttl = self.default_ttl if ttl is _MISSING else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Any = _MISSING) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` and storing its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedCache(TTLCache):
+    """TTLCache stored in a SQLite database shared by several worker processes.
+
+    Keys are stored by ``repr`` and values pickled, so keys must have a stable repr.
+    Expiry uses wall-clock time because it is compared across processes, and eviction
+    past ``max_entries`` drops the least recently written entries. ``get_or_load``
+    coalesces loads across threads and processes: one caller takes a lease on the key
+    and the others wait for its result instead of calling the loader too.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            cache TEXT NOT NULL, key TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL, value BLOB NOT NULL,
+            PRIMARY KEY (cache, key)
+        );
+        CREATE TABLE IF NOT EXISTS cache_leases (
+            cache TEXT NOT NULL, key TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (cache, key)
+        );
+    """
+
+    def __init__(self, name: str, path: str, max_entries: int = 1024, default_ttl: Optional[float] = None, lease_seconds: float = 60.0) -> None:
+        super().__init__(name, max_entries=max_entries, default_ttl=default_ttl)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._stripes = [threading.Lock() for _ in range(64)]
+        self._writes = 0
+        self._connection().executescript(self._schema)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _peek(self, key: str) -> Any:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE cache = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)", (self.name, key, time.time())
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            # Written by an incompatible version of the code; treat it as a miss
+            return _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._peek(repr(key))
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING) -> None:
+        ttl = self.default_ttl if ttl is _MISSING else ttl
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (cache, key, expires_at, stored_at, value) VALUES (?, ?, ?, ?, ?)",
+            (self.name, repr(key), None if ttl is None else now + ttl, now, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)),
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % 64 == 0
+        if evict:
+            self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute("DELETE FROM cache_entries WHERE cache = ? AND expires_at <= ?", (self.name, now))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM cache_entries WHERE cache = ? AND key IN (SELECT key FROM cache_entries WHERE cache = ? ORDER BY stored_at LIMIT ?)",
+                (self.name, self.name, excess),
+            )
+
+    def _acquire_lease(self, key: str) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO cache_leases (cache, key, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (cache, key) DO UPDATE SET expires_at = excluded.expires_at WHERE cache_leases.expires_at <= ?",
+            (self.name, key, now + self.lease_seconds, now),
+        )
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache_leases WHERE cache = ? AND key = ?", (self.name, key))
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Any = _MISSING) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        skey = repr(key)
+        with self._stripes[hash(skey) % len(self._stripes)]:
+            value = self._peek(skey)
+            if value is not _MISSING:
+                return value
+            # Another process is loading the key: wait for its value until the lease expires
+            deadline = time.monotonic() + self.lease_seconds
+            while not self._acquire_lease(skey) and time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self._peek(skey)
+                if value is not _MISSING:
+                    return value
+            try:
+                value = loader()
+                self.set(key, value, ttl)
+            finally:
+                self._release_lease(skey)
+        return value
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE cache = ?", (self.name,))
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache_entries WHERE cache = ?", (self.name,)).fetchone()[0]
+
+
+class OrgScopedCache:
+    """View of a cache that keeps each Datadog org's entries apart.
+
+    Keys are prefixed with the org of the running tool call, so orgs never read each
+    other's results while still sharing one size budget and one set of metrics.
+    """
+
+    def __init__(self, cache: TTLCache) -> None:
+        self.cache = cache
+        self.name = cache.name
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.cache.get((current_org_name(), key), default)
+
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING) -> None:
+        self.cache.set((current_org_name(), key), value, ttl)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Any = _MISSING) -> Any:
+        return self.cache.get_or_load((current_org_name(), key), loader, ttl)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+def use_shared_cache(path: Optional[str]) -> None:
+    """Back caches created afterwards with the SQLite database at ``path`` (None for process memory)."""
+    global _shared_path
+    _shared_path = path or None
+
+
+def create_cache(name: str, max_entries: int = 1024, default_ttl: Optional[float] = None) -> OrgScopedCache:
+    """Create a per-org cache in process memory, or in the shared database when one is configured."""
+    if _shared_path is not None:
+        return OrgScopedCache(SharedCache(name, _shared_path, max_entries=max_entries, default_ttl=default_ttl))
+    return OrgScopedCache(TTLCache(name, max_entries=max_entries, default_ttl=default_ttl))
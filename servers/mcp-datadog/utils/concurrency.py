@@ -0,0 +1,77 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from config import DATADOG_MAX_CONCURRENCY
+from utils.deadlines import check_deadline
+
+
+class RateLimiter:
+    """Token bucket shared by the threads calling one Datadog API family.
+
+    ``acquire`` blocks until a token is available, so a batch never sends more than
+    ``burst`` requests at once nor more than ``rate`` requests per second on average.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            check_deadline()
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Tuple[Any, Any, Optional[Exception]]]:
+    """Run ``func`` once per item on a bounded thread pool.
+
+    The Datadog client is synchronous, so batch tools fan out their upstream
+    calls on threads instead of issuing them one after the other.
+
+    Args:
+        func (Callable[[Any], Any]): Function called with a single item.
+        items (Iterable[Any]): Items to process.
+        max_workers (Optional[int], optional): Pool size. Defaults to DATADOG_MAX_CONCURRENCY.
+        on_progress (Optional[Callable[[int, int], None]], optional): Called on the calling
+            thread with ``(done, total)`` each time an item finishes.
+
+    Returns:
+        List[Tuple[Any, Any, Optional[Exception]]]: One ``(item, result, error)`` tuple per
+        item, in input order. ``error`` is set instead of raising so one failed call does
+        not discard the rest of the batch."""
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers or DATADOG_MAX_CONCURRENCY, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Each call runs in a copy of the caller's context so trace spans keep their parent
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        if on_progress is not None:
+            for done, _ in enumerate(as_completed(futures), start=1):
+                on_progress(done, len(futures))
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append((item, future.result(), None))
+            except Exception as e:
+                results.append((item, None, e))
+        return results
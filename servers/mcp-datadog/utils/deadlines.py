@@ -0,0 +1,115 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import anyio
+from mcp.server.lowlevel.server import request_ctx
+from utils.metrics import TOOL_ABORTED
+from utils.progress import bind_progress_reporter
+
+# Request ``_meta`` key a client sets to ask for a shorter deadline, in milliseconds
+TIMEOUT_META_KEY = "timeoutMs"
+
+_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("tool_deadline", default=None)
+
+
+class CallAborted(Exception):
+    """Raised inside a tool whose call was cancelled by the client or ran past its deadline."""
+
+
+class Deadline:
+    """Time budget of one tool call, shared by the threads working on it."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.expires = time.monotonic() + timeout
+        self.reason: Optional[str] = None
+        self._aborted = threading.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def abort(self, reason: str) -> None:
+        self.reason = reason
+        self._aborted.set()
+
+    def check(self) -> None:
+        if self._aborted.is_set():
+            raise CallAborted(f"Tool call {self.reason}")
+        if time.monotonic() >= self.expires:
+            raise CallAborted(f"Tool call exceeded its deadline of {self.timeout:g}s")
+
+
+def check_deadline() -> None:
+    """Raise ``CallAborted`` when the running tool call was cancelled or is out of time.
+
+    Called before every upstream request, so pagination loops and batches stop at the
+    next request instead of running to completion for a client that is gone.
+    """
+    deadline = _deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Bound the enclosed upstream calls by ``deadline`` (None for no deadline)."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left for the running tool call, or None outside a call with a deadline."""
+    deadline = _deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def request_timeout(default: float) -> float:
+    """Deadline of the request being handled: the client's ``timeoutMs``, capped at ``default``."""
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return default
+    value = (context.meta.model_extra or {}).get(TIMEOUT_META_KEY) if context.meta is not None else None
+    try:
+        return min(default, float(value) / 1000) if value is not None and float(value) > 0 else default
+    except (TypeError, ValueError):
+        return default
+
+
+def with_deadline(timeout: float) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Run a synchronous tool on a worker thread, bounded by a deadline and cancellable.
+
+    The event loop stays free while the tool waits on the Datadog API, so it can serve
+    other sessions and deliver progress notifications. When the deadline passes, the
+    call returns an error result at once. When the client cancels it, the cancellation
+    propagates at once. In both cases the worker thread sees the aborted deadline at its
+    next upstream request and stops.
+    """
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        tool = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            deadline = Deadline(request_timeout(timeout))
+            context = contextvars.copy_context()
+            context.run(_deadline.set, deadline)
+            context.run(bind_progress_reporter)
+            try:
+                with anyio.fail_after(deadline.timeout):
+                    return await anyio.to_thread.run_sync(functools.partial(context.run, func, *args, **kwargs), abandon_on_cancel=True)
+            except TimeoutError:
+                deadline.abort("exceeded its deadline")
+                TOOL_ABORTED.labels(tool, "deadline").inc()
+                return {"status": "error", "message": f"Tool '{tool}' exceeded its deadline of {deadline.timeout:g}s"}
+            except anyio.get_cancelled_exc_class():
+                deadline.abort("was cancelled by the client")
+                TOOL_ABORTED.labels(tool, "cancelled").inc()
+                raise
+        return wrapper
+    return decorate
@@ -0,0 +1,243 @@
+import math
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+_CONJUNCTION = re.compile(r"\s+AND\s+|\s*,\s*", re.IGNORECASE)
+# Scope syntax that makes a scope more than a list of tags that must all match
+_BOOLEAN_SCOPE = re.compile(r"(^|\s)(OR|NOT)(\s|$)|(^|\s)-|[()]")
+
+# Downtimes in these states silence nothing, now or later
+_INACTIVE_STATUSES = {"canceled", "ended"}
+
+Interval = Tuple[float, float, Any]
+
+
+class DowntimeTarget:
+    """What a downtime silences: a scope, and one monitor, the monitors with some tags, or every monitor."""
+
+    def __init__(self, scope: str, monitor_id: Optional[int] = None, monitor_tags: Iterable[str] = ()) -> None:
+        text = " ".join((scope or "").split()) or "*"
+        # Tags that must all match, or None for a boolean scope, which is only compared as written
+        self.terms: Optional[FrozenSet[str]] = None
+        if not _BOOLEAN_SCOPE.search(text):
+            self.terms = frozenset(term.lower() for term in _CONJUNCTION.split(text) if term and term != "*")
+        self.scope = (" AND ".join(sorted(self.terms)) or "*") if self.terms is not None else text
+        self.monitor_id = monitor_id
+        self.monitor_tags = frozenset(tag.lower() for tag in monitor_tags if tag != "*")
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        return (self.scope, self.monitor_id, self.monitor_tags)
+
+    @property
+    def breadth(self) -> Tuple[Any, ...]:
+        """Sort key putting the targets that could cover others first."""
+        return (self.monitor_id is not None, len(self.monitor_tags), self.terms is None, len(self.terms or ()))
+
+    def covers(self, other: "DowntimeTarget") -> bool:
+        """Whether a downtime on this target silences everything a downtime on ``other`` would."""
+        if self.monitor_id is not None and self.monitor_id != other.monitor_id:
+            return False
+        # Monitors matching tags are only known to include the ones matching more tags
+        if self.monitor_tags and (other.monitor_id is not None or not self.monitor_tags <= other.monitor_tags):
+            return False
+        if self.terms is None or other.terms is None:
+            return self.scope == other.scope
+        # Fewer tags to match is a wider scope
+        return self.terms <= other.terms
+
+    def describe(self) -> Dict[str, Any]:
+        described: Dict[str, Any] = {"scope": self.scope, "monitor_id": self.monitor_id}
+        if self.monitor_tags:
+            described["monitor_tags"] = sorted(self.monitor_tags)
+        return described
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def downtime_record(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Scope, monitor and window of a v2 downtime (``DowntimeResponseData.to_dict()``); None once it silences nothing.
+
+    A recurring downtime is indexed by its current or next occurrence.
+    """
+    attributes = item.get("attributes") or {}
+    if str(attributes.get("status") or "") in _INACTIVE_STATUSES:
+        return None
+    schedule = attributes.get("schedule") or {}
+    window = schedule.get("current_downtime") or schedule
+    identifier = attributes.get("monitor_identifier") or {}
+    start = _epoch(window.get("start"))
+    return {
+        "id": str(item.get("id")),
+        "scope": attributes.get("scope") or "*",
+        "monitor_id": identifier.get("monitor_id"),
+        "monitor_tags": list(identifier.get("monitor_tags") or ["*"]),
+        "start": start if start is not None else _epoch(attributes.get("created")) or time.time(),
+        "end": _epoch(window.get("end")),
+        "status": str(attributes.get("status") or ""),
+        "recurring": "recurrences" in schedule,
+        "message": attributes.get("message") or "",
+    }
+
+
+def record_target(record: Dict[str, Any]) -> DowntimeTarget:
+    return DowntimeTarget(record["scope"], record.get("monitor_id"), record.get("monitor_tags") or ())
+
+
+class IntervalTree:
+    """Static interval tree over half-open ``[start, end)`` intervals.
+
+    The intervals are sorted by start and form an implicit balanced binary tree, each
+    node holding the largest end of its subtree, so the intervals overlapping a range
+    are found in ``O(log n + k)``. A subtree ending before the range is skipped whole,
+    and so is everything right of a node starting after it.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]) -> None:
+        self._items: List[Interval] = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+        self._max_end = [0.0] * len(self._items)
+        self._build(0, len(self._items))
+
+    def _build(self, low: int, high: int) -> float:
+        if low >= high:
+            return -math.inf
+        middle = (low + high) // 2
+        self._max_end[middle] = max(self._items[middle][1], self._build(low, middle), self._build(middle + 1, high))
+        return self._max_end[middle]
+
+    def overlapping(self, start: float, end: float) -> List[Any]:
+        """Values of the intervals overlapping ``[start, end)``, by start."""
+        found: List[Any] = []
+        self._search(0, len(self._items), start, end, found)
+        return found
+
+    def _search(self, low: int, high: int, start: float, end: float, found: List[Any]) -> None:
+        if low >= high:
+            return
+        middle = (low + high) // 2
+        if self._max_end[middle] <= start:
+            return
+        self._search(low, middle, start, end, found)
+        item_start, item_end, value = self._items[middle]
+        if item_start < end:
+            if item_end > start:
+                found.append(value)
+            self._search(middle + 1, high, start, end, found)
+
+    @property
+    def values(self) -> List[Any]:
+        return [value for _, _, value in self._items]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class DowntimeIndex:
+    """Active and scheduled downtimes of one org, by target, each target's windows in an interval tree.
+
+    The index is rebuilt from the ``downtimes`` catalog when a new copy is loaded, and
+    downtimes created, updated or canceled through this server are applied at once and
+    kept over copies loaded before them, so checks never wait on the API nor miss a
+    change made here. A query compares the targets (few) and searches the trees of
+    the related ones, in ``O(log n + k)`` each.
+    """
+
+    def __init__(self) -> None:
+        self.version: Any = None
+        self._groups: Dict[Tuple[Any, ...], Tuple[DowntimeTarget, IntervalTree]] = {}
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # (applied_at, downtime ID, record or None when canceled) of the local changes
+        self._edits: List[Tuple[float, str, Optional[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+
+    def sync(self, version: Any, records: Sequence[Dict[str, Any]]) -> None:
+        """Rebuild the index from the catalog copy loaded at ``version`` (epoch seconds)."""
+        with self._lock:
+            if version == self.version:
+                return
+            self._records = {record["id"]: record for record in records}
+            self._edits = [edit for edit in self._edits if edit[0] >= version]
+            for _, downtime_id, record in self._edits:
+                self._apply(downtime_id, record)
+            self._groups = {}
+            by_key: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+            for record in self._records.values():
+                by_key.setdefault(record_target(record).key, []).append(record)
+            for records_of_key in by_key.values():
+                self._index(records_of_key)
+            self.version = version
+
+    def _apply(self, downtime_id: str, record: Optional[Dict[str, Any]]) -> None:
+        if record is None:
+            self._records.pop(downtime_id, None)
+        else:
+            self._records[downtime_id] = record
+
+    def _index(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        target = record_target(records[0])
+        self._groups[target.key] = (target, IntervalTree((record["start"], record["end"] or math.inf, record) for record in records))
+
+    def _reindex(self, keys: Iterable[Tuple[Any, ...]]) -> None:
+        for key in set(keys):
+            self._groups.pop(key, None)
+            self._index([record for record in self._records.values() if record_target(record).key == key])
+
+    def put(self, record: Optional[Dict[str, Any]], downtime_id: Optional[str] = None) -> None:
+        """Apply a downtime created or updated here (None, with its ID, once canceled or ended)."""
+        downtime_id = record["id"] if record is not None else downtime_id
+        with self._lock:
+            previous = self._records.get(downtime_id)
+            self._apply(downtime_id, record)
+            self._edits.append((time.time(), downtime_id, record))
+            self._reindex([record_target(item).key for item in (previous, record) if item is not None])
+
+    def get(self, downtime_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(downtime_id)
+
+    def related(self, target: DowntimeTarget, start: float, end: Optional[float], exclude: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Downtimes overlapping ``[start, end)`` that cover ``target``, and those ``target`` covers."""
+        end = math.inf if end is None else end
+        covering, covered = [], []
+        with self._lock:
+            groups = list(self._groups.values())
+        for group_target, tree in groups:
+            if group_target.covers(target):
+                matches = covering
+            elif target.covers(group_target):
+                matches = covered
+            else:
+                continue
+            matches.extend(record for record in tree.overlapping(start, end) if record["id"] != exclude)
+        return covering, covered
+
+    @staticmethod
+    def gaps(records: Sequence[Dict[str, Any]], start: float, end: Optional[float]) -> List[Tuple[float, Optional[float]]]:
+        """Parts of ``[start, end)`` that none of ``records`` spans; an open ``end`` is None."""
+        end = math.inf if end is None else end
+        gaps = []
+        cursor = start
+        for record in sorted(records, key=lambda record: record["start"]):
+            if record["start"] > cursor:
+                gaps.append((cursor, min(record["start"], end)))
+            cursor = max(cursor, record["end"] or math.inf)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return [(gap_start, None if gap_end == math.inf else gap_end) for gap_start, gap_end in gaps if gap_end > gap_start]
+
+    def __len__(self) -> int:
+        return len(self._records)
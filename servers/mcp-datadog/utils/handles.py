@@ -0,0 +1,130 @@
+import functools
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import DATADOG_RESULT_INLINE_BYTES, DATADOG_RESULT_TTL
+from utils.cache import create_cache
+
+# Items of a stored result shown in its summary
+PREVIEW_ITEMS = 3
+# Longest string shown in the preview, and largest preview and field list kept in a summary
+PREVIEW_STRING_CHARS = 200
+PREVIEW_MAX_BYTES = 2048
+SUMMARY_MAX_FIELDS = 50
+
+# Handles are random, so every org reads them from one namespace; the fetch tool takes no org
+_stored = create_cache("result_handles", max_entries=128).cache
+
+
+def _parse_text_content(content: Any) -> Any:
+    """Content with MCP text blocks holding JSON (``[{"type": "text", "text": "{...}"}]``) replaced by the parsed JSON.
+
+    Tools that return their data as a JSON string are paged through like the others.
+    """
+    if not isinstance(content, list) or not content:
+        return content
+    if not all(isinstance(block, dict) and block.get("type") == "text" and isinstance(block.get("text"), str) for block in content):
+        return content
+    try:
+        parsed = [json.loads(block["text"]) for block in content]
+    except ValueError:
+        return content
+    return parsed[0] if len(parsed) == 1 else parsed
+
+
+def _largest_collection(value: Any, path: str = "", depth: int = 0) -> Tuple[str, Any, int]:
+    """Dotted path, value and JSON size of the largest list or dict nested in ``value``, at most 3 levels down."""
+    best = (path, value, len(json.dumps(value, default=str)))
+    if depth < 3 and isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(child, (list, dict)):
+                candidate = _largest_collection(child, f"{path}.{key}" if path else str(key), depth + 1)
+                # A single dominant child stands for its parent
+                if candidate[2] * 2 > best[2]:
+                    best = candidate
+    return best
+
+
+def _items(collection: Any) -> List[Any]:
+    if isinstance(collection, dict):
+        return [{"key": key, "value": value} for key, value in collection.items()]
+    return list(collection)
+
+
+def _shorten(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return f"<{len(value)} items>"
+    if isinstance(value, str) and len(value) > PREVIEW_STRING_CHARS:
+        return f"{value[:PREVIEW_STRING_CHARS]}... <{len(value)} chars>"
+    return value
+
+
+def _compact(item: Any) -> Any:
+    """Top level of an item, with nested lists and dicts reduced to their size and long strings cut."""
+    if isinstance(item, dict):
+        return {key: _shorten(value) for key, value in item.items()}
+    return _shorten(item)
+
+
+def _preview(items: List[Any]) -> List[Any]:
+    """Compacted first items, as many as fit in PREVIEW_MAX_BYTES (at least one, cut further if needed)."""
+    preview = []
+    size = 0
+    for item in items[:PREVIEW_ITEMS]:
+        compact = _compact(item)
+        text = json.dumps(compact, default=str)
+        if len(text) > PREVIEW_MAX_BYTES:
+            # An item with very many keys: shown as its cut JSON text
+            compact = _shorten(text)
+            text = json.dumps(compact)
+        if preview and size + len(text) > PREVIEW_MAX_BYTES:
+            break
+        preview.append(compact)
+        size += len(text)
+    return preview
+
+
+def store_result(content: Any, size: int) -> Dict[str, Any]:
+    """Store an oversized result and return the summary tools send in its place."""
+    content = _parse_text_content(content)
+    path, collection, _ = _largest_collection(content)
+    items = _items(collection)
+    handle = f"res_{uuid.uuid4().hex[:16]}"
+    _stored.set(handle, {"path": path, "items": items, "content": content, "expires_at": time.time() + DATADOG_RESULT_TTL}, DATADOG_RESULT_TTL)
+    fields = sorted({str(key) for item in items[:100] if isinstance(item, dict) for key in item})
+    return {
+        "handle": handle,
+        "expires_in_seconds": int(DATADOG_RESULT_TTL),
+        "size_bytes": size,
+        "items_path": path,
+        "total_items": len(items),
+        "fields": fields[:SUMMARY_MAX_FIELDS],
+        "preview": _preview(items),
+    }
+
+
+def stored_result(handle: str) -> Optional[Dict[str, Any]]:
+    """The stored result of ``handle``, or None once it expired."""
+    return _stored.get(handle)
+
+
+def store_large_results(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Replace the content of an oversized tool result with a summary and a handle.
+
+    The full content stays on the server until the handle expires, and is paged
+    through with ``fetch_result``, so a large listing does not fill the model's context.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if not DATADOG_RESULT_INLINE_BYTES or not isinstance(result, dict) or result.get("status") == "error" or "content" not in result:
+            return result
+        size = len(json.dumps(result["content"], default=str))
+        if size <= DATADOG_RESULT_INLINE_BYTES:
+            return result
+        summary = store_result(result["content"], size)
+        message = f"{result.get('message', '')} ({summary['total_items']} items, {size} bytes, stored as {summary['handle']}; page through them with fetch_result)"
+        return {**result, "message": message.strip(), "content": summary}
+
+    return wrapper
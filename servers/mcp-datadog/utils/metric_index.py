@@ -0,0 +1,163 @@
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set
+
+# Dots, underscores, dashes and spaces all separate metric name segments
+_SEPARATORS = re.compile(r"[._\-\s]+")
+
+# Rank of each match kind, best first
+MATCH_RANKS = {"exact": 0, "prefix": 1, "substring": 2, "fuzzy": 3}
+
+
+def normalize_metric_name(text: str) -> str:
+    return _SEPARATORS.sub(".", text.strip().lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized name, padded so the first and last characters weigh more."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MetricIndex:
+    """Prefix and fuzzy search over the metric names of one org.
+
+    Names are indexed as reported; their normalized form (lower case, any separator a
+    dot) only drives the lookups, so names that differ by a separator stay apart.
+    Prefix lookups binary-search a sorted array of the normalized names, which gives
+    the same ``O(log n + k)`` ranges as a prefix trie without a node per character.
+    Fuzzy lookups use an inverted index from character trigrams to name ids and rank
+    names by trigram similarity (Dice coefficient), so typos, missing segments and
+    words out of order still find the metric.
+
+    ``sync`` only indexes the names added since the previous catalog and tombstones
+    the removed ones; the index is rebuilt once a quarter of its ids are tombstones.
+    """
+
+    def __init__(self) -> None:
+        self.version: Any = None
+        self.names: List[str] = []
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # Ids of the live names of each normalized name
+        self._by_key: Dict[str, List[int]] = {}
+        self._sorted: List[str] = []
+        self._grams: Dict[str, array] = {}
+        self._gram_counts = array("I")
+        self._removed: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return name.strip() in self._ids
+
+    def _add(self, name: str) -> None:
+        key = normalize_metric_name(name)
+        name_id = len(self.names)
+        self.names.append(name)
+        self._keys.append(key)
+        self._ids[name] = name_id
+        self._by_key.setdefault(key, []).append(name_id)
+        grams = trigrams(key)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array("I")
+            postings.append(name_id)
+
+    def _remove(self, name: str) -> None:
+        name_id = self._ids.pop(name)
+        self._removed.add(name_id)
+        key = self._keys[name_id]
+        self._by_key[key].remove(name_id)
+        if not self._by_key[key]:
+            del self._by_key[key]
+
+    def _rebuild(self, names: Iterable[str]) -> None:
+        self.names, self._keys, self._ids, self._by_key = [], [], {}, {}
+        self._grams, self._gram_counts, self._removed = {}, array("I"), set()
+        for name in names:
+            if name not in self._ids:
+                self._add(name)
+        self._sorted = sorted(self._by_key)
+
+    def sync(self, version: Any, names: Iterable[str]) -> Dict[str, int]:
+        """Bring the index up to date with the catalog ``version``; returns the added and removed counts."""
+        with self._lock:
+            if version == self.version:
+                return {"added": 0, "removed": 0}
+            current = set(names)
+            added = [name for name in current if name not in self._ids]
+            gone = [name for name in self._ids if name not in current]
+            if len(self._removed) + len(gone) > len(current) // 4:
+                self._rebuild(current)
+            elif added or gone:
+                keys_before = set(self._by_key)
+                for name in gone:
+                    self._remove(name)
+                for name in added:
+                    self._add(name)
+                new_keys = sorted(set(self._by_key) - keys_before)
+                self._sorted = list(heapq.merge((key for key in self._sorted if key in self._by_key), new_keys))
+            self.version = version
+            return {"added": len(added), "removed": len(gone)}
+
+    def _prefix_ids(self, key: str, limit: int) -> List[int]:
+        start = bisect_left(self._sorted, key)
+        ids: List[int] = []
+        for candidate in self._sorted[start:]:
+            if len(ids) >= limit or not candidate.startswith(key):
+                break
+            ids.extend(self._by_key[candidate])
+        return ids[:limit]
+
+    def prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        """Names starting with ``prefix``, in order."""
+        with self._lock:
+            return [self.names[name_id] for name_id in self._prefix_ids(normalize_metric_name(prefix), limit)]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best matching names: exact, then prefix, then substring matches, then by similarity."""
+        name = query.strip()
+        key = normalize_metric_name(query)
+        if not key:
+            return []
+        query_grams = trigrams(key)
+        with self._lock:
+            shared: Counter = Counter()
+            for gram in query_grams:
+                shared.update(self._grams.get(gram, ()))
+            for name_id in self._removed:
+                shared.pop(name_id, None)
+
+            def similarity(name_id: int) -> float:
+                return 2 * shared[name_id] / (len(query_grams) + self._gram_counts[name_id])
+
+            def kind(name_id: int) -> str:
+                candidate = self._keys[name_id]
+                if self.names[name_id] == name:
+                    return "exact"
+                if candidate.startswith(key):
+                    return "prefix"
+                return "substring" if key in candidate else "fuzzy"
+
+            # Only the most similar names are ranked; prefix matches are always included
+            candidates = set(heapq.nlargest(max(limit * 20, 200), shared, key=similarity))
+            candidates.update(self._prefix_ids(key, limit))
+            ranked = sorted(
+                (MATCH_RANKS[kind(name_id)], -similarity(name_id), len(self._keys[name_id]), name_id) for name_id in candidates
+            )[:limit]
+            return [
+                {"name": self.names[name_id], "match": kind(name_id), "score": round(-negative, 3)}
+                for _, negative, _, name_id in ranked
+            ]
+
+    def suggest(self, name: str, limit: int = 5) -> List[str]:
+        return [match["name"] for match in self.search(name, limit)]
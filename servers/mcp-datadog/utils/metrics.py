@@ -0,0 +1,138 @@
+import functools
+import inspect
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from utils.breakers import STATE_VALUES, CircuitBreaker
+from utils.cache import TTLCache
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+TOOL_CALLS = Counter("mcp_tool_calls_total", "Tool invocations by result status", ["tool", "status"])
+TOOL_LATENCY = Histogram("mcp_tool_duration_seconds", "Tool execution time", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_IN_FLIGHT = Gauge("mcp_tool_in_flight", "Tool calls currently executing", ["tool"])
+TOOL_RESPONSE_BYTES = Histogram("mcp_tool_response_bytes", "Size of tool results serialized as JSON", ["tool"], buckets=SIZE_BUCKETS)
+TOOL_ABORTED = Counter("mcp_tool_aborted_total", "Tool calls stopped by their deadline or by client cancellation", ["tool", "reason"])
+METRIC_QUERIES = Counter("mcp_metric_queries_total", "Metric queries answered by the query planner")
+METRIC_QUERY_CALLS = Counter("mcp_metric_query_upstream_calls_total", "Upstream calls the query planner made for them")
+RESOURCE_SUBSCRIBERS = Gauge("mcp_resource_subscribers", "Sessions subscribed to a watched resource", ["uri"])
+WEBHOOK_ALERTS = Counter("mcp_webhook_alerts_total", "Alert webhook payloads received, by outcome", ["outcome"])
+UPSTREAM_LATENCY = Histogram("mcp_upstream_request_duration_seconds", "Upstream API request time", ["api", "status"], buckets=LATENCY_BUCKETS)
+
+
+def _result_status(result: Any) -> str:
+    """Tools report failures in their result dict instead of raising."""
+    if isinstance(result, dict) and (result.get("status") == "error" or "error" in result):
+        return "error"
+    return "ok"
+
+
+def _record(tool: str, started: float, result: Any, status: str) -> None:
+    TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+    TOOL_CALLS.labels(tool, status).inc()
+    if result is not None:
+        TOOL_RESPONSE_BYTES.labels(tool).observe(len(json.dumps(result, default=str)))
+
+
+def instrument_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool function to record call counts, latency, in-flight calls and result size.
+
+    ``functools.wraps`` keeps the original signature visible, so FastMCP builds the same
+    input schema for the wrapper as for the tool itself.
+    """
+    tool = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            TOOL_IN_FLIGHT.labels(tool).inc()
+            result, status = None, "exception"
+            try:
+                result = await func(*args, **kwargs)
+                status = _result_status(result)
+                return result
+            finally:
+                TOOL_IN_FLIGHT.labels(tool).dec()
+                _record(tool, started, result, status)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        TOOL_IN_FLIGHT.labels(tool).inc()
+        result, status = None, "exception"
+        try:
+            result = func(*args, **kwargs)
+            status = _result_status(result)
+            return result
+        finally:
+            TOOL_IN_FLIGHT.labels(tool).dec()
+            _record(tool, started, result, status)
+    return wrapper
+
+
+@contextmanager
+def track_upstream(api: str) -> Iterator[None]:
+    """Time one upstream request, labelled with the HTTP status of a failed call."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception as e:
+        status = str(getattr(e, "status", None) or getattr(getattr(e, "response", None), "status_code", None) or "error")
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(api, status).observe(time.perf_counter() - started)
+
+
+class CacheCollector:
+    """Expose hit, miss and size counters of every TTLCache at scrape time."""
+
+    def collect(self):
+        hits = CounterMetricFamily("mcp_cache_hits", "Cache lookups served from cache", labels=["cache"])
+        misses = CounterMetricFamily("mcp_cache_misses", "Cache lookups that missed", labels=["cache"])
+        entries = GaugeMetricFamily("mcp_cache_entries", "Entries currently cached", labels=["cache"])
+        for cache in TTLCache.instances:
+            hits.add_metric([cache.name], cache.hits)
+            misses.add_metric([cache.name], cache.misses)
+            entries.add_metric([cache.name], len(cache))
+        yield hits
+        yield misses
+        yield entries
+
+
+class CircuitBreakerCollector:
+    """Expose the state, trips, rejections and hedged requests of every API family's circuit breaker."""
+
+    def collect(self):
+        state = GaugeMetricFamily("mcp_upstream_circuit_state", "Circuit state per API family (0 closed, 1 half-open, 2 open)", labels=["org", "api"])
+        opened = CounterMetricFamily("mcp_upstream_circuit_opened", "Times the circuit of an API family opened", labels=["org", "api"])
+        rejected = CounterMetricFamily("mcp_upstream_circuit_rejected", "Upstream calls refused while the circuit was open", labels=["org", "api"])
+        hedged = CounterMetricFamily("mcp_upstream_hedged_requests", "Reads sent a second time after the p95 latency", labels=["org", "api"])
+        hedge_wins = CounterMetricFamily("mcp_upstream_hedge_wins", "Hedged reads answered first by the second request", labels=["org", "api"])
+        for breaker in list(CircuitBreaker.instances.values()):
+            labels = [breaker.org, breaker.api]
+            state.add_metric(labels, STATE_VALUES[breaker.state])
+            opened.add_metric(labels, breaker.opened)
+            rejected.add_metric(labels, breaker.rejected)
+            hedged.add_metric(labels, breaker.hedged)
+            hedge_wins.add_metric(labels, breaker.hedge_wins)
+        yield state
+        yield opened
+        yield rejected
+        yield hedged
+        yield hedge_wins
+
+
+REGISTRY.register(CacheCollector())
+REGISTRY.register(CircuitBreakerCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the Prometheus exposition body and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,77 @@
+import contextvars
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterator, Literal, Optional, Sequence, TypeVar
+from pydantic import Field
+
+T = TypeVar("T")
+
+# Name of the org served when DATADOG_ORGS is not set
+DEFAULT_ORG = "default"
+
+_default_org = DEFAULT_ORG
+_current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("datadog_org", default=None)
+
+
+def set_default_org(name: str) -> None:
+    """Org used by tool calls that do not select one."""
+    global _default_org
+    _default_org = name
+
+
+def current_org_name() -> str:
+    """Org selected for the running tool call, or the default org."""
+    return _current.get() or _default_org
+
+
+@contextmanager
+def use_org(name: Optional[str]) -> Iterator[None]:
+    """Run the enclosed calls against org ``name`` (None keeps the default)."""
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class PerOrg(Generic[T]):
+    """One lazily created instance of a resource (rate limiter, client...) per Datadog org."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self.factory = factory
+        self._instances: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        name = current_org_name()
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.setdefault(name, self.factory())
+        return instance
+
+
+def select_org(func: Callable[..., Any], orgs: Sequence[str]) -> Callable[..., Any]:
+    """Add an optional ``org`` argument to an async tool and run each call against that org.
+
+    The argument is appended to the tool's signature, so FastMCP lists it in the input
+    schema with the configured org names as its allowed values.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, org: Optional[str] = None, **kwargs):
+        if org is not None and org not in orgs:
+            return {"status": "error", "message": f"Unknown Datadog org '{org}'. Available orgs: {', '.join(orgs)}"}
+        with use_org(org):
+            return await func(*args, **kwargs)
+
+    signature = inspect.signature(func)
+    org_parameter = inspect.Parameter(
+        "org",
+        inspect.Parameter.KEYWORD_ONLY,
+        default=Field(default=None, description=f"Datadog org to query (default: {_default_org})"),
+        annotation=Optional[Literal[tuple(orgs)]],
+    )
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), org_parameter])
+    return wrapper
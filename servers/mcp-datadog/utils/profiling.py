@@ -0,0 +1,213 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from config import DATADOG_PROFILE_DIR, DATADOG_PROFILE_INTERVAL_MS, DATADOG_PROFILE_SLOWEST, DATADOG_PROFILE_TOOLS
+from utils.sampling import TopK
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per allocation traceback while tracemalloc runs
+TRACEMALLOC_FRAMES = 10
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+MAX_ARGUMENT_CHARS = 200
+
+
+def _frame_name(frame: Any) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    """Sample the Python stack of one thread from a background thread at a fixed interval.
+
+    Stacks are counted in collapsed form (``outer;...;inner``), which flame graph tools
+    read directly, and the innermost line of each sample is counted separately to rank
+    where the time is spent.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.lines: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tool-profiler", daemon=True)
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.lines[f"{_frame_name(frame)}:{frame.f_lineno}"] += 1
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+def _argument_summary(arguments: Dict[str, Any]) -> Dict[str, str]:
+    summary = {}
+    for name, value in arguments.items():
+        text = json.dumps(value, default=str)
+        summary[name] = text if len(text) <= MAX_ARGUMENT_CHARS else text[:MAX_ARGUMENT_CHARS] + "..."
+    return summary
+
+
+class ToolProfiler:
+    """Opt-in profiler for tool calls.
+
+    Profiled calls run under a :class:`StackSampler` and between two tracemalloc
+    snapshots; each call writes a JSON report and a collapsed stack file to ``directory``,
+    and the ``slowest`` longest calls are kept in memory with their arguments. Calls to
+    tools that are not selected only pay for :meth:`is_profiled`.
+    """
+
+    def __init__(self, tools: Iterable[str] = (), directory: str = "./profiles", slowest: int = 20, interval_ms: float = 5) -> None:
+        self.directory = directory
+        self.interval = interval_ms / 1000
+        self.tools: frozenset = frozenset()
+        self.slowest = TopK(slowest, key=lambda call: call["duration_ms"])
+        self._lock = threading.Lock()
+        self.configure(tools)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tools)
+
+    def configure(self, tools: Iterable[str]) -> None:
+        """Select the tools to profile (``"*"`` for every tool); an empty selection disables profiling."""
+        self.tools = frozenset(name.strip() for name in tools if name.strip())
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        elif not self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def is_profiled(self, tool: str) -> bool:
+        return bool(self.tools) and ("*" in self.tools or tool in self.tools)
+
+    def slowest_calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.slowest.items()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.slowest = TopK(self.slowest.k, key=self.slowest.key)
+
+    @contextmanager
+    def profile(self, tool: str, arguments: Dict[str, Any]) -> Iterator[None]:
+        """Profile the block as one call of ``tool``.
+
+        Peak memory and allocation growth come from process-wide tracemalloc state, so
+        calls running concurrently are attributed each other's allocations.
+        """
+        started_at = datetime.now(timezone.utc)
+        before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if before is not None:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        error = None
+        with StackSampler(threading.get_ident(), self.interval) as sampler:
+            try:
+                yield
+            except Exception as e:
+                error = repr(e)
+                raise
+            finally:
+                duration = time.perf_counter() - started
+                cpu = time.thread_time() - cpu_started
+        tracing = before is not None and tracemalloc.is_tracing()
+        peak = tracemalloc.get_traced_memory()[1] if tracing else None
+        after = tracemalloc.take_snapshot() if tracing else None
+
+        call = {
+            "tool": tool,
+            "started_at": started_at.isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "arguments": _argument_summary(arguments),
+            "error": error,
+            "samples": sampler.samples,
+            "peak_memory_kb": round(peak / 1024, 1) if peak is not None else None,
+            "top_lines": [{"line": line, "samples": count} for line, count in sampler.lines.most_common(TOP_FUNCTIONS)],
+            "top_allocations": self._allocation_diff(before, after),
+            "profile": None,
+        }
+        call["profile"] = self._write(call, sampler.stacks)
+        with self._lock:
+            self.slowest.add(call)
+
+    def _allocation_diff(self, before: Optional[tracemalloc.Snapshot], after: Optional[tracemalloc.Snapshot]) -> List[Dict[str, Any]]:
+        if before is None or after is None:
+            return []
+        filters = [tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, threading)] + [tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        return [
+            {"line": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+            for stat in diff[:TOP_ALLOCATIONS]
+        ]
+
+    def _write(self, call: Dict[str, Any], stacks: Counter) -> Optional[str]:
+        """Write the call report and its collapsed stacks, returning the report path."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = call["started_at"].replace(":", "").replace("+0000", "Z")
+            base = os.path.join(self.directory, f"{stamp}-{call['tool']}")
+            with open(f"{base}.collapsed", "w") as collapsed:
+                for stack, count in stacks.most_common():
+                    collapsed.write(f"{stack} {count}\n")
+            with open(f"{base}.json", "w") as report:
+                json.dump(call, report, indent=2)
+            return f"{base}.json"
+        except OSError as e:
+            logger.error(f"Could not write profile for {call['tool']}: {e}")
+            return None
+
+
+profiler = ToolProfiler(DATADOG_PROFILE_TOOLS.split(","), DATADOG_PROFILE_DIR, DATADOG_PROFILE_SLOWEST, DATADOG_PROFILE_INTERVAL_MS)
+
+
+def profile_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool function so its calls are profiled whenever profiling selects it.
+
+    While the tool is not selected the wrapper costs one set lookup per call.
+    """
+    tool = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not profiler.is_profiled(tool):
+                return await func(*args, **kwargs)
+            with profiler.profile(tool, kwargs):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.is_profiled(tool):
+            return func(*args, **kwargs)
+        with profiler.profile(tool, kwargs):
+            return func(*args, **kwargs)
+    return wrapper
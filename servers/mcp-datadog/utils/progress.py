@@ -0,0 +1,80 @@
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from mcp.server.lowlevel.server import request_ctx
+
+# Minimum seconds between two notifications of one call; the final one is always sent
+PROGRESS_MIN_INTERVAL = 0.5
+
+_reporter: contextvars.ContextVar[Optional["ProgressReporter"]] = contextvars.ContextVar("progress_reporter", default=None)
+
+
+class ProgressReporter:
+    """Send MCP progress notifications for the current request from a worker thread.
+
+    Notifications are scheduled on the event loop without waiting for them, and are
+    throttled to one per ``min_interval`` so chatty loops do not flood the client.
+    """
+
+    def __init__(self, session: Any, token: Any, request_id: Any, loop: asyncio.AbstractEventLoop, min_interval: float = PROGRESS_MIN_INTERVAL) -> None:
+        self.session = session
+        self.token = token
+        self.request_id = request_id
+        self.loop = loop
+        self.min_interval = min_interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_current_request(cls) -> Optional["ProgressReporter"]:
+        """Reporter for the request being handled, or None when the client sent no progress token."""
+        try:
+            context = request_ctx.get()
+        except LookupError:
+            return None
+        token = context.meta.progressToken if context.meta is not None else None
+        if token is None:
+            return None
+        return cls(context.session, token, context.request_id, asyncio.get_running_loop())
+
+    def report(self, progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+        now = time.monotonic()
+        final = total is not None and progress >= total
+        with self._lock:
+            if not final and now - self._last < self.min_interval:
+                return
+            self._last = now
+        asyncio.run_coroutine_threadsafe(
+            self.session.send_progress_notification(self.token, progress, total, message, related_request_id=self.request_id), self.loop
+        )
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+    """Report progress, and optionally a partial result in ``message``, for the running tool call.
+
+    Does nothing when the client did not ask for progress or no reporter is bound.
+    """
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.report(progress, total, message)
+
+
+def bind_progress_reporter() -> None:
+    """Attach a reporter for the request being handled to the current context.
+
+    Must run on the event loop; the context is then copied to the thread that runs the tool.
+    """
+    _reporter.set(ProgressReporter.for_current_request())
+
+
+@contextmanager
+def without_progress() -> Iterator[None]:
+    """Drop the progress reports of the enclosed calls, e.g. of a tool run by another tool."""
+    token = _reporter.set(None)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
@@ -0,0 +1,118 @@
+import math
+import re
+import time
+from typing import Any, Callable, Tuple
+from utils.cache import create_cache
+
+# Datadog's default rollup per query range: (longest range in seconds, rollup interval in seconds)
+ROLLUP_INTERVALS = [
+    (3600, 20),
+    (4 * 3600, 60),
+    (86400, 300),
+    (2 * 86400, 600),
+    (7 * 86400, 3600),
+    (31 * 86400, 4 * 3600),
+]
+# Points older than this are final, so results of ranges ending before it are kept longer
+SETTLED_SECONDS = 600
+SETTLED_TTL = 3600
+
+_SPACES = re.compile(r"\s+")
+# Whitespace next to these characters carries no meaning in a metric query
+_METRIC_PUNCTUATION = re.compile(r"\s*([{}(),:!])\s*")
+_SCOPE = re.compile(r"\{([^{}]*)\}")
+_GROUP_BY = re.compile(r"\}BY\{", re.IGNORECASE)
+# Search syntax whose terms cannot be reordered
+_SEARCH_OPERATORS = re.compile(r"(^| )(AND|OR|NOT|TO)( |$)|[\"()\[\]\\]")
+
+# Results of metric and span queries, keyed by canonical query and aligned range
+_results = create_cache("query_results", max_entries=1024)
+
+
+def _canonical_scope(match: "re.Match[str]") -> str:
+    scope = match.group(1)
+    # Boolean scopes (``env:prod AND NOT host:a``) are kept as written
+    if " " in scope or "(" in scope:
+        return "{" + scope + "}"
+    tags = {tag.lower() for tag in scope.split(",") if tag}
+    if len(tags) > 1:
+        tags.discard("*")
+    return "{" + ",".join(sorted(tags)) + "}"
+
+
+def normalize_metric_query(query: str) -> str:
+    """Canonical form of a metric query, so equivalent spellings share cache entries.
+
+    Whitespace is collapsed and dropped around punctuation, and the tags of each
+    comma-separated scope and ``by {...}`` clause are lowercased, deduplicated and
+    sorted, as Datadog lowercases tags on intake. Metric names keep their case.
+    """
+    text = _METRIC_PUNCTUATION.sub(r"\1", _SPACES.sub(" ", query.strip()))
+    text = _GROUP_BY.sub("} by {", text)
+    return _SCOPE.sub(_canonical_scope, text)
+
+
+def normalize_search_query(query: str) -> str:
+    """Canonical form of a span, log or event search query.
+
+    Whitespace is collapsed. A query made only of terms, which Datadog ANDs, has its
+    terms deduplicated and sorted; queries with boolean operators, groups, ranges,
+    quotes or escapes keep their order. Values keep their case.
+    """
+    text = _SPACES.sub(" ", query.strip())
+    if not text or _SEARCH_OPERATORS.search(text):
+        return text or "*"
+    terms = set(text.split(" "))
+    if len(terms) > 1:
+        terms.discard("*")
+    return " ".join(sorted(terms))
+
+
+def rollup_interval(from_time: int, to_time: int) -> int:
+    """Rollup interval Datadog uses for a range, in seconds."""
+    length = to_time - from_time
+    for longest, interval in ROLLUP_INTERVALS:
+        if length <= longest:
+            return interval
+    return 86400
+
+
+def align_time_range(from_time: int, to_time: int, widen: bool = False) -> Tuple[int, int, int]:
+    """Move both ends of a range up to boundaries of its rollup interval; returns (from, to, interval).
+
+    Datadog already aligns the returned points of a timeseries to those boundaries, so
+    ranges a few seconds apart map to the same buckets and to the same cache entry. The
+    aligned range keeps the rollup interval of the requested one. Searches of raw spans
+    or events have no such buckets; with ``widen`` the start is moved down instead, so
+    the aligned range still covers the whole requested one.
+    """
+    interval = rollup_interval(from_time, to_time)
+    start, end = math.ceil(from_time / interval) * interval, math.ceil(to_time / interval) * interval
+    if widen:
+        return math.floor(from_time / interval) * interval, end, interval
+    if rollup_interval(start, end) != interval:
+        start -= interval
+    return start, end, interval
+
+
+def cached_query(
+    kind: str,
+    query: str,
+    from_time: int,
+    to_time: int,
+    loader: Callable[[str, int, int], Any],
+    normalize: Callable[[str], str] = normalize_metric_query,
+    widen: bool = False,
+    **params: Any,
+) -> Any:
+    """Run ``loader(query, from_time, to_time)`` with the canonical query and aligned range, through the cache.
+
+    ``kind`` and ``params`` (page size, sort...) complete the cache key. Results of a
+    range that is still filling expire after one rollup interval; settled ones after an hour.
+    Searches of raw spans or events pass ``widen`` so no part of the range is dropped.
+    """
+    canonical = normalize(query)
+    start, end, interval = align_time_range(from_time, to_time, widen)
+    ttl = interval if end > time.time() - SETTLED_SECONDS else SETTLED_TTL
+    key = (kind, canonical, start, end, tuple(sorted(params.items())))
+    return _results.get_or_load(key, lambda: loader(canonical, start, end), ttl)
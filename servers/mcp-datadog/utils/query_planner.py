@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from datadog_api_client.v1.api.metrics_api import MetricsApi
+from config import DATADOG_QUERY_BATCH_MAX, DATADOG_QUERY_BATCH_MS, DATADOG_TOOL_TIMEOUT, datadog_client
+from utils.concurrency import run_concurrently
+from utils.deadlines import CallAborted, Deadline, check_deadline, remaining_time, use_deadline
+from utils.metrics import METRIC_QUERIES, METRIC_QUERY_CALLS
+from utils.orgs import PerOrg, current_org_name, use_org
+from utils.queries import rollup_interval
+
+# Seconds a caller waits for its batch between two checks of its own deadline
+_WAIT_STEP = 0.05
+
+
+def is_single_query(query: str) -> bool:
+    """Whether ``query`` is one query, not several joined by top-level commas."""
+    depth = 0
+    for char in query:
+        if char in "{(":
+            depth += 1
+        elif char in "})":
+            depth -= 1
+        elif char == "," and depth == 0:
+            return False
+    return True
+
+
+class _Request:
+    def __init__(self, query: str, from_time: int, to_time: int) -> None:
+        self.query = query
+        self.from_time = from_time
+        self.to_time = to_time
+        self.interval = rollup_interval(from_time, to_time)
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+        # Set when the caller gave up waiting, so a batch not yet sent leaves the request out
+        self.abandoned = False
+        # When the caller's deadline passes (monotonic), or None without one
+        remaining = remaining_time()
+        self.expires = None if remaining is None else time.monotonic() + remaining
+
+
+def _slice(response: Dict[str, Any], index: int, request: _Request) -> Dict[str, Any]:
+    """The series of query ``index`` of a fused response, cut to the range of ``request``."""
+    low, high = request.from_time * 1000, request.to_time * 1000
+    series = []
+    for item in response.get("series") or []:
+        if item.get("query_index", 0) != index:
+            continue
+        points = [point for point in item.get("pointlist") or [] if low <= point[0] <= high]
+        if points:
+            series.append({
+                **item,
+                "pointlist": points,
+                "length": len(points),
+                "start": max(item.get("start", low), low),
+                "end": min(item.get("end", high), high),
+                "query_index": 0,
+            })
+    return {**response, "query": request.query, "from_date": low, "to_date": high, "series": series}
+
+
+class MetricQueryPlanner:
+    """Fuse the metric queries of one org that arrive within a short batching window.
+
+    The first request of a window starts a batch thread, which waits ``window`` seconds
+    for others, then plans the batch. Requests with the same rollup interval whose
+    ranges overlap share one range, as long as the merged range keeps that interval,
+    and the distinct queries of a merged range (at most ``max_queries``) go upstream as
+    one comma-separated query. Each caller gets its own series (by ``query_index``) cut
+    to its own range, so the result matches a call of its own. A fused call that fails
+    is retried per request.
+
+    The batch thread runs in a context that holds only the org and a deadline of its own,
+    the latest of its callers' deadlines, so no caller's deadline or cancellation reaches
+    the requests of the others; each caller enforces its own deadline while it waits for
+    its result.
+    """
+
+    def __init__(self, window: float, max_queries: int) -> None:
+        self.window = window
+        self.max_queries = max_queries
+        self._pending: List[_Request] = []
+        self._lock = threading.Lock()
+
+    def query(self, query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+        """Result of ``query`` over ``[from_time, to_time]``, as ``MetricsApi.query_metrics(...).to_dict()``."""
+        request = _Request(query, from_time, to_time)
+        METRIC_QUERIES.inc()
+        if self.window <= 0 or not is_single_query(query):
+            self._fetch([request])
+        else:
+            with self._lock:
+                self._pending.append(request)
+                first = len(self._pending) == 1
+            if first:
+                # Threads start with an empty context: the batch carries no caller's deadline or trace
+                threading.Thread(target=self._run_batch, args=(current_org_name(),), name="metric-query-batch", daemon=True).start()
+            try:
+                while not request.done.wait(_WAIT_STEP):
+                    check_deadline()
+            except CallAborted:
+                request.abandoned = True
+                raise
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run_batch(self, org: str) -> None:
+        time.sleep(self.window)
+        with self._lock:
+            batch, self._pending = self._pending, []
+        batch = [request for request in batch if not request.abandoned]
+        if batch:
+            # Bounded by the latest deadline of its callers, or DATADOG_TOOL_TIMEOUT if one has none,
+            # so a hung upstream times out instead of holding the batch thread forever
+            expires = [request.expires for request in batch]
+            timeout = DATADOG_TOOL_TIMEOUT if None in expires else min(DATADOG_TOOL_TIMEOUT, max(expires) - time.monotonic())
+            with use_org(org), use_deadline(Deadline(max(timeout, 0.001))):
+                self._execute(batch)
+
+    def plan(self, requests: List[_Request]) -> List[List[_Request]]:
+        """Split a batch into the requests answered by each upstream call."""
+        by_interval: Dict[int, List[_Request]] = defaultdict(list)
+        for request in requests:
+            by_interval[request.interval].append(request)
+        calls = []
+        for interval, members in by_interval.items():
+            members.sort(key=lambda request: (request.from_time, request.to_time))
+            current, start, end = [members[0]], members[0].from_time, members[0].to_time
+            for request in members[1:]:
+                merged_end = max(end, request.to_time)
+                queries = {member.query for member in current} | {request.query}
+                if request.from_time <= end and rollup_interval(start, merged_end) == interval and len(queries) <= self.max_queries:
+                    current.append(request)
+                    end = merged_end
+                else:
+                    calls.append(current)
+                    current, start, end = [request], request.from_time, request.to_time
+            calls.append(current)
+        return calls
+
+    def _execute(self, batch: List[_Request]) -> None:
+        try:
+            run_concurrently(self._fetch, self.plan(batch))
+        finally:
+            for request in batch:
+                if not request.done.is_set():
+                    request.error = request.error or RuntimeError("Metric query batch did not run")
+                    request.done.set()
+
+    def _fetch(self, requests: List[_Request]) -> None:
+        queries = list(dict.fromkeys(request.query for request in requests))
+        start = min(request.from_time for request in requests)
+        end = max(request.to_time for request in requests)
+        try:
+            METRIC_QUERY_CALLS.inc()
+            with datadog_client() as api_client:
+                response = MetricsApi(api_client).query_metrics(start, end, ",".join(queries)).to_dict()
+        except CallAborted as e:
+            for request in requests:
+                request.error = e
+                request.done.set()
+            return
+        except Exception as e:
+            if len(queries) > 1:
+                # One invalid query fails the whole fused call; retry each request on its own
+                for request in requests:
+                    self._fetch([request])
+                return
+            for request in requests:
+                request.error = e
+                request.done.set()
+            return
+        for request in requests:
+            if len(requests) == 1:
+                request.result = response
+            else:
+                request.result = _slice(response, queries.index(request.query), request)
+            request.done.set()
+
+
+_planners = PerOrg(lambda: MetricQueryPlanner(DATADOG_QUERY_BATCH_MS / 1000, DATADOG_QUERY_BATCH_MAX))
+
+
+def planned_metric_query(query: str, from_time: int, to_time: int) -> Dict[str, Any]:
+    """Query a metric through the current org's query planner."""
+    return _planners.get().query(query, from_time, to_time)
@@ -0,0 +1,110 @@
+import hashlib
+import heapq
+import itertools
+import random
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Reservoir(Generic[T]):
+    """Uniform sample of at most ``size`` items from a stream of unknown length (Algorithm R)."""
+
+    def __init__(self, size: int, rng: Optional[random.Random] = None) -> None:
+        self.size = size
+        self.seen = 0
+        self.items: List[T] = []
+        self._rng = rng or random.Random()
+
+    def add(self, item: T) -> None:
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            return
+        index = self._rng.randrange(self.seen)
+        if index < self.size:
+            self.items[index] = item
+
+
+class StratifiedReservoir(Generic[T]):
+    """One reservoir per stratum key, with the number of strata capped.
+
+    Items of strata beyond ``max_strata`` go to a shared overflow reservoir so memory
+    stays bounded even for high-cardinality keys.
+    """
+
+    OVERFLOW = "__other__"
+
+    def __init__(self, size_per_stratum: int, max_strata: int = 50, rng: Optional[random.Random] = None) -> None:
+        self.size_per_stratum = size_per_stratum
+        self.max_strata = max_strata
+        self.strata: Dict[Hashable, Reservoir[T]] = {}
+        self._rng = rng or random.Random()
+
+    def add(self, key: Hashable, item: T) -> None:
+        reservoir = self.strata.get(key)
+        if reservoir is None:
+            if len(self.strata) >= self.max_strata:
+                key = self.OVERFLOW
+                reservoir = self.strata.get(key)
+            if reservoir is None:
+                reservoir = self.strata[key] = Reservoir(self.size_per_stratum, self._rng)
+        reservoir.add(item)
+
+
+class TopK(Generic[T]):
+    """The ``k`` largest items of a stream by ``key``, kept in a bounded min-heap."""
+
+    def __init__(self, k: int, key: Callable[[T], Any]) -> None:
+        self.k = k
+        self.key = key
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+
+    def add(self, item: T) -> None:
+        entry = (self.key(item), next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[T]:
+        """Items ordered from largest to smallest."""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+class DistinctCounter:
+    """Approximate number of distinct values in a stream, in bounded memory (k minimum values).
+
+    The ``k`` smallest 64-bit hashes seen are kept; the count is exact until more than
+    ``k`` distinct values arrive, then estimated from the ``k``-th smallest hash, with a
+    relative error of about ``1 / sqrt(k)`` (3% for the default 1024).
+    """
+
+    _SPACE = float(2 ** 64)
+
+    def __init__(self, k: int = 1024) -> None:
+        self.k = k
+        # Max-heap (negated) of the k smallest hashes, and the same hashes for membership
+        self._heap: List[int] = []
+        self._hashes: set = set()
+
+    def add(self, value: Any) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+        if hashed in self._hashes:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -hashed)
+            self._hashes.add(hashed)
+        elif hashed < -self._heap[0]:
+            self._hashes.discard(-heapq.heapreplace(self._heap, -hashed))
+            self._hashes.add(hashed)
+
+    @property
+    def exact(self) -> bool:
+        return len(self._heap) < self.k
+
+    def count(self) -> int:
+        if self.exact:
+            return len(self._heap)
+        return int(round((self.k - 1) * self._SPACE / (-self._heap[0] + 1)))
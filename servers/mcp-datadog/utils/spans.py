@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+from datadog_api_client.v2.api.spans_api import SpansApi
+from utils.sampling import DistinctCounter, Reservoir, StratifiedReservoir, TopK
+
+
+def span_search_body(query: str, from_time: int, to_time: int, limit: int = 1000, sort: Optional[str] = None) -> Dict[str, Any]:
+    """Build a spans search request, sending the epoch-second bounds as ISO-8601 timestamps."""
+    attributes: Dict[str, Any] = {
+        "filter": {
+            "query": query,
+            "from": datetime.fromtimestamp(from_time, tz=timezone.utc).isoformat(),
+            "to": datetime.fromtimestamp(to_time, tz=timezone.utc).isoformat(),
+        },
+        "page": {"limit": limit},
+    }
+    if sort:
+        attributes["sort"] = sort
+    return {"data": {"attributes": attributes, "type": "search_request"}}
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        # to_dict() serializes timestamps as ISO-8601 strings
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    return float(value) if value is not None else None
+
+
+def normalize_span(span: Any) -> Dict[str, Any]:
+    """Flatten a search result span into the fields the analysis tools use.
+
+    ``start`` and ``end`` are epoch seconds and ``duration`` is in seconds.
+    """
+    attributes = (span.to_dict() if hasattr(span, "to_dict") else span).get("attributes") or {}
+    custom = attributes.get("custom") or {}
+    start = _epoch(attributes.get("start_timestamp"))
+    end = _epoch(attributes.get("end_timestamp"))
+    if end is None and start is not None and custom.get("duration") is not None:
+        end = start + custom["duration"] / 1e9
+    tags = attributes.get("tags") or []
+    error = bool(custom.get("error")) or "status:error" in tags or (attributes.get("attributes") or {}).get("status") == "error"
+    return {
+        "span_id": attributes.get("span_id"),
+        "parent_id": attributes.get("parent_id"),
+        "trace_id": attributes.get("trace_id"),
+        "service": attributes.get("service") or "unknown",
+        "resource": attributes.get("resource_name"),
+        "type": attributes.get("type"),
+        "start": start,
+        "end": end,
+        "duration": (end - start) if start is not None and end is not None else 0.0,
+        "error": error,
+    }
+
+
+def iter_spans(spans_api: SpansApi, query: str, from_time: int, to_time: int, page_limit: int = 1000, max_spans: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield normalized spans matching ``query``, following the search cursor page by page."""
+    body = span_search_body(query, from_time, to_time, limit=page_limit)
+    for count, span in enumerate(spans_api.list_spans_with_pagination(body=body)):
+        if max_spans is not None and count >= max_spans:
+            return
+        yield normalize_span(span)
+
+
+def _exemplar(span: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "trace_id": span["trace_id"],
+        "span_id": span["span_id"],
+        "service": span["service"],
+        "resource": span["resource"],
+        "duration_ms": round(span["duration"] * 1000, 3),
+        "error": span["error"],
+    }
+
+
+class SpanStreamSummary:
+    """Single-pass summary of a span stream with bounded exemplar samples.
+
+    Per-service counters are exact; the raw spans kept as evidence are limited to the
+    ``slowest`` largest durations, a reservoir of errored spans and a reservoir per
+    (service, status) stratum, so memory does not grow with the number of spans. The
+    number of traces is exact up to ``DistinctCounter.k`` traces and estimated beyond.
+    """
+
+    def __init__(self, slowest: int = 5, errored: int = 5, per_stratum: int = 2, max_strata: int = 50) -> None:
+        self.span_count = 0
+        self.traces = DistinctCounter()
+        self.services: Dict[str, Dict[str, float]] = {}
+        self.slowest = TopK(slowest, key=lambda exemplar: exemplar["duration_ms"])
+        self.errored = Reservoir(errored)
+        self.stratified = StratifiedReservoir(per_stratum, max_strata)
+
+    def add(self, span: Dict[str, Any]) -> None:
+        self.span_count += 1
+        if span["trace_id"]:
+            self.traces.add(span["trace_id"])
+        stats = self.services.setdefault(span["service"], {"spans": 0, "errors": 0, "total_duration": 0.0, "max_duration": 0.0})
+        stats["spans"] += 1
+        stats["total_duration"] += span["duration"]
+        stats["max_duration"] = max(stats["max_duration"], span["duration"])
+
+        exemplar = _exemplar(span)
+        self.slowest.add(exemplar)
+        if span["error"]:
+            stats["errors"] += 1
+            self.errored.add(exemplar)
+        self.stratified.add((span["service"], "error" if span["error"] else "ok"), exemplar)
+
+    def headline(self, top: int = 3) -> str:
+        """One-line partial summary: totals and the services with the most errors, then the most spans."""
+        errors = sum(stats["errors"] for stats in self.services.values())
+        ranked = sorted(self.services.items(), key=lambda item: (item[1]["errors"], item[1]["spans"]), reverse=True)[:top]
+        services = "; ".join(
+            f"{service}: {stats['spans']} spans, {stats['errors']} errors, avg {stats['total_duration'] / stats['spans'] * 1000:.1f} ms"
+            for service, stats in ranked
+        )
+        traces = f"{self.traces.count()}" if self.traces.exact else f"~{self.traces.count()}"
+        return f"{self.span_count} spans, {traces} traces, {errors} errors" + (f" | {services}" if services else "")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_count": self.traces.count(),
+            "trace_count_approximate": not self.traces.exact,
+            "span_count": self.span_count,
+            "services": [
+                {
+                    "service": service,
+                    "spans": stats["spans"],
+                    "errors": stats["errors"],
+                    "avg_duration_ms": round(stats["total_duration"] / stats["spans"] * 1000, 3),
+                    "max_duration_ms": round(stats["max_duration"] * 1000, 3),
+                }
+                for service, stats in sorted(self.services.items(), key=lambda item: item[1]["spans"], reverse=True)
+            ],
+            "exemplars": {
+                "slowest": self.slowest.items(),
+                "errored": self.errored.items,
+                "sampled": [
+                    {"service": key[0] if isinstance(key, tuple) else key, "status": key[1] if isinstance(key, tuple) else None, "spans": reservoir.items}
+                    for key, reservoir in self.stratified.strata.items()
+                ],
+            },
+        }
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import anyio
+from mcp.server.lowlevel.server import Server
+from pydantic import AnyUrl
+from utils.metrics import RESOURCE_SUBSCRIBERS
+from utils.orgs import use_org
+
+logger = logging.getLogger(__name__)
+
+
+class WatchedResource:
+    """State view of one org served as an MCP resource, and the sessions subscribed to it."""
+
+    def __init__(self, uri: str, org: str, view: Callable[[], Any]) -> None:
+        self.uri = uri
+        self.org = org
+        self.view = view
+        # Subscribed session -> event loop its notifications are sent on
+        self.subscribers: Dict[Any, asyncio.AbstractEventLoop] = {}
+        self.snapshot: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        self.polling = False
+
+    def load(self) -> str:
+        """Read the view upstream and return the resource text; records whether it changed."""
+        with use_org(self.org):
+            state = self.view()
+        body = json.dumps(state, default=str, sort_keys=True)
+        fingerprint = hashlib.sha256(body.encode()).hexdigest()
+        changed = self.fingerprint is not None and fingerprint != self.fingerprint
+        self.fingerprint = fingerprint
+        self.snapshot = json.dumps({"org": self.org, "updated_at": int(time.time()), "changed": changed, "state": state}, default=str)
+        return self.snapshot
+
+
+class SubscriptionHub:
+    """Subscribable MCP resources backed by one upstream poller each.
+
+    A resource is polled only while at least one session is subscribed to it, every
+    ``interval`` seconds, however many sessions are subscribed. When its state changes,
+    every subscriber gets a ``notifications/resources/updated`` and reads the snapshot
+    the poller already holds, so N watching clients cost one poller instead of N.
+    """
+
+    def __init__(self, server: Server, interval: float) -> None:
+        self.server = server
+        self.interval = interval
+        self.resources: Dict[str, WatchedResource] = {}
+        self._lock = threading.Lock()
+        server.subscribe_resource()(self._subscribe)
+        server.unsubscribe_resource()(self._unsubscribe)
+        get_capabilities = server.get_capabilities
+
+        # The low-level server always reports subscribe=False
+        def capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+
+        server.get_capabilities = capabilities_with_subscribe
+
+    def watch(self, uri: str, org: str, view: Callable[[], Any]) -> Callable[[], Any]:
+        """Serve ``view`` of ``org`` as resource ``uri``; returns the async reader to register with FastMCP."""
+        self.resources[uri] = WatchedResource(uri, org, view)
+
+        async def read() -> str:
+            return await anyio.to_thread.run_sync(self.read, uri)
+
+        return read
+
+    def read(self, uri: str) -> str:
+        """The poller's snapshot while the resource is watched, otherwise a fresh read."""
+        resource = self.resources[uri]
+        if resource.polling and resource.snapshot is not None:
+            return resource.snapshot
+        return resource.load()
+
+    async def _subscribe(self, uri: AnyUrl) -> None:
+        resource = self.resources.get(str(uri))
+        if resource is None:
+            raise ValueError(f"Resource '{uri}' cannot be subscribed to")
+        session = self.server.request_context.session
+        with self._lock:
+            resource.subscribers[session] = asyncio.get_running_loop()
+            RESOURCE_SUBSCRIBERS.labels(resource.uri).set(len(resource.subscribers))
+            start = not resource.polling
+            resource.polling = True
+        if start:
+            threading.Thread(target=self._poll, args=(resource,), name=f"poll-{resource.uri}", daemon=True).start()
+
+    async def _unsubscribe(self, uri: AnyUrl) -> None:
+        resource = self.resources.get(str(uri))
+        if resource is not None:
+            self._drop(resource, self.server.request_context.session)
+
+    def _drop(self, resource: WatchedResource, session: Any) -> None:
+        with self._lock:
+            resource.subscribers.pop(session, None)
+            RESOURCE_SUBSCRIBERS.labels(resource.uri).set(len(resource.subscribers))
+
+    def _notify(self, resource: WatchedResource) -> None:
+        for session, loop in list(resource.subscribers.items()):
+            future = asyncio.run_coroutine_threadsafe(session.send_resource_updated(AnyUrl(resource.uri)), loop)
+
+            # A session that went away without unsubscribing is dropped on its first failed notification
+            def done(future, session=session):
+                if future.cancelled() or future.exception() is not None:
+                    self._drop(resource, session)
+
+            future.add_done_callback(done)
+
+    def _poll(self, resource: WatchedResource) -> None:
+        while True:
+            with self._lock:
+                if not resource.subscribers:
+                    resource.polling = False
+                    return
+            previous = resource.fingerprint
+            try:
+                resource.load()
+                if previous is not None and resource.fingerprint != previous:
+                    self._notify(resource)
+            except Exception as e:
+                logger.error("Could not poll %s: %s", resource.uri, e)
+            time.sleep(self.interval)
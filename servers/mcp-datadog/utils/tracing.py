@@ -0,0 +1,96 @@
+import functools
+import inspect
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from mcp.server.lowlevel.server import request_ctx
+
+# Until setup_tracing installs a provider this is a no-op tracer
+tracer = trace.get_tracer("mcp-datadog")
+
+
+def _exporter(name: str, path: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "file":
+        return ConsoleSpanExporter(out=open(path, "a"), formatter=lambda span: span.to_json(indent=None) + "\n")
+    if name == "console":
+        # stdout carries the MCP protocol on stdio transports
+        return ConsoleSpanExporter(out=sys.stderr)
+    return None
+
+
+def setup_tracing(exporter: str, path: str, service_name: str) -> None:
+    """Install the global tracer provider for ``exporter``; with "none" spans stay no-ops."""
+    span_exporter = _exporter(exporter.lower(), path)
+    if span_exporter is None:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+
+
+def _request_carrier() -> Dict[str, str]:
+    """W3C trace context sent by the client for the current MCP request.
+
+    Clients put ``traceparent``/``tracestate`` in the request ``_meta``; clients that
+    cannot set per-request metadata send them as HTTP headers on the transport instead.
+    """
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return {}
+    carrier: Dict[str, str] = {}
+    headers = getattr(context.request, "headers", None)
+    if headers is not None:
+        carrier.update({key: headers[key] for key in ("traceparent", "tracestate") if key in headers})
+    if context.meta is not None and context.meta.model_extra:
+        carrier.update({key: str(value) for key, value in context.meta.model_extra.items() if key in ("traceparent", "tracestate")})
+    return carrier
+
+
+def _set_result_status(span: Span, result: Any) -> None:
+    if isinstance(result, dict) and (result.get("status") == "error" or "error" in result):
+        span.set_status(Status(StatusCode.ERROR, str(result.get("message") or result.get("error"))))
+
+
+def trace_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool function in a server span parented to the caller's trace context."""
+    tool = func.__name__
+
+    def start_span():
+        return tracer.start_as_current_span(
+            f"tool {tool}", context=propagate.extract(_request_carrier()), kind=SpanKind.SERVER, attributes={"mcp.tool.name": tool}
+        )
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with start_span() as span:
+                result = await func(*args, **kwargs)
+                _set_result_status(span, result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span() as span:
+            result = func(*args, **kwargs)
+            _set_result_status(span, result)
+            return result
+    return wrapper
+
+
+@contextmanager
+def trace_upstream(api: str, method: str, path: str) -> Iterator[Span]:
+    """Client span for one upstream HTTP request; exceptions are recorded on the span."""
+    with tracer.start_as_current_span(
+        f"{method} {api}", kind=SpanKind.CLIENT, attributes={"http.request.method": method, "url.template": path, "datadog.api": api}
+    ) as span:
+        yield span
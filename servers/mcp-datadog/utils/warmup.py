@@ -0,0 +1,208 @@
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+from config import ORGS, check_datadog_auth
+from utils.cache import create_cache
+from utils.concurrency import run_concurrently
+from utils.orgs import use_org
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two authentication attempts while an org's keys are rejected
+WARMUP_AUTH_RETRY_SECONDS = 30
+
+# (loaded_at, value) per org and dataset, and the loaded_at alone under (name, "loaded_at")
+_datasets = create_cache("hot_datasets", max_entries=512)
+
+
+class HotDataset:
+    """Catalog that tools read from a cache kept warm in the background.
+
+    ``get`` serves the cached copy and loads it on a miss. The warmer loads every
+    configured dataset at startup and reloads each one once it is half its ``ttl``
+    old, so tools reading it never wait on the API.
+    """
+
+    registry: ClassVar[Dict[str, "HotDataset"]] = {}
+
+    def __init__(self, name: str, loader: Callable[[], Any], ttl: float) -> None:
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        # Called with (loaded_at, value) after each background refresh, e.g. to update an index
+        self.listeners: List[Callable[[float, Any], None]] = []
+        HotDataset.registry[name] = self
+
+    def _load(self) -> Tuple[float, Any]:
+        loaded_at, value = time.time(), self.loader()
+        # Kept apart so readers can tell a new copy was loaded without reading the copy
+        _datasets.set((self.name, "loaded_at"), loaded_at, self.ttl)
+        return loaded_at, value
+
+    def get_entry(self) -> Tuple[float, Any]:
+        """When the current org's copy was loaded, and the copy."""
+        return _datasets.get_or_load(self.name, self._load, self.ttl)
+
+    def loaded_at(self) -> Optional[float]:
+        """When the current org's cached copy was loaded, without reading it; None when there is none."""
+        return _datasets.get((self.name, "loaded_at"))
+
+    def get(self) -> Any:
+        """The dataset of the current org."""
+        return self.get_entry()[1]
+
+    def on_refresh(self, listener: Callable[[float, Any], None]) -> Callable[[float, Any], None]:
+        """Register ``listener`` to run after each background refresh of the dataset."""
+        self.listeners.append(listener)
+        return listener
+
+    def reload(self) -> Any:
+        """Load the current org's dataset upstream now, storing it as the cached copy, and return it."""
+        entry = self._load()
+        _datasets.set(self.name, entry, self.ttl)
+        for listener in self.listeners:
+            listener(*entry)
+        return entry[1]
+
+    def refresh(self) -> float:
+        """Load the dataset when it is missing, or reload it once it is half its ttl old.
+
+        Another worker sharing the cache may already have done so, in which case the
+        cached copy is kept. Returns when the current copy was loaded.
+        """
+        entry = _datasets.get(self.name)
+        if entry is None:
+            entry = _datasets.get_or_load(self.name, self._load, self.ttl)
+        elif time.time() - entry[0] >= self.ttl / 2:
+            entry = self._load()
+            _datasets.set(self.name, entry, self.ttl)
+        for listener in self.listeners:
+            listener(*entry)
+        return entry[0]
+
+
+def hot_dataset(name: str, ttl: float) -> Callable[[Callable[[], Any]], HotDataset]:
+    """Register the decorated loader as the hot dataset ``name``."""
+    def decorator(loader: Callable[[], Any]) -> HotDataset:
+        return HotDataset(name, loader, ttl)
+
+    return decorator
+
+
+class Warmer:
+    """Startup warm-up and background refresh of the hot datasets of every org.
+
+    Warm-up checks each org's credentials, then loads the datasets of the orgs whose
+    keys were accepted concurrently. ``ready`` is set once that is done, so one org with
+    rejected keys does not keep the others out of service; the rejected orgs are listed
+    in ``status()`` and checked again every ``WARMUP_AUTH_RETRY_SECONDS``, and warmed
+    once accepted. The refresher keeps the datasets warm every ``interval`` seconds.
+    """
+
+    def __init__(self, datasets: Sequence[str], interval: float) -> None:
+        names = HotDataset.registry if "*" in datasets else datasets
+        self.datasets = [HotDataset.registry[name] for name in names if name in HotDataset.registry]
+        self.interval = interval
+        self.ready = threading.Event()
+        self.warmed_in: Optional[float] = None
+        # When each "org/dataset" was loaded, and the last error of those that failed
+        self.loaded_at: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        # Orgs whose keys were accepted, and those whose keys were rejected
+        self.authenticated: List[str] = []
+        self.failed_orgs: List[str] = []
+        self._stopped = threading.Event()
+        if not self.datasets:
+            self.ready.set()
+
+    def _authenticate(self, names: Sequence[str]) -> List[str]:
+        """Check the credentials of the orgs ``names``; returns those accepted."""
+        results = run_concurrently(lambda name: check_datadog_auth(ORGS[name], file=sys.stderr), names)
+        accepted = [name for name, ok, _ in results if ok]
+        self.authenticated += accepted
+        self.failed_orgs = [name for name in ORGS if name not in self.authenticated]
+        if self.failed_orgs:
+            logger.error("Datadog authentication failed for orgs %s; retrying in %ss", self.failed_orgs, WARMUP_AUTH_RETRY_SECONDS)
+        return accepted
+
+    def refresh(self, orgs: Optional[Sequence[str]] = None) -> None:
+        """Load or reload every dataset that needs it, of ``orgs`` or of every authenticated org."""
+        def refresh_one(item):
+            org, dataset = item
+            with use_org(org):
+                return dataset.refresh()
+
+        items = [(org, dataset) for org in (self.authenticated if orgs is None else orgs) for dataset in self.datasets]
+        for (org, dataset), loaded_at, error in run_concurrently(refresh_one, items):
+            key = f"{org}/{dataset.name}"
+            if error is None:
+                self.loaded_at[key] = loaded_at
+                self.errors.pop(key, None)
+            else:
+                self.errors[key] = str(error)
+                logger.error("Could not load hot dataset %s: %s", key, error)
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        self._authenticate(list(ORGS))
+        # Without any usable org there is nothing to serve; keep checking until one is accepted
+        while not self.authenticated:
+            if self._stopped.wait(WARMUP_AUTH_RETRY_SECONDS):
+                return
+            self._authenticate(self.failed_orgs)
+        self.refresh()
+        self.warmed_in = time.perf_counter() - started
+        self.ready.set()
+        next_refresh = time.monotonic() + self.interval
+        next_auth = time.monotonic() + WARMUP_AUTH_RETRY_SECONDS
+        while self.interval > 0 or self.failed_orgs:
+            wakeups = ([next_refresh] if self.interval > 0 else []) + ([next_auth] if self.failed_orgs else [])
+            if self._stopped.wait(max(min(wakeups) - time.monotonic(), 0)):
+                return
+            if self.failed_orgs and time.monotonic() >= next_auth:
+                accepted = self._authenticate(self.failed_orgs)
+                if accepted:
+                    self.refresh(accepted)
+                next_auth = time.monotonic() + WARMUP_AUTH_RETRY_SECONDS
+            if self.interval > 0 and time.monotonic() >= next_refresh:
+                self.refresh()
+                next_refresh = time.monotonic() + self.interval
+
+    def start(self) -> None:
+        if self.datasets:
+            threading.Thread(target=self._run, name="datadog-warmup", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop retrying and refreshing at the next wake-up."""
+        self._stopped.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness, the orgs whose keys were rejected and the age of each dataset, for the readiness endpoint."""
+        now = time.time()
+        return {
+            "status": "ready" if self.ready.is_set() else "warming",
+            "warmed_in_seconds": None if self.warmed_in is None else round(self.warmed_in, 2),
+            "failed_orgs": self.failed_orgs,
+            "dataset_ages_seconds": {key: int(now - loaded_at) for key, loaded_at in sorted(self.loaded_at.items())},
+            "errors": self.errors,
+        }
+
+
+_warmer: Optional[Warmer] = None
+
+
+def start_warmup(datasets: List[str], interval: float) -> Warmer:
+    """Start warming ``datasets`` ("*" for all registered ones) in a background thread."""
+    global _warmer
+    _warmer = Warmer(datasets, interval)
+    _warmer.start()
+    return _warmer
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """Whether warm-up has finished, with details; ready when warm-up was never started."""
+    if _warmer is None:
+        return True, {"status": "ready"}
+    return _warmer.ready.is_set(), _warmer.status()
@@ -0,0 +1,239 @@
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+from prometheus_client import CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.metrics_core import GaugeMetricFamily, Metric
+from prometheus_client.parser import text_string_to_metric_families
+from prometheus_client.samples import Sample
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from config import DATADOG_CACHE_PATH, DATADOG_WORKER_PORT_BASE
+
+# Set on the worker processes started by the router
+WORKER_INDEX_ENV = "DATADOG_WORKER_INDEX"
+DEFAULT_SHARED_CACHE_PATH = "./datadog-cache.sqlite3"
+
+# Request headers that describe the router hop rather than the client request
+_HOP_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding", "upgrade"}
+
+
+def worker_index() -> Optional[int]:
+    """Index of this process when it was started as a worker, else None."""
+    value = os.getenv(WORKER_INDEX_ENV)
+    return int(value) if value is not None else None
+
+
+def configure_worker(settings: Any, index: int) -> None:
+    """Bind a worker to its local port and give it its own message path.
+
+    The SSE endpoint event tells the client to POST to ``/messages/<index>/``, so the
+    router sends every message of a session to the worker that holds its stream without
+    keeping a session table.
+    """
+    settings.host = "127.0.0.1"
+    settings.port = DATADOG_WORKER_PORT_BASE + index
+    settings.message_path = f"/messages/{index}/"
+
+
+class Worker:
+    def __init__(self, index: int, script: str) -> None:
+        self.index = index
+        self.script = script
+        self.url = f"http://127.0.0.1:{DATADOG_WORKER_PORT_BASE + index}"
+        self.process: Optional[subprocess.Popen] = None
+        self.sessions = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        env = {**os.environ, WORKER_INDEX_ENV: str(self.index), "DATADOG_CACHE_PATH": DATADOG_CACHE_PATH or DEFAULT_SHARED_CACHE_PATH}
+        self.process = subprocess.Popen([sys.executable, self.script], env=env)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class WorkerRouter:
+    """Front process that spreads MCP sessions over worker processes.
+
+    New SSE sessions go to the worker with the fewest open streams; their messages
+    follow through the per-worker message path. Streamable HTTP requests go to the
+    least busy worker, except that requests of a stateful session (``mcp-session-id``)
+    stay on the worker that created it. ``/metrics`` merges the workers' metrics with a
+    ``worker`` label, and ``/ready`` succeeds once every worker has warmed up. Workers that exit are restarted; their open sessions are lost
+    and the clients reconnect.
+    """
+
+    def __init__(self, workers: int, script: str, sse_path: str = "/sse", streamable_http_path: str = "/mcp") -> None:
+        self.workers = [Worker(index, script) for index in range(workers)]
+        self.sse_path = sse_path
+        self.streamable_http_path = streamable_http_path.rstrip("/") + "/"
+        self.http_sessions: Dict[str, Worker] = {}
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=None), limits=httpx.Limits(max_connections=None))
+        self._round_robin = itertools.cycle(self.workers)
+
+    async def _wait_ready(self, worker: Worker, timeout: float = 60.0) -> None:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            try:
+                (await self.client.get(f"{worker.url}/metrics", timeout=1.0)).raise_for_status()
+                return
+            except httpx.HTTPError:
+                if worker.process is not None and worker.process.poll() is not None:
+                    break
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"Worker {worker.index} did not start on {worker.url}")
+
+    async def _supervise(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            for worker in self.workers:
+                if worker.process is not None and worker.process.poll() is not None:
+                    worker.restarts += 1
+                    worker.sessions = 0
+                    self.http_sessions = {key: owner for key, owner in self.http_sessions.items() if owner is not worker}
+                    worker.start()
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette):
+        for worker in self.workers:
+            worker.start()
+        supervisor = None
+        try:
+            await asyncio.gather(*(self._wait_ready(worker) for worker in self.workers))
+            supervisor = asyncio.create_task(self._supervise())
+            yield
+        finally:
+            if supervisor is not None:
+                supervisor.cancel()
+            for worker in self.workers:
+                worker.stop()
+            await self.client.aclose()
+
+    async def _forward(self, request: Request, worker: Worker, on_close=None, path: Optional[str] = None) -> Response:
+        headers = [(key, value) for key, value in request.headers.items() if key.lower() not in _HOP_HEADERS]
+        upstream_request = self.client.build_request(
+            request.method, f"{worker.url}{path or request.url.path}", params=request.query_params, headers=headers, content=request.stream()
+        )
+        try:
+            upstream = await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError:
+            if on_close is not None:
+                on_close()
+            return Response(f"Worker {worker.index} unavailable", status_code=502)
+
+        async def close():
+            await upstream.aclose()
+            if on_close is not None:
+                on_close()
+
+        session_id = upstream.headers.get("mcp-session-id")
+        if session_id and request.method != "DELETE":
+            self.http_sessions.setdefault(session_id, worker)
+        response_headers = {key: value for key, value in upstream.headers.items() if key.lower() not in _HOP_HEADERS}
+        return StreamingResponse(upstream.aiter_raw(), status_code=upstream.status_code, headers=response_headers, background=BackgroundTask(close))
+
+    async def sse(self, request: Request) -> Response:
+        worker = min(self.workers, key=lambda candidate: candidate.sessions)
+        worker.sessions += 1
+
+        def closed():
+            worker.sessions -= 1
+
+        return await self._forward(request, worker, on_close=closed)
+
+    async def streamable_http(self, request: Request) -> Response:
+        session_id = request.headers.get("mcp-session-id")
+        worker = self.http_sessions.get(session_id) if session_id else None
+        if worker is None:
+            worker = min(self.workers, key=lambda candidate: candidate.sessions)
+        if request.method == "DELETE" and session_id:
+            self.http_sessions.pop(session_id, None)
+        worker.sessions += 1
+
+        def closed():
+            worker.sessions -= 1
+
+        # Workers mount the endpoint with a trailing slash; forwarding there avoids a redirect to the worker URL
+        return await self._forward(request, worker, on_close=closed, path=self.streamable_http_path)
+
+    async def messages(self, request: Request) -> Response:
+        index = request.path_params["worker"]
+        if index >= len(self.workers):
+            return Response("Unknown worker", status_code=404)
+        return await self._forward(request, self.workers[index])
+
+    async def metrics(self, request: Request) -> Response:
+        bodies = await asyncio.gather(*(self.client.get(f"{worker.url}/metrics", timeout=5.0) for worker in self.workers), return_exceptions=True)
+        families: Dict[str, Metric] = {}
+        for worker, body in zip(self.workers, bodies):
+            if isinstance(body, Exception) or body.status_code != 200:
+                continue
+            for family in text_string_to_metric_families(body.text):
+                merged = families.setdefault(family.name, Metric(family.name, family.documentation, family.type, family.unit))
+                merged.samples.extend(
+                    Sample(sample.name, {"worker": str(worker.index), **sample.labels}, sample.value, sample.timestamp, sample.exemplar)
+                    for sample in family.samples
+                )
+        sessions = GaugeMetricFamily("mcp_worker_sessions", "Open SSE sessions and streamable HTTP requests routed to each worker", labels=["worker"])
+        restarts = GaugeMetricFamily("mcp_worker_restarts", "Times each worker process was restarted", labels=["worker"])
+        for worker in self.workers:
+            sessions.add_metric([str(worker.index)], worker.sessions)
+            restarts.add_metric([str(worker.index)], worker.restarts)
+
+        class Merged:
+            def collect(self) -> List[Metric]:
+                return [*families.values(), sessions, restarts]
+
+        registry = CollectorRegistry(auto_describe=False)
+        registry.register(Merged())
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    async def ready(self, request: Request) -> Response:
+        """Ready once every worker is; the body holds each worker's readiness details."""
+        responses = await asyncio.gather(*(self.client.get(f"{worker.url}/ready", timeout=5.0) for worker in self.workers), return_exceptions=True)
+        workers = {}
+        for worker, response in zip(self.workers, responses):
+            if isinstance(response, Exception):
+                workers[str(worker.index)] = {"status": "unavailable"}
+            else:
+                workers[str(worker.index)] = response.json() if response.status_code in (200, 503) else {"status": "unavailable"}
+        is_ready = all(status.get("status") == "ready" for status in workers.values())
+        return JSONResponse({"status": "ready" if is_ready else "warming", "workers": workers}, status_code=200 if is_ready else 503)
+
+    async def other(self, request: Request) -> Response:
+        return await self._forward(request, next(self._round_robin))
+
+    def app(self) -> Starlette:
+        return Starlette(
+            routes=[
+                Route(self.sse_path, self.sse, methods=["GET"]),
+                Route("/messages/{worker:int}/", self.messages, methods=["POST"]),
+                Route(self.streamable_http_path.rstrip("/"), self.streamable_http, methods=["GET", "POST", "DELETE"]),
+                Route(self.streamable_http_path, self.streamable_http, methods=["GET", "POST", "DELETE"]),
+                Route("/metrics", self.metrics, methods=["GET"]),
+                Route("/ready", self.ready, methods=["GET"]),
+                Route("/{path:path}", self.other, methods=["GET", "POST", "PUT", "PATCH", "DELETE"]),
+            ],
+            lifespan=self.lifespan,
+        )
+
+
+def run_workers(workers: int, script: str, settings: Any) -> None:
+    """Serve ``script`` from ``workers`` processes behind a sticky router on the host and port of ``settings``."""
+    router = WorkerRouter(workers, script, settings.sse_path, settings.streamable_http_path)
+    uvicorn.run(router.app(), host=settings.host, port=settings.port, log_level=settings.log_level.lower())
@@ -1,12 +1,28 @@
+import os
 from tools import mcp_duckduckgo_tools
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.resources import FileResource
 from pathlib import Path
+from starlette.requests import Request
+from starlette.responses import Response
+from utils_deadlines import with_deadline
+from utils_metrics import instrument_tool, render_metrics
+from utils_tracing import setup_tracing, trace_tool
 
-server = FastMCP(description="Duckduckgo Search", host="0.0.0.0", port=8000)
+setup_tracing()
+
+server = FastMCP(description="Duckduckgo Search", host="0.0.0.0", port=8000, stateless_http=os.getenv("MCP_STATELESS_HTTP", "true").lower() in ("1", "true", "yes"))
 
 for tool in mcp_duckduckgo_tools:
-    server.tool()(tool)
+    server.tool()(trace_tool(instrument_tool(with_deadline(tool))))
+
+@server.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """
+    Métricas do Prometheus sobre as chamadas de ferramentas e requisições externas.
+    """
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
 
 @server.resource("docs://modules")
 def view_documentation():
@@ -24,4 +40,5 @@ def view_documentation():
         )
 
 if __name__ == "__main__":
-    server.run(transport="sse")
\ No newline at end of file
+    # MCP_TRANSPORT: "sse" (padrão) ou "streamable-http" (servido em /mcp/)
+    server.run(transport=os.getenv("MCP_TRANSPORT", "sse"))
\ No newline at end of file
@@ -2,10 +2,14 @@ from mcp.server.fastmcp import Context, FastMCP
 import json
 from duckduckgo_search import DDGS
 from bs4 import BeautifulSoup
+import anyio
 import httpx
 import sys
 import traceback
+from utils_deadlines import remaining_time
 from utils_json import format_success_result, format_error_result, format_results_list
+from utils_metrics import track_upstream
+from utils_tracing import trace_upstream
 
 mcp = FastMCP()
 
@@ -22,8 +26,10 @@ async def search(query: str, ctx: Context, max_results: int = 10) -> dict:
         dict: Um dicionário contendo os resultados formatados.
     """
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
+        async with track_upstream("duckduckgo_search"):
+            with trace_upstream("duckduckgo_search", "GET", "https://duckduckgo.com/"), DDGS(timeout=remaining_time(10)) as ddgs:
+                # A biblioteca é síncrona: roda numa thread para não travar o loop e poder ser abandonada no cancelamento
+                results = await anyio.to_thread.run_sync(lambda: list(ddgs.text(query, max_results=max_results)), abandon_on_cancel=True)
         items = format_results_list(results)
         return {
             "result": json.dumps(format_success_result(items))
@@ -47,8 +53,10 @@ async def fetch_content(url: str, ctx: Context, max_chars: int = 8000) -> dict:
         dict: Um dicionário contendo o conteúdo textual formatado.
     """
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            response = await client.get(url)
+        async with track_upstream("http_fetch"), httpx.AsyncClient(timeout=remaining_time(15.0), follow_redirects=True) as client:
+            with trace_upstream("http_fetch", "GET", url) as span:
+                response = await client.get(url)
+                span.set_attribute("http.response.status_code", response.status_code)
 
         if response.status_code != 200:
             raise Exception(f"HTTP {response.status_code} ao acessar {url}")
@@ -0,0 +1,70 @@
+import contextvars
+import functools
+import json
+import os
+import time
+from typing import Any, Callable, Optional
+import anyio
+from mcp.server.lowlevel.server import request_ctx
+from utils_json import format_error_result
+from utils_metrics import TOOL_ABORTED
+
+# Prazo padrão de cada chamada de ferramenta, em segundos
+MCP_TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", "30"))
+# Chave do _meta da requisição em que o cliente pede um prazo menor, em milissegundos
+TIMEOUT_META_KEY = "timeoutMs"
+
+_expires: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("tool_expires", default=None)
+
+
+def remaining_time(default: float) -> float:
+    """
+    Segundos restantes da chamada em andamento, limitados a ``default`` (usado fora de uma chamada).
+    """
+    expires = _expires.get()
+    if expires is None:
+        return default
+    return max(0.001, min(default, expires - time.monotonic()))
+
+
+def request_timeout(default: float) -> float:
+    """
+    Prazo da requisição atual: o ``timeoutMs`` enviado pelo cliente, limitado a ``default``.
+    """
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return default
+    value = (context.meta.model_extra or {}).get(TIMEOUT_META_KEY) if context.meta is not None else None
+    try:
+        return min(default, float(value) / 1000) if value is not None and float(value) > 0 else default
+    except (TypeError, ValueError):
+        return default
+
+
+def with_deadline(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Limita uma ferramenta assíncrona ao seu prazo.
+
+    Ao fim do prazo a requisição externa em andamento é cancelada e a ferramenta devolve um erro.
+    O cancelamento pedido pelo cliente (notifications/cancelled) chega da mesma forma às
+    requisições em andamento, pois elas são aguardadas dentro do escopo da chamada.
+    """
+    tool = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        timeout = request_timeout(MCP_TOOL_TIMEOUT)
+        token = _expires.set(time.monotonic() + timeout)
+        try:
+            with anyio.fail_after(timeout):
+                return await func(*args, **kwargs)
+        except TimeoutError:
+            TOOL_ABORTED.labels(tool, "deadline").inc()
+            return {"result": json.dumps(format_error_result(f"A ferramenta '{tool}' excedeu o prazo de {timeout:g}s"))}
+        except anyio.get_cancelled_exc_class():
+            TOOL_ABORTED.labels(tool, "cancelled").inc()
+            raise
+        finally:
+            _expires.reset(token)
+    return wrapper
@@ -0,0 +1,70 @@
+import functools
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+TOOL_CALLS = Counter("mcp_tool_calls_total", "Tool invocations by result status", ["tool", "status"])
+TOOL_LATENCY = Histogram("mcp_tool_duration_seconds", "Tool execution time", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_IN_FLIGHT = Gauge("mcp_tool_in_flight", "Tool calls currently executing", ["tool"])
+TOOL_RESPONSE_BYTES = Histogram("mcp_tool_response_bytes", "Size of tool results serialized as JSON", ["tool"], buckets=SIZE_BUCKETS)
+TOOL_ABORTED = Counter("mcp_tool_aborted_total", "Tool calls stopped by their deadline or by client cancellation", ["tool", "reason"])
+UPSTREAM_LATENCY = Histogram("mcp_upstream_request_duration_seconds", "Upstream request time", ["api", "status"], buckets=LATENCY_BUCKETS)
+
+
+def _result_status(result: Any) -> str:
+    """As ferramentas devolvem o JSON-RPC serializado em ``result``; erros trazem a chave ``error``."""
+    try:
+        payload = json.loads(result["result"])
+    except (KeyError, TypeError, ValueError):
+        return "ok"
+    return "error" if isinstance(payload, dict) and "error" in payload else "ok"
+
+
+def instrument_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envolve uma ferramenta assíncrona registrando chamadas, latência, chamadas em andamento e tamanho do resultado.
+
+    ``functools.wraps`` mantém a assinatura original, então o FastMCP gera o mesmo schema de entrada.
+    """
+    tool = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        TOOL_IN_FLIGHT.labels(tool).inc()
+        result, status = None, "exception"
+        try:
+            result = await func(*args, **kwargs)
+            status = _result_status(result)
+            return result
+        finally:
+            TOOL_IN_FLIGHT.labels(tool).dec()
+            TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+            TOOL_CALLS.labels(tool, status).inc()
+            if result is not None:
+                TOOL_RESPONSE_BYTES.labels(tool).observe(len(json.dumps(result, default=str)))
+    return wrapper
+
+
+@asynccontextmanager
+async def track_upstream(api: str) -> AsyncIterator[None]:
+    """Mede uma requisição externa, rotulada com o status HTTP em caso de falha."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception as e:
+        status = str(getattr(getattr(e, "response", None), "status_code", None) or "error")
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(api, status).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Retorna o corpo no formato de exposição do Prometheus e o content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,82 @@
+import functools
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from mcp.server.lowlevel.server import request_ctx
+from utils_metrics import _result_status
+
+# Enquanto setup_tracing não instala um provider, este tracer não registra nada
+tracer = trace.get_tracer("mcp-duckduckgo")
+
+
+def _exporter(name: str, path: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "file":
+        return ConsoleSpanExporter(out=open(path, "a"), formatter=lambda span: span.to_json(indent=None) + "\n")
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stderr)
+    return None
+
+
+def setup_tracing(service_name: str = "mcp-duckduckgo") -> None:
+    """
+    Configura o exportador de spans a partir de OTEL_TRACES_EXPORTER (none, console, file ou otlp).
+    """
+    span_exporter = _exporter(os.getenv("OTEL_TRACES_EXPORTER", "none").lower(), os.getenv("OTEL_TRACES_FILE", "./traces.jsonl"))
+    if span_exporter is None:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+
+
+def _request_carrier() -> Dict[str, str]:
+    """
+    Contexto W3C enviado pelo cliente no ``_meta`` da requisição MCP ou nos headers HTTP.
+    """
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return {}
+    carrier: Dict[str, str] = {}
+    headers = getattr(context.request, "headers", None)
+    if headers is not None:
+        carrier.update({key: headers[key] for key in ("traceparent", "tracestate") if key in headers})
+    if context.meta is not None and context.meta.model_extra:
+        carrier.update({key: str(value) for key, value in context.meta.model_extra.items() if key in ("traceparent", "tracestate")})
+    return carrier
+
+
+def trace_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envolve uma ferramenta assíncrona em um span de servidor ligado ao trace do cliente.
+    """
+    tool = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with tracer.start_as_current_span(
+            f"tool {tool}", context=propagate.extract(_request_carrier()), kind=SpanKind.SERVER, attributes={"mcp.tool.name": tool}
+        ) as span:
+            result = await func(*args, **kwargs)
+            if _result_status(result) == "error":
+                span.set_status(Status(StatusCode.ERROR))
+            return result
+    return wrapper
+
+
+@contextmanager
+def trace_upstream(api: str, method: str, url: str) -> Iterator[Span]:
+    """
+    Span de cliente para uma requisição externa; exceções ficam registradas no span.
+    """
+    with tracer.start_as_current_span(f"{method} {api}", kind=SpanKind.CLIENT, attributes={"http.request.method": method, "url.full": url}) as span:
+        yield span
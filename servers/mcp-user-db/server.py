@@ -1,8 +1,15 @@
+import os
 from tools import mcp_tools_users
 from mcp.server.fastmcp import FastMCP
 from config import get_conn, close_conn
+from starlette.requests import Request
+from starlette.responses import Response
+from utils_metrics import instrument_tool, render_metrics
+from utils_tracing import setup_tracing, trace_tool
 
-server = FastMCP(description="Create, list and get users from SQLite DB", host="0.0.0.0", port=8002)
+setup_tracing()
+
+server = FastMCP(description="Create, list and get users from SQLite DB", host="0.0.0.0", port=8002, stateless_http=os.getenv("MCP_STATELESS_HTTP", "true").lower() in ("1", "true", "yes"))
 
 @server.on_event("startup")
 async def startup():
@@ -16,8 +23,15 @@ async def shutdown():
         await close_conn(server.state.db)
 
 for tool in mcp_tools_users:
-    server.tool()(tool)
+    server.tool()(trace_tool(instrument_tool(tool)))
+
+@server.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Expõe as métricas do Prometheus das chamadas de ferramentas."""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
 
 
 if __name__ == "__main__":
-    server.run(transport="sse")
\ No newline at end of file
+    # MCP_TRANSPORT: "sse" (padrão) ou "streamable-http" (servido em /mcp/)
+    server.run(transport=os.getenv("MCP_TRANSPORT", "sse"))
\ No newline at end of file
@@ -0,0 +1,40 @@
+import functools
+import json
+import time
+from typing import Any, Callable, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+TOOL_CALLS = Counter("mcp_tool_calls_total", "Tool invocations by result status", ["tool", "status"])
+TOOL_LATENCY = Histogram("mcp_tool_duration_seconds", "Tool execution time", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_IN_FLIGHT = Gauge("mcp_tool_in_flight", "Tool calls currently executing", ["tool"])
+TOOL_RESPONSE_BYTES = Histogram("mcp_tool_response_bytes", "Size of tool results serialized as JSON", ["tool"], buckets=SIZE_BUCKETS)
+
+
+def instrument_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps an async tool to record call counts, latency, in-flight calls and result size."""
+    tool = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        TOOL_IN_FLIGHT.labels(tool).inc()
+        result, status = None, "exception"
+        try:
+            result = await func(*args, **kwargs)
+            status = "error" if isinstance(result, dict) and result.get("status") == "error" else "ok"
+            return result
+        finally:
+            TOOL_IN_FLIGHT.labels(tool).dec()
+            TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+            TOOL_CALLS.labels(tool, status).inc()
+            if result is not None:
+                TOOL_RESPONSE_BYTES.labels(tool).observe(len(json.dumps(result, default=str)))
+    return wrapper
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Returns the Prometheus exposition body and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,64 @@
+import functools
+import os
+import sys
+from typing import Any, Callable, Dict, Optional
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from mcp.server.lowlevel.server import request_ctx
+
+tracer = trace.get_tracer("mcp-user-db")
+
+
+def _exporter(name: str, path: str) -> Optional[SpanExporter]:
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "file":
+        return ConsoleSpanExporter(out=open(path, "a"), formatter=lambda span: span.to_json(indent=None) + "\n")
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stderr)
+    return None
+
+
+def setup_tracing(service_name: str = "mcp-user-db") -> None:
+    """Configures the span exporter from OTEL_TRACES_EXPORTER (none, console, file or otlp)."""
+    span_exporter = _exporter(os.getenv("OTEL_TRACES_EXPORTER", "none").lower(), os.getenv("OTEL_TRACES_FILE", "./traces.jsonl"))
+    if span_exporter is None:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+
+
+def _request_carrier() -> Dict[str, str]:
+    """W3C trace context sent by the client in the MCP request ``_meta`` or as HTTP headers."""
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return {}
+    carrier: Dict[str, str] = {}
+    headers = getattr(context.request, "headers", None)
+    if headers is not None:
+        carrier.update({key: headers[key] for key in ("traceparent", "tracestate") if key in headers})
+    if context.meta is not None and context.meta.model_extra:
+        carrier.update({key: str(value) for key, value in context.meta.model_extra.items() if key in ("traceparent", "tracestate")})
+    return carrier
+
+
+def trace_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps an async tool in a server span parented to the caller's trace context."""
+    tool = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with tracer.start_as_current_span(
+            f"tool {tool}", context=propagate.extract(_request_carrier()), kind=SpanKind.SERVER, attributes={"mcp.tool.name": tool}
+        ) as span:
+            result = await func(*args, **kwargs)
+            if isinstance(result, dict) and result.get("status") == "error":
+                span.set_status(Status(StatusCode.ERROR, str(result.get("message"))))
+            return result
+    return wrapper